@@ -1,27 +1,198 @@
 # ses_tracking/admin.py
+from django.conf import settings
 from django.contrib import admin
-from .models import SESEvent, DailyEmailStats
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db import connections
+from django.http import Http404, JsonResponse
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+from django.db.models import Q
+from .models import SESEvent, DailyEmailStats, OutboundMessage, RecipientState, SNSSubscription, SuppressedAddress
+from .routers import replica_reads
+
+def large_table_mode():
+    """
+    Trade exact counts, date drill-down, the timestamp filter and substring
+    search for constant-time changelists on SESEvent tables with tens of
+    millions of rows. Read per request.
+    """
+    return getattr(settings, 'SES_TRACKING_ADMIN_LARGE_TABLE_MODE', False)
+
+
+class ReplicaReadsMixin:
+    """
+    Serve GET changelist and detail pages from the read replica, if one is
+    configured (see routers.py). Responses are rendered inside the block
+    because TemplateResponse evaluates querysets lazily.
+    """
+    
+    def _replica_view(self, view, request, *args, **kwargs):
+        if request.method != 'GET':
+            return view(request, *args, **kwargs)
+        with replica_reads():
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        return response
+    
+    def changelist_view(self, request, extra_context=None):
+        return self._replica_view(super().changelist_view, request, extra_context)
+    
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        return self._replica_view(super().change_view, request, object_id, form_url, extra_context)
+
+
+def estimated_row_count(model, using):
+    """
+    Planner row estimate for model's table, or None where the database has
+    none (SQLite) or the table was never analyzed.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [connection.ops.quote_name(table)])
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s',
+                [table]
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never counts a large table in full.
+    
+    Unfiltered lists use the planner's row estimate once the table holds
+    more than SES_TRACKING_ADMIN_ESTIMATE_THRESHOLD rows, and an exact count
+    below it. Filtered lists, and databases without an estimate, count at
+    most SES_TRACKING_ADMIN_COUNT_LIMIT rows, so pages past the limit are
+    not linked.
+    """
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None:
+                if estimate > getattr(settings, 'SES_TRACKING_ADMIN_ESTIMATE_THRESHOLD', 100000):
+                    return estimate
+                return queryset.count()
+        limit = getattr(settings, 'SES_TRACKING_ADMIN_COUNT_LIMIT', 10000)
+        return queryset.order_by()[:limit].count()
 
 
 @admin.register(SESEvent)
-class SESEventAdmin(admin.ModelAdmin):
+class SESEventAdmin(ReplicaReadsMixin, admin.ModelAdmin):
     list_display = ['timestamp', 'event_type', 'email', 'email_message_id', 'bounce_type', 'reject_reason', 'message_id']
     list_filter = ['event_type', 'bounce_type', 'timestamp']
-    search_fields = ['email', 'message_id', 'email_message_id', 'reject_reason']
+    list_select_related = ['reject_reason']
+    search_fields = ['email', 'message_id', 'email_message_id', 'reject_reason__value']
     readonly_fields = ['event_type', 'message_id', 'email_message_id', 'email', 'bounce_type', 
                       'bounce_sub_type', 'complaint_feedback_type', 'reject_reason',
-                      'timestamp', 'raw_message', 'created_at']
-    date_hierarchy = 'timestamp'
+                      'timestamp', 'raw_message_lazy', 'created_at']
+    exclude = ['raw_message']
+    
+    # Matched against indexed columns only, see get_search_results
+    large_table_search_fields = ['=email', '^message_id', '^email_message_id']
+    
+    @property
+    def date_hierarchy(self):
+        return None if large_table_mode() else 'timestamp'
+    
+    @property
+    def show_full_result_count(self):
+        return not large_table_mode()
+    
+    def get_list_filter(self, request):
+        if large_table_mode():
+            return [name for name in self.list_filter if name != 'timestamp']
+        return self.list_filter
+    
+    def get_search_fields(self, request):
+        if large_table_mode():
+            return self.large_table_search_fields
+        return self.search_fields
+    
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        paginator = EstimatedCountPaginator if large_table_mode() else self.paginator
+        return paginator(queryset, per_page, orphans, allow_empty_first_page)
     
     def has_add_permission(self, request):
         return False
     
     def has_change_permission(self, request, obj=None):
         return False
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if match and match.url_name == f'{self.opts.app_label}_{self.opts.model_name}_changelist':
+            return queryset.only('pk', *self.list_display, 'reject_reason__value')
+        # The detail page fetches raw_message separately, on demand
+        return queryset.defer('raw_message').select_related(
+            'email_subject', 'bounce_sub_type', 'complaint_feedback_type', 'reject_reason'
+        )
+    
+    def get_search_results(self, request, queryset, search_term):
+        if not large_table_mode():
+            return super().get_search_results(request, queryset, search_term)
+        term = search_term.strip().strip('<>')
+        if not term:
+            return queryset, False
+        # Case-sensitive exact/prefix lookups so PostgreSQL can use the
+        # column indexes (and the varchar_pattern_ops index for LIKE 'x%')
+        return queryset.filter(
+            Q(email__in={term, term.lower()})
+            | Q(message_id__startswith=term)
+            | Q(email_message_id__startswith=term)
+        ), False
+    
+    def get_urls(self):
+        return [
+            path(
+                '<path:object_id>/raw/',
+                self.admin_site.admin_view(self.raw_message_view),
+                name='ses_tracking_sesevent_raw',
+            ),
+        ] + super().get_urls()
+    
+    def raw_message_view(self, request, object_id):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        with replica_reads():
+            raw_message = SESEvent.objects.filter(pk=object_id).values_list('raw_message', flat=True).first()
+        if raw_message is None:
+            raise Http404
+        return JsonResponse(raw_message, safe=False, json_dumps_params={'indent': 2})
+    
+    @admin.display(description='Raw message')
+    def raw_message_lazy(self, obj):
+        url = reverse('admin:ses_tracking_sesevent_raw', args=[obj.pk])
+        # Fetched on first expand; large notifications never slow the page down
+        return format_html(
+            '<details ontoggle="if (this.open && !this.dataset.loaded) {{ this.dataset.loaded = 1; '
+            'var pre = this.querySelector(\'pre\'); fetch(this.dataset.url).then(function (r) {{ return r.text(); }})'
+            '.then(function (text) {{ pre.textContent = text; }}); }}" data-url="{}">'
+            '<summary>Show raw SNS message</summary><pre style="white-space: pre-wrap">Loading…</pre>'
+            '<a href="{}">Open as JSON</a></details>',
+            url,
+            url,
+        )
 
 
 @admin.register(DailyEmailStats)
-class DailyEmailStatsAdmin(admin.ModelAdmin):
+class DailyEmailStatsAdmin(ReplicaReadsMixin, admin.ModelAdmin):
     list_display = [
         'date', 
         'total_sends', 
@@ -65,4 +236,90 @@ class DailyEmailStatsAdmin(admin.ModelAdmin):
     
     def has_delete_permission(self, request, obj=None):
         # Allow deletion to regenerate stats if needed
-        return True
\ No newline at end of file
+        return True
+
+
+@admin.register(SuppressedAddress)
+class SuppressedAddressAdmin(admin.ModelAdmin):
+    list_display = ['email', 'suppressed', 'reason', 'transient_bounce_count', 'last_event_at', 'updated_at']
+    list_filter = ['suppressed', 'reason']
+    search_fields = ['=email']
+    readonly_fields = ['email', 'reason', 'transient_bounce_count', 'last_event_at', 'created_at', 'updated_at']
+    ordering = ['-updated_at']
+    actions = ['unsuppress']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    @admin.action(description='Remove from suppression list')
+    def unsuppress(self, request, queryset):
+        # Update rather than delete so the incremental cache refresh sees the change
+        updated = queryset.update(suppressed=False, transient_bounce_count=0, updated_at=timezone.now())
+        self.message_user(request, f"{updated} address(es) removed from the suppression list")
+
+
+
+@admin.register(OutboundMessage)
+class OutboundMessageAdmin(ReplicaReadsMixin, admin.ModelAdmin):
+    list_display = ['sent_at', 'message_id', 'recipients', 'ses_message_id', 'delivered_at', 'delivery_latency']
+    search_fields = ['=message_id', '=ses_message_id']
+    readonly_fields = ['message_id', 'ses_message_id', 'recipients', 'subject_hash', 'sent_at', 'delivered_at']
+    date_hierarchy = 'sent_at'
+    ordering = ['-sent_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class RecipientHealthFilter(admin.SimpleListFilter):
+    title = 'health'
+    parameter_name = 'health'
+    
+    def lookups(self, request, model_admin):
+        return [
+            ('problem', 'Problem recipients'),
+            ('healthy', 'Healthy'),
+        ]
+    
+    def queryset(self, request, queryset):
+        problem = Q(complaint_count__gt=0) | Q(last_event_type='bounce', last_bounce_type='Permanent')
+        if self.value() == 'problem':
+            return queryset.filter(problem)
+        if self.value() == 'healthy':
+            return queryset.exclude(problem)
+        return queryset
+
+
+@admin.register(RecipientState)
+class RecipientStateAdmin(ReplicaReadsMixin, admin.ModelAdmin):
+    list_display = [
+        'email', 'last_event_type', 'last_bounce_type', 'last_event_at',
+        'send_count', 'delivery_count', 'bounce_count', 'complaint_count',
+    ]
+    list_filter = [RecipientHealthFilter, 'last_event_type', 'last_bounce_type']
+    search_fields = ['=email']
+    readonly_fields = [
+        'email', 'last_event_type', 'last_bounce_type', 'last_event_at', 'first_seen_at',
+        'send_count', 'delivery_count', 'bounce_count', 'complaint_count', 'updated_at',
+    ]
+    ordering = ['-last_event_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SNSSubscription)
+class SNSSubscriptionAdmin(admin.ModelAdmin):
+    list_display = ['topic_arn', 'confirmed_at', 'attempts', 'last_error', 'updated_at']
+    list_filter = [('confirmed_at', admin.EmptyFieldListFilter)]
+    search_fields = ['topic_arn']
+    readonly_fields = ['topic_arn', 'subscribe_url', 'url_hash', 'confirmed_at', 'attempts', 'last_error', 'created_at', 'updated_at']
+    
+    def has_add_permission(self, request):
+        return False
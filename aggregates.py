@@ -0,0 +1,178 @@
+# ses_tracking/aggregates.py
+import hashlib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, FloatField, Max, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf, TruncMonth, TruncWeek
+
+from .models import DailyEmailStats
+
+
+COUNTER_FIELDS = [
+    'total_sends',
+    'total_deliveries',
+    'total_bounces',
+    'total_complaints',
+    'total_rejects',
+    'total_rendering_failures',
+    'total_delivery_delays',
+    'total_subscriptions',
+    'permanent_bounces',
+    'transient_bounces',
+    'undetermined_bounces',
+]
+
+GROUP_BY_FUNCTIONS = {
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+CACHE_PREFIX = 'ses_tracking:aggregate'
+
+
+def _rate_expression(field):
+    """
+    Volume-weighted rate for a summed counter, as a percentage.
+
+    Mirrors DailyEmailStats.calculate_rates: the base is the summed sends,
+    falling back to summed deliveries when no sends were recorded.
+    """
+    base = Coalesce(NullIf(Sum('total_sends'), 0), Sum('total_deliveries'))
+    return Coalesce(
+        Cast(Sum(field), FloatField()) * 100 / NullIf(base, 0),
+        Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _expressions():
+    # Aliases are prefixed so they do not shadow the model fields that the
+    # rate expressions sum over; _clean_row strips the prefix again.
+    expressions = {
+        f'sum_{field}': Coalesce(Sum(field), 0) for field in COUNTER_FIELDS
+    }
+    expressions.update({
+        'sum_bounce_rate': _rate_expression('total_bounces'),
+        'sum_complaint_rate': _rate_expression('total_complaints'),
+        'sum_delivery_rate': _rate_expression('total_deliveries'),
+    })
+    return expressions
+
+
+def _clean_row(row):
+    cleaned = {
+        key[len('sum_'):] if key.startswith('sum_') else key: value
+        for key, value in row.items()
+    }
+    for key in ('bounce_rate', 'complaint_rate', 'delivery_rate'):
+        cleaned[key] = round(cleaned[key] or 0.0, 2)
+    return cleaned
+
+
+def compute_aggregate(start_date, end_date, group_by=None):
+    """
+    Aggregate DailyEmailStats between start_date and end_date (inclusive).
+
+    Every counter and the weighted rates are computed in a single query.
+    When group_by is 'week' or 'month' a second grouped query returns the
+    same figures per period.
+    """
+    queryset = DailyEmailStats.objects.filter(date__gte=start_date, date__lte=end_date)
+
+    result = {'totals': _clean_row(queryset.aggregate(**_expressions()))}
+
+    if group_by:
+        trunc = GROUP_BY_FUNCTIONS[group_by]
+        rows = (
+            queryset.order_by()
+            .annotate(period=trunc('date'))
+            .values('period')
+            .annotate(**_expressions())
+            .order_by('period')
+        )
+        result['groups'] = [_clean_row(dict(row)) for row in rows]
+
+    return result
+
+
+def _month_count(start_date, end_date):
+    return (end_date.year - start_date.year) * 12 + end_date.month - start_date.month + 1
+
+
+def _months_between(start_date, end_date):
+    months = []
+    current = start_date.replace(day=1)
+    while current <= end_date:
+        months.append(current.strftime('%Y-%m'))
+        current = (current + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def _generation_key(month):
+    return f'{CACHE_PREFIX}:gen:{month}'
+
+
+def _generations(start_date, end_date):
+    """
+    Return the cache generation tokens for every month covered by the range.
+
+    Missing tokens are seeded with a fresh value rather than a constant so an
+    evicted generation can never resurrect a stale cached aggregate.
+    """
+    keys = [_generation_key(month) for month in _months_between(start_date, end_date)]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return [str(generations[key]) for key in keys]
+
+
+def invalidate_aggregate_cache(date):
+    """Drop cached aggregates for every range that covers the given day"""
+    cache.set(_generation_key(date.strftime('%Y-%m')), time.time_ns(), timeout=None)
+
+
+def get_aggregate(start_date, end_date, group_by=None):
+    """
+    Cached wrapper around compute_aggregate.
+
+    Results are keyed by (start_date, end_date, group_by) and invalidated
+    whenever a day inside the range is re-aggregated. Ranges spanning more
+    than SES_TRACKING_AGGREGATE_CACHE_MAX_MONTHS months are computed without
+    the cache, so a client-supplied range of years never fetches thousands
+    of generation keys. The key also carries
+    the Max('updated_at') and row count visible to the database the
+    aggregate is read from, so a read from a lagging replica (or one racing
+    an uncommitted re-aggregation) is cached under the old data's key and
+    never under the new generation.
+    """
+    if group_by is not None and group_by not in GROUP_BY_FUNCTIONS:
+        raise ValueError(f"Unsupported group_by: {group_by}")
+
+    timeout = getattr(settings, 'SES_TRACKING_AGGREGATE_CACHE_TIMEOUT', 3600)
+    max_months = getattr(settings, 'SES_TRACKING_AGGREGATE_CACHE_MAX_MONTHS', 36)
+    if not timeout or _month_count(start_date, end_date) > max_months:
+        return compute_aggregate(start_date, end_date, group_by)
+
+    # Read the version before the aggregate: if the database moves on in
+    # between, newer figures land under an older key, never the reverse.
+    state = DailyEmailStats.objects.filter(
+        date__gte=start_date, date__lte=end_date
+    ).order_by().aggregate(last_modified=Max('updated_at'), count=Count('id'))
+    last_modified = state['last_modified']
+    version = f"{last_modified.isoformat() if last_modified else '-'}:{state['count']}"
+
+    generations = hashlib.md5(
+        ':'.join(_generations(start_date, end_date) + [version]).encode()
+    ).hexdigest()
+    key = f'{CACHE_PREFIX}:{start_date}:{end_date}:{group_by or "-"}:{generations}'
+
+    result = cache.get(key)
+    if result is None:
+        result = compute_aggregate(start_date, end_date, group_by)
+        cache.set(key, result, timeout=timeout)
+    return result
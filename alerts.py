@@ -0,0 +1,290 @@
+# ses_tracking/alerts.py
+"""
+Bounce and complaint surge alerts evaluated as events are ingested.
+
+process_ses_message feeds every stored event to alert_evaluator once its
+transaction commits, which keeps sliding-window counters per configuration
+set and per recipient domain in process memory. Recording an event is O(1) with no database access; when a
+bounce or complaint rate over the window crosses its threshold (and the
+window holds at least SES_TRACKING_ALERT_MIN_VOLUME messages), an Alert is
+passed to every notifier in SES_TRACKING_ALERT_NOTIFIERS, at most once per
+SES_TRACKING_ALERT_COOLDOWN seconds per scope and kind.
+
+Counters are per process: with several workers each sees its share of the
+traffic, which leaves the rates comparable.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import django.dispatch
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Sent by SignalNotifier with alert=Alert
+alert_fired = django.dispatch.Signal()
+
+BUCKETS = 60
+KINDS = ('send', 'delivery', 'bounce', 'complaint')
+
+
+class Alert:
+    def __init__(self, scope, key, kind, rate, threshold, volume, window):
+        self.scope = scope  # 'configuration_set' or 'domain'
+        self.key = key
+        self.kind = kind  # 'bounce' or 'complaint'
+        self.rate = rate  # Percent
+        self.threshold = threshold
+        self.volume = volume
+        self.window = window
+        self.fired_at = time.time()
+
+    def __str__(self):
+        return (
+            f"{self.kind.title()} rate {self.rate:.2f}% over the last {self.window}s for "
+            f"{self.scope} {self.key} (threshold {self.threshold}%, {self.volume} messages)"
+        )
+
+    def as_dict(self):
+        return {
+            'scope': self.scope,
+            'key': self.key,
+            'kind': self.kind,
+            'rate': round(self.rate, 4),
+            'threshold': self.threshold,
+            'volume': self.volume,
+            'window': self.window,
+            'fired_at': self.fired_at,
+        }
+
+
+class SlidingWindow:
+    """
+    Event counts over the last window seconds in BUCKETS ring slots.
+
+    Each slot covers window / BUCKETS seconds. Slots are cleared as time
+    advances past them and running totals are kept, so add() is O(1)
+    amortized: each slot is cleared at most once per advance.
+    """
+    __slots__ = ('width', 'slots', 'current', 'totals', 'last_alert')
+
+    def __init__(self, window):
+        self.width = window / BUCKETS
+        self.slots = [[0] * len(KINDS) for _ in range(BUCKETS)]
+        self.current = None  # Epoch of the newest slot
+        self.totals = [0] * len(KINDS)
+        self.last_alert = {}
+
+    def advance(self, now):
+        """Clear the slots that fell out of the window; return the current epoch"""
+        epoch = int(now // self.width)
+        if self.current is None:
+            self.current = epoch
+        elif epoch > self.current:
+            for stale in range(max(self.current + 1, epoch - BUCKETS + 1), epoch + 1):
+                slot = self.slots[stale % BUCKETS]
+                for i, count in enumerate(slot):
+                    self.totals[i] -= count
+                    slot[i] = 0
+            self.current = epoch
+        return self.current
+
+    def add(self, kind_index, now):
+        epoch = self.advance(now)
+        self.slots[epoch % BUCKETS][kind_index] += 1
+        self.totals[kind_index] += 1
+
+    def rates(self):
+        """(volume, bounce %, complaint %) over the window"""
+        sends, deliveries, bounces, complaints = self.totals
+        # Prefer send events as the denominator; without them, use outcomes
+        volume = sends or deliveries + bounces
+        if not volume:
+            return 0, 0.0, 0.0
+        return volume, bounces * 100.0 / volume, complaints * 100.0 / volume
+
+
+class AlertEvaluator:
+    """Sliding-window rate tracking for configuration sets and recipient domains"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._windows = OrderedDict()
+        self._configured = False
+
+    def configure(self):
+        self.enabled = getattr(settings, 'SES_TRACKING_ALERTS', True)
+        self.window = getattr(settings, 'SES_TRACKING_ALERT_WINDOW', 3600)
+        self.thresholds = {
+            'bounce': getattr(settings, 'SES_TRACKING_ALERT_BOUNCE_RATE', 5.0),
+            'complaint': getattr(settings, 'SES_TRACKING_ALERT_COMPLAINT_RATE', 0.1),
+        }
+        self.min_volume = getattr(settings, 'SES_TRACKING_ALERT_MIN_VOLUME', 100)
+        self.cooldown = getattr(settings, 'SES_TRACKING_ALERT_COOLDOWN', 900)
+        self.max_keys = getattr(settings, 'SES_TRACKING_ALERT_MAX_KEYS', 10000)
+        self.notifiers = [
+            import_string(path)() for path in
+            getattr(settings, 'SES_TRACKING_ALERT_NOTIFIERS', ['ses_tracking.alerts.LogNotifier'])
+        ]
+        self._configured = True
+
+    def reset(self):
+        """Forget all counters and re-read settings on next use"""
+        with self._lock:
+            self._windows.clear()
+            self._configured = False
+
+    def _window(self, scope, key):
+        windows = self._windows
+        window = windows.get((scope, key))
+        if window is None:
+            window = windows[(scope, key)] = SlidingWindow(self.window)
+            if len(windows) > self.max_keys:
+                windows.popitem(last=False)
+        else:
+            windows.move_to_end((scope, key))
+        return window
+
+    def _check(self, scope, key, window, kind, now):
+        volume, bounce_rate, complaint_rate = window.rates()
+        rate = bounce_rate if kind == 'bounce' else complaint_rate
+        threshold = self.thresholds[kind]
+        if volume < self.min_volume or rate < threshold:
+            return None
+        if now - window.last_alert.get(kind, float('-inf')) < self.cooldown:
+            return None
+        window.last_alert[kind] = now
+        return Alert(scope, key, kind, rate, threshold, volume, self.window)
+
+    def record(self, event_type, configuration_set, domain, now=None):
+        """Count one event; returns the alerts it fired"""
+        if not self._configured:
+            self.configure()
+        if not self.enabled or event_type not in KINDS:
+            return []
+
+        now = time.monotonic() if now is None else now
+        kind_index = KINDS.index(event_type)
+        alerts = []
+        with self._lock:
+            for scope, key in (('configuration_set', configuration_set), ('domain', domain)):
+                if not key:
+                    continue
+                window = self._window(scope, key)
+                window.add(kind_index, now)
+                if event_type in self.thresholds:
+                    alert = self._check(scope, key, window, event_type, now)
+                    if alert:
+                        alerts.append(alert)
+
+        for alert in alerts:
+            self.notify(alert)
+        return alerts
+
+    def record_events(self, ses_message, events):
+        """
+        Feed the events stored for one notification once the surrounding
+        transaction commits, so a rolled-back (and later redelivered)
+        notification is never counted twice
+        """
+        if not events:
+            return
+        configuration_set = configuration_set_name(ses_message)
+        counted = [
+            (event.event_type, (event.email or '').rsplit('@', 1)[-1].lower())
+            for event in events
+        ]
+
+        def record_all():
+            for event_type, domain in counted:
+                self.record(event_type, configuration_set, domain)
+
+        transaction.on_commit(record_all)
+
+    def notify(self, alert):
+        for notifier in self.notifiers:
+            try:
+                notifier.notify(alert)
+            except Exception as e:
+                logger.error(f"Alert notifier {type(notifier).__name__} failed: {str(e)}", exc_info=True)
+
+    def snapshot(self, now=None):
+        """Current volume and rates per scope, for dashboards and debugging"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            result = []
+            for (scope, key), window in self._windows.items():
+                window.advance(now)
+                volume, bounce_rate, complaint_rate = window.rates()
+                result.append({
+                    'scope': scope,
+                    'key': key,
+                    'volume': volume,
+                    'bounce_rate': round(bounce_rate, 4),
+                    'complaint_rate': round(complaint_rate, 4),
+                })
+        return result
+
+
+def configuration_set_name(ses_message):
+    mail = ses_message.get('mail', {})
+    names = mail.get('tags', {}).get('ses:configuration-set')
+    if names:
+        return names[0]
+    for header in mail.get('headers', []):
+        if header.get('name', '').lower() == 'x-ses-configuration-set':
+            return header.get('value')
+    return None
+
+
+class LogNotifier:
+    def notify(self, alert):
+        logger.warning(f"SES alert: {alert}")
+
+
+class SignalNotifier:
+    """Send the alert_fired signal; connect receivers to route alerts anywhere"""
+
+    def notify(self, alert):
+        alert_fired.send(sender=AlertEvaluator, alert=alert)
+
+
+class WebhookNotifier:
+    """
+    POST the alert as JSON to SES_TRACKING_ALERT_WEBHOOK_URL.
+
+    Posts from a background thread with a short timeout so a slow endpoint
+    never delays ingest.
+    """
+
+    def __init__(self, url=None, timeout=5):
+        self.url = url or getattr(settings, 'SES_TRACKING_ALERT_WEBHOOK_URL', None)
+        self.timeout = timeout
+
+    def _post(self, payload):
+        import urllib.request
+        request = urllib.request.Request(
+            self.url,
+            data=payload,
+            method='POST',
+            headers={'Content-Type': 'application/json'},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except OSError as e:
+            logger.error(f"Alert webhook to {self.url} failed: {str(e)}")
+
+    def notify(self, alert):
+        if not self.url:
+            return
+        payload = json.dumps(alert.as_dict()).encode('utf-8')
+        threading.Thread(target=self._post, args=(payload,), daemon=True).start()
+
+
+alert_evaluator = AlertEvaluator()
@@ -0,0 +1,758 @@
+# ses_tracking/api.py
+"""
+REST API for the dashboard: events and daily stats viewsets, exports.
+"""
+import csv
+import hashlib
+import json
+import time
+from django.utils import timezone
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.conf import settings
+
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.pagination import PageNumberPagination
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.utils.cache import get_conditional_response, patch_cache_control
+from datetime import datetime, timedelta
+from . import metrics
+from .aggregates import GROUP_BY_FUNCTIONS, get_aggregate
+from .latency import latency_buffer, merge_latency
+from .models import DailyEmailStats, DeliveryLatencySketch, SESEvent
+from .routers import replica_reads
+from .serializers import (
+    DAILY_STATS_VALUES_FIELDS,
+    SES_EVENT_VALUES_FIELDS,
+    DailyEmailStatsSerializer,
+    DailyEmailStatsSummarySerializer,
+    SESEventSerializer,
+    serialize_daily_stats_rows,
+    serialize_event_rows,
+)
+
+class DataTablesPagination(PageNumberPagination):
+    """
+    Custom pagination for DataTables
+    Handles draw, start, length parameters from DataTables
+    """
+    page_size_query_param = 'length'
+    page_size = 10
+    max_page_size = 100
+    
+    def get_paginated_response(self, data):
+        request = self.request
+        draw = int(request.query_params.get('draw', 1))
+        
+        return Response({
+            'draw': draw,
+            'recordsTotal': self.page.paginator.count,
+            'recordsFiltered': self.page.paginator.count,
+            'data': data
+        })
+
+class Echo:
+    """File-like object that returns written values, for streaming csv.writer output"""
+    def write(self, value):
+        return value
+
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def streaming_export(rows, fieldnames, file_format, filename):
+    """
+    Stream serialized rows as CSV or NDJSON.
+    
+    rows should be a lazy iterator (e.g. over queryset.iterator()) so memory
+    stays constant regardless of the result size.
+    """
+    if file_format == 'ndjson':
+        content = (json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in rows)
+    else:
+        writer = csv.DictWriter(Echo(), fieldnames=fieldnames, extrasaction='ignore')
+        
+        def content_iter():
+            yield writer.writerow(dict(zip(fieldnames, fieldnames)))
+            for row in rows:
+                yield writer.writerow(row)
+        
+        content = content_iter()
+    
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[file_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{file_format}"'
+    return response
+
+
+def get_export_format(request):
+    """Return the requested export format, or None if it is not supported"""
+    file_format = request.query_params.get('file_format', 'csv').lower()
+    return file_format if file_format in EXPORT_FORMATS else None
+
+
+class ReplicaReadsMixin:
+    """Run safe-method requests inside replica_reads() (see routers.py)"""
+    
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class InstrumentedViewSetMixin:
+    """Record query count and duration per API request when metrics are enabled"""
+    
+    def dispatch(self, request, *args, **kwargs):
+        started = time.perf_counter()
+        with metrics.count_queries() as queries:
+            response = super().dispatch(request, *args, **kwargs)
+        labels = {
+            'view': type(self).__name__,
+            'action': getattr(self, 'action', None) or request.method.lower(),
+        }
+        metrics.observe('api_queries', queries[0], **labels)
+        metrics.observe('api_duration_seconds', time.perf_counter() - started, **labels)
+        return response
+
+
+class SESEventViewSet(InstrumentedViewSetMixin, ReplicaReadsMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for viewing SES Events (bounces and complaints)
+    Optimized for DataTables integration.
+    """
+    queryset = SESEvent.objects.filter(
+        Q(event_type='bounce') | Q(event_type='complaint')
+    ).select_related().order_by('-timestamp')
+    serializer_class = SESEventSerializer
+    pagination_class = DataTablesPagination
+    
+    ORDER_COLUMNS = [
+        'timestamp',
+        'email',
+        'email_subject__value',
+        'email_to',
+        'event_type',
+        'bounce_type',
+    ]
+    
+    def get_filters(self, include_event_type=True):
+        """
+        DataTables search, event type and date range filters as one Q,
+        shared by the list, export and dashboard endpoints
+        """
+        criteria = Q(event_type='bounce') | Q(event_type='complaint')
+        
+        # Handle DataTables search
+        search_value = self.request.query_params.get('search[value]', '')
+        if search_value:
+            criteria &= (
+                Q(email__icontains=search_value) |
+                Q(email_to__icontains=search_value) |
+                Q(email_subject__value__icontains=search_value) |
+                Q(bounce_type__icontains=search_value)
+            )
+        
+        # Filter by event type
+        event_type = self.request.query_params.get('event_type') if include_event_type else None
+        if event_type:
+            criteria &= Q(event_type=event_type)
+        
+        # Custom date range filtering
+        start_date = self.request.query_params.get('start_date')
+        end_date = self.request.query_params.get('end_date')
+        
+        if start_date:
+            try:
+                start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+                criteria &= Q(timestamp__date__gte=start_date)
+            except ValueError:
+                pass
+        
+        if end_date:
+            try:
+                end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+                criteria &= Q(timestamp__date__lte=end_date)
+            except ValueError:
+                pass
+        
+        return criteria
+    
+    def get_ordering(self):
+        """DataTables ordering (order[0][column], order[0][dir]) as an order_by field"""
+        order_column = self.request.query_params.get('order[0][column]')
+        order_dir = self.request.query_params.get('order[0][dir]', 'desc')
+        
+        if order_column:
+            try:
+                column_index = int(order_column)
+                if 0 <= column_index < len(self.ORDER_COLUMNS):
+                    order_field = self.ORDER_COLUMNS[column_index]
+                    if order_dir == 'desc':
+                        order_field = f'-{order_field}'
+                    return order_field
+            except (ValueError, IndexError):
+                pass
+        return '-timestamp'
+    
+    def get_queryset(self):
+        """
+        Custom queryset with search and filtering for DataTables
+        """
+        return SESEvent.objects.filter(self.get_filters()).select_related(
+            'email_subject', 'bounce_sub_type', 'complaint_feedback_type', 'reject_reason'
+        ).order_by(self.get_ordering())
+    
+    def list(self, request, *args, **kwargs):
+        """
+        Override list to handle DataTables pagination properly
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        
+        # Handle DataTables pagination
+        start = int(request.query_params.get('start', 0))
+        length = int(request.query_params.get('length', 10))
+        
+        if length > 0:
+            page = (start // length) + 1
+            request.query_params._mutable = True
+            request.query_params['page'] = page
+            request.query_params['length'] = length
+            request.query_params._mutable = False
+        
+        # Lean path: .values() rows + precomputed display maps instead of
+        # SESEventSerializer (same output, see serializers.serialize_event_rows)
+        queryset = queryset.values(*SES_EVENT_VALUES_FIELDS)
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(list(serialize_event_rows(page)))
+        
+        return Response(list(serialize_event_rows(queryset)))
+    
+    @action(detail=False, methods=['get'])
+    def dashboard(self, request):
+        """
+        Bootstrap payload for the bounces & complaints page in one request
+        Query params:
+        - length: rows per tab (default 25, max 100)
+        - Same filters as the list endpoint (search[value], order, start_date,
+          end_date); event_type is ignored, every tab is returned.
+        
+        Returns:
+        - counts: matching events per tab (all, bounce, complaint)
+        - tabs: first page of each tab, shaped like a DataTables list response
+          minus 'draw'
+        - today: today's per-type event counts and bounce/complaint/delivery
+          rates
+        
+        Counts for the tabs and for today come from one grouped query each;
+        each tab's page is one LIMIT query, so the page costs five queries
+        instead of a COUNT and a page query per table plus the summary.
+        """
+        try:
+            length = int(request.query_params.get('length', 25))
+        except ValueError:
+            length = 25
+        length = max(1, min(length, DataTablesPagination.max_page_size))
+        
+        criteria = self.get_filters(include_event_type=False)
+        now = timezone.localtime() if settings.USE_TZ else datetime.now()
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        today = Q(timestamp__gte=today_start)
+        
+        # Two grouped counts rather than one over (criteria | today): the OR
+        # would keep either from using the event_type and timestamp indexes
+        matching = dict(
+            SESEvent.objects.filter(criteria).values('event_type').annotate(
+                count=Count('pk')
+            ).order_by().values_list('event_type', 'count')
+        )
+        today_counts = dict(
+            SESEvent.objects.filter(today).values('event_type').annotate(
+                count=Count('pk')
+            ).order_by().values_list('event_type', 'count')
+        )
+        
+        counts = {
+            'all': matching.get('bounce', 0) + matching.get('complaint', 0),
+            'bounce': matching.get('bounce', 0),
+            'complaint': matching.get('complaint', 0),
+        }
+        
+        ordering = self.get_ordering()
+        tabs = {}
+        for tab, tab_filter in (
+            ('all', criteria),
+            ('bounce', criteria & Q(event_type='bounce')),
+            ('complaint', criteria & Q(event_type='complaint')),
+        ):
+            # Skip the page query when the count already says it is empty
+            rows = []
+            if counts[tab]:
+                rows = SESEvent.objects.filter(tab_filter).order_by(ordering).values(
+                    *SES_EVENT_VALUES_FIELDS
+                )[:length]
+            tabs[tab] = {
+                'recordsTotal': counts[tab],
+                'recordsFiltered': counts[tab],
+                'data': list(serialize_event_rows(rows)),
+            }
+        
+        # Same rate base as DailyEmailStats.calculate_rates
+        base = today_counts.get('send', 0) or today_counts.get('delivery', 0)
+        
+        def rate(event_type):
+            return round(today_counts.get(event_type, 0) / base * 100, 2) if base else 0
+        
+        return Response({
+            'counts': counts,
+            'tabs': tabs,
+            'today': {
+                'date': today_start.date(),
+                'counts': today_counts,
+                'bounce_rate': rate('bounce'),
+                'complaint_rate': rate('complaint'),
+                'delivery_rate': rate('delivery'),
+            },
+        })
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every matching event as CSV or NDJSON
+        Query params:
+        - file_format: 'csv' (default) or 'ndjson'
+        - Same filters as the list endpoint (search[value], order, event_type,
+          start_date, end_date); pagination parameters are ignored.
+        
+        Example: /api/events/export/?event_type=bounce&start_date=2025-01-01&file_format=ndjson
+        """
+        file_format = get_export_format(request)
+        if file_format is None:
+            return Response(
+                {'error': f"Invalid file_format. Use one of: {', '.join(EXPORT_FORMATS)}"},
+                status=400
+            )
+        
+        chunk_size = getattr(settings, 'SES_TRACKING_EXPORT_CHUNK_SIZE', 2000)
+        # Pin the database now: the rows are streamed after dispatch returns
+        queryset = self.get_queryset()
+        queryset = queryset.using(queryset.db)
+        rows = serialize_event_rows(
+            queryset.values(*SES_EVENT_VALUES_FIELDS).iterator(chunk_size=chunk_size)
+        )
+        filename = f"ses-events-{timezone.now().strftime('%Y%m%d-%H%M%S')}"
+        return streaming_export(rows, SESEventSerializer.Meta.fields, file_format, filename)
+
+
+
+class DailyEmailStatsViewSet(InstrumentedViewSetMixin, ReplicaReadsMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for viewing daily email statistics.
+    Optimized for DataTables integration.
+    
+    Provides:
+    - list: Get all daily stats (DataTables compatible)
+    - retrieve: Get specific day stats
+    - summary: Get lightweight summary
+    - date_range: Get stats for a date range
+    - aggregate: Get aggregated totals for a period
+    """
+    queryset = DailyEmailStats.objects.all()
+    serializer_class = DailyEmailStatsSerializer
+    pagination_class = DataTablesPagination
+    ordering = ['-date']  # Default ordering by date descending
+    
+    def get_queryset(self):
+        """
+        Custom queryset with search and filtering for DataTables
+        """
+        queryset = DailyEmailStats.objects.all()
+        
+        # Handle DataTables search
+        search_value = self.request.query_params.get('search[value]', '')
+        if search_value:
+            queryset = queryset.filter(
+                Q(date__icontains=search_value)
+            )
+        
+        # Handle DataTables ordering
+        order_column = self.request.query_params.get('order[0][column]')
+        order_dir = self.request.query_params.get('order[0][dir]', 'desc')
+        
+        if order_column:
+            columns = [
+                'date',
+                'total_sends', 
+                'total_deliveries',
+                'total_bounces',
+                'total_complaints',
+                'bounce_rate',
+                'complaint_rate',
+                'delivery_rate',
+                'unique_recipients'
+            ]
+            
+            try:
+                column_index = int(order_column)
+                if 0 <= column_index < len(columns):
+                    order_field = columns[column_index]
+                    if order_dir == 'desc':
+                        order_field = f'-{order_field}'
+                    queryset = queryset.order_by(order_field)
+            except (ValueError, IndexError):
+                pass
+        else:
+            # Default ordering
+            queryset = queryset.order_by('-date')
+        
+        # Custom date range filtering
+        start_date = self.request.query_params.get('start_date')
+        end_date = self.request.query_params.get('end_date')
+        
+        if start_date:
+            try:
+                start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+                queryset = queryset.filter(date__gte=start_date)
+            except ValueError:
+                pass
+        
+        if end_date:
+            try:
+                end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+                queryset = queryset.filter(date__lte=end_date)
+            except ValueError:
+                pass
+        
+        return queryset
+    
+    def get_serializer_class(self):
+        """Use summary serializer for summary action"""
+        if self.action == 'summary':
+            return DailyEmailStatsSummarySerializer
+        return DailyEmailStatsSerializer
+    
+    def list(self, request, *args, **kwargs):
+        """
+        Override list to handle DataTables pagination properly
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        
+        # Handle DataTables pagination
+        start = int(request.query_params.get('start', 0))
+        length = int(request.query_params.get('length', 10))
+        
+        if length > 0:
+            page = (start // length) + 1
+            request.query_params._mutable = True
+            request.query_params['page'] = page
+            request.query_params['length'] = length
+            request.query_params._mutable = False
+        
+        # Lean path: .values() rows instead of DailyEmailStatsSerializer
+        # (same output, see serializers.serialize_daily_stats_rows)
+        queryset = queryset.values(*DAILY_STATS_VALUES_FIELDS)
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(list(serialize_daily_stats_rows(page)))
+        
+        return Response(list(serialize_daily_stats_rows(queryset)))
+    
+    def conditional_response(self, request, queryset, key, build, empty_response=None):
+        """
+        Serve a stats payload with an ETag validator.
+        
+        The ETag comes from Max('updated_at') and the row count over
+        queryset, so an unchanged poll costs one aggregate query and returns
+        304. Built payloads are cached server-side under their ETag, which
+        changes whenever a covered day is re-aggregated. When queryset is
+        empty and empty_response is given, that response is returned instead.
+        
+        No Last-Modified is sent: deleting a row other than the newest
+        leaves Max('updated_at') unchanged, so If-Modified-Since alone would
+        answer 304 with a stale payload.
+        """
+        state = queryset.order_by().aggregate(
+            last_modified=Max('updated_at'),
+            count=Count('id'),
+        )
+        if not state['count'] and empty_response is not None:
+            return empty_response
+        last_modified = state['last_modified']
+        
+        fingerprint = '|'.join([
+            self.action,
+            request.accepted_renderer.format,
+            str(key),
+            last_modified.isoformat() if last_modified else '',
+            str(state['count']),
+        ])
+        digest = hashlib.md5(fingerprint.encode()).hexdigest()
+        etag = f'"{digest}"'
+        
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        
+        timeout = getattr(settings, 'SES_TRACKING_RESPONSE_CACHE_TIMEOUT', 300)
+        cache_key = f'ses_tracking:response:{digest}'
+        data = cache.get(cache_key) if timeout else None
+        if data is None:
+            data = build()
+            if timeout:
+                cache.set(cache_key, data, timeout=timeout)
+        
+        response = Response(data)
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """
+        Get lightweight summary of recent stats
+        Query params:
+        - days: Number of recent days (default: 7)
+        
+        Example: /api/ses-stats/summary/?days=30
+        """
+        days = int(request.query_params.get('days', 7))
+        start_date = datetime.now().date() - timedelta(days=days)
+        
+        queryset = self.queryset.filter(date__gte=start_date).order_by('-date')
+        
+        def build():
+            serializer = self.get_serializer(queryset, many=True)
+            return {
+                'period': f'Last {days} days',
+                'start_date': start_date,
+                'end_date': datetime.now().date(),
+                'stats': serializer.data
+            }
+        
+        return self.conditional_response(request, queryset, (start_date, days), build)
+    
+    @action(detail=False, methods=['get'])
+    def date_range(self, request):
+        """
+        Get stats for a specific date range
+        Query params:
+        - start_date: Start date (YYYY-MM-DD) - required
+        - end_date: End date (YYYY-MM-DD) - required
+        
+        Example: /api/ses-stats/date_range/?start_date=2025-11-01&end_date=2025-11-07
+        """
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+        
+        if not start_date or not end_date:
+            return Response(
+                {'error': 'Both start_date and end_date are required (YYYY-MM-DD)'},
+                status=400
+            )
+        
+        try:
+            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format. Use YYYY-MM-DD'},
+                status=400
+            )
+        
+        queryset = self.queryset.filter(date__gte=start_date, date__lte=end_date).order_by('-date')
+        
+        def build():
+            serializer = self.get_serializer(queryset, many=True)
+            stats = serializer.data
+            return {
+                'start_date': start_date,
+                'end_date': end_date,
+                'count': len(stats),
+                'stats': stats
+            }
+        
+        return self.conditional_response(request, queryset, (start_date, end_date), build)
+    
+    @action(detail=False, methods=['get'])
+    def aggregate(self, request):
+        """
+        Get aggregated totals for a period
+        Query params:
+        - start_date: Start date (YYYY-MM-DD) - optional (defaults to 30 days ago)
+        - end_date: End date (YYYY-MM-DD) - optional (defaults to today)
+        - group_by: 'week' or 'month' - optional, adds per-period totals
+        
+        Rates are weighted by volume (summed bounces / summed sends), not
+        averaged across days.
+        
+        Example: /api/ses-stats/aggregate/?start_date=2025-11-01&end_date=2025-11-07&group_by=week
+        """
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+        group_by = request.query_params.get('group_by') or None
+        
+        try:
+            if not start_date:
+                start_date = (datetime.now().date() - timedelta(days=30))
+            else:
+                start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+            
+            if not end_date:
+                end_date = datetime.now().date()
+            else:
+                end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format. Use YYYY-MM-DD'},
+                status=400
+            )
+        
+        if group_by and group_by not in GROUP_BY_FUNCTIONS:
+            return Response(
+                {'error': f"Invalid group_by. Use one of: {', '.join(GROUP_BY_FUNCTIONS)}"},
+                status=400
+            )
+        
+        def build():
+            return self._build_aggregate(start_date, end_date, group_by)
+        
+        queryset = self.queryset.filter(date__gte=start_date, date__lte=end_date)
+        return self.conditional_response(
+            request, queryset, (start_date, end_date, group_by), build
+        )
+    
+    def _build_aggregate(self, start_date, end_date, group_by):
+        result = get_aggregate(start_date, end_date, group_by)
+        totals = result['totals']
+        
+        response = {
+            'period': {
+                'start_date': start_date,
+                'end_date': end_date,
+                'days': (end_date - start_date).days + 1
+            },
+            'totals': {
+                **totals,
+                'overall_bounce_rate': totals['bounce_rate'],
+                'overall_complaint_rate': totals['complaint_rate'],
+                'overall_delivery_rate': totals['delivery_rate'],
+            }
+        }
+        if group_by:
+            response['group_by'] = group_by
+            response['groups'] = result['groups']
+        
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def latency(self, request):
+        """
+        Delivery latency percentiles for a period, merged from the daily
+        per-domain sketches
+        Query params:
+        - start_date: Start date (YYYY-MM-DD) - optional (defaults to 30 days ago)
+        - end_date: End date (YYYY-MM-DD) - optional (defaults to today)
+        - domain: Comma-separated recipient domains - optional
+        - limit: Number of domains listed, busiest first (default: 20)
+        
+        Latencies are in milliseconds, within 1% of the exact percentile.
+        
+        Example: /api/ses-stats/latency/?start_date=2025-11-01&domain=gmail.com,outlook.com
+        """
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+        
+        try:
+            if not start_date:
+                start_date = (datetime.now().date() - timedelta(days=30))
+            else:
+                start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+            
+            if not end_date:
+                end_date = datetime.now().date()
+            else:
+                end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+            
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format (use YYYY-MM-DD) or limit'},
+                status=400
+            )
+        
+        queryset = DeliveryLatencySketch.objects.filter(date__gte=start_date, date__lte=end_date)
+        domains = sorted({
+            d.strip().lower() for d in request.query_params.get('domain', '').split(',') if d.strip()
+        })
+        if domains:
+            queryset = queryset.filter(domain__in=domains)
+        
+        # Merge this process's buffered samples first so they are never
+        # reported late (other processes flush on their own timer)
+        latency_buffer.flush()
+        
+        def build():
+            rows = queryset.values_list('domain', 'processing_time', 'end_to_end').iterator()
+            return {
+                'start_date': start_date,
+                'end_date': end_date,
+                **merge_latency(rows, limit=limit),
+            }
+        
+        return self.conditional_response(
+            request, queryset, (start_date, end_date, ','.join(domains), limit), build
+        )
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every matching daily stats row as CSV or NDJSON
+        Query params:
+        - file_format: 'csv' (default) or 'ndjson'
+        - Same filters as the list endpoint (search[value], order, start_date,
+          end_date); pagination parameters are ignored.
+        
+        Example: /api/ses-stats/export/?start_date=2025-01-01&end_date=2025-06-30
+        """
+        file_format = get_export_format(request)
+        if file_format is None:
+            return Response(
+                {'error': f"Invalid file_format. Use one of: {', '.join(EXPORT_FORMATS)}"},
+                status=400
+            )
+        
+        chunk_size = getattr(settings, 'SES_TRACKING_EXPORT_CHUNK_SIZE', 2000)
+        # Pin the database now: the rows are streamed after dispatch returns
+        queryset = self.get_queryset()
+        queryset = queryset.using(queryset.db)
+        rows = serialize_daily_stats_rows(
+            queryset.values(*DAILY_STATS_VALUES_FIELDS).iterator(chunk_size=chunk_size)
+        )
+        filename = f"ses-daily-stats-{timezone.now().strftime('%Y%m%d-%H%M%S')}"
+        return streaming_export(rows, DailyEmailStatsSerializer.Meta.fields, file_format, filename)
+    
+    @action(detail=False, methods=['get'])
+    def latest(self, request):
+        """
+        Get the most recent daily stats
+        
+        Example: /api/ses-stats/latest/
+        """
+        def build():
+            serializer = self.get_serializer(self.queryset.latest('date'))
+            return serializer.data
+        
+        # The validator aggregate doubles as the emptiness check
+        return self.conditional_response(
+            request, self.queryset, 'latest', build,
+            empty_response=Response({'error': 'No statistics available yet'}, status=404),
+        )
@@ -1,14 +1,138 @@
 from django.conf import settings
+from django.db import DatabaseError
+from email.utils import parseaddr
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import threading
+import uuid
 
 logger = logging.getLogger(__name__)
 
+from django.core.mail.backends.base import BaseEmailBackend
 from django.core.mail.backends.smtp import EmailBackend as SMTPBackend
+from django.core.mail.message import make_msgid, sanitize_address
+from django.core.mail.utils import DNS_NAME
+from django.utils import timezone
+from .ratelimit import get_rate_limiter
 
-class SESBackend(SMTPBackend):
+class SuppressionFilterMixin:
+    """
+    Removes recipients on the suppression list (see ses_tracking.suppression)
+    before sending; messages left without recipients are skipped.
+    """
+    
+    def init_suppression_filter(self):
+        self.filter_suppressed = getattr(settings, 'SES_TRACKING_FILTER_SUPPRESSED', True)
+        
+        # Populated by send_messages: what the suppression filter dropped
+        self.suppressed_recipients = []
+        self.skipped_messages = []
+    
+    def remove_suppressed_recipients(self, email_messages):
+        """
+        Drop suppressed addresses from to/cc/bcc of every message.
+        
+        All recipients of the batch are checked in one set intersection, so a
+        clean batch costs a single lookup. Returns the messages that still have
+        recipients.
+        """
+        self.suppressed_recipients = []
+        self.skipped_messages = []
+        
+        addresses = {
+            parseaddr(address)[1].lower()
+            for message in email_messages
+            for address in message.recipients()
+        }
+        try:
+            from .suppression import suppression_cache
+            suppressed = suppression_cache.suppressed_among(addresses)
+        except DatabaseError:
+            logger.warning("Suppression list unavailable, sending without filtering", exc_info=True)
+            return email_messages
+        
+        if not suppressed:
+            return email_messages
+        
+        remaining = []
+        for message in email_messages:
+            for attr in ('to', 'cc', 'bcc'):
+                kept = []
+                for address in getattr(message, attr):
+                    if parseaddr(address)[1].lower() in suppressed:
+                        self.suppressed_recipients.append(address)
+                    else:
+                        kept.append(address)
+                setattr(message, attr, kept)
+            
+            if message.recipients():
+                remaining.append(message)
+            else:
+                self.skipped_messages.append(message)
+        
+        logger.warning(
+            f"Suppressed {len(self.suppressed_recipients)} recipient(s), "
+            f"skipped {len(self.skipped_messages)} message(s): "
+            f"{', '.join(sorted(set(self.suppressed_recipients)))}"
+        )
+        return remaining
+
+
+class OutboundLogMixin:
+    """
+    Records an OutboundMessage row per sent message, written with one bulk
+    insert per send_messages call. Messages get an explicit Message-ID header
+    before they are built so the row and later SES events share it.
+    
+    Deliveries are joined back to the row by the delivered message's own ids
+    (see webhooks.mark_delivered): the SES MessageId when SESApiBackend
+    recorded one, the Message-ID header otherwise.
+    """
+    
+    def init_outbound_log(self):
+        self.log_outbound = getattr(settings, 'SES_TRACKING_OUTBOUND_LOG', True)
+        self._outbound = []
+    
+    def ensure_message_id(self, email_message):
+        """Return the message's Message-ID (without brackets), assigning one if needed"""
+        for name, value in email_message.extra_headers.items():
+            if name.lower() == 'message-id':
+                return value.strip().strip('<>')
+        message_id = make_msgid(domain=DNS_NAME)
+        email_message.extra_headers['Message-ID'] = message_id
+        return message_id.strip('<>')
+    
+    def record_outbound(self, email_message, ses_message_id=None):
+        if not self.log_outbound:
+            return
+        from .models import OutboundMessage
+        self._outbound.append(OutboundMessage(
+            message_id=self.ensure_message_id(email_message),
+            ses_message_id=ses_message_id,
+            recipients=', '.join(email_message.recipients()),
+            subject_hash=OutboundMessage.hash_subject(email_message.subject),
+            sent_at=timezone.now(),
+        ))
+    
+    def flush_outbound_log(self):
+        rows, self._outbound = self._outbound, []
+        if not rows:
+            return
+        from .models import OutboundMessage
+        try:
+            OutboundMessage.objects.bulk_create(rows, batch_size=500)
+        except DatabaseError:
+            # The messages are already sent; never fail the send over the log
+            logger.warning(f"Could not record {len(rows)} outbound message(s)", exc_info=True)
+
+
+class SESBackend(SuppressionFilterMixin, OutboundLogMixin, SMTPBackend):
     """
     Custom email backend that wraps SMTP backend and adds SES configuration set header
     for tracking bounces/complaints.
+    
+    Recipients on the suppression list (see ses_tracking.suppression) are removed
+    before sending; messages left without recipients are skipped.
     """
     
     def __init__(self, fail_silently=False, **kwargs):
@@ -17,6 +141,63 @@ class SESBackend(SMTPBackend):
         # Get SES settings from Django settings
         self.aws_region = getattr(settings, 'AWS_SES_REGION', 'us-east-1')
         self.configuration_set = getattr(settings, 'AWS_SES_CONFIGURATION_SET', 'rmu-config-set')
+        self.init_suppression_filter()
+        self.init_outbound_log()
+        
+        # Client-side pacing, only when a send rate is configured
+        max_send_rate = getattr(settings, 'AWS_SES_MAX_SEND_RATE', None)
+        self.rate_limiter = get_rate_limiter(max_send_rate) if max_send_rate else None
+        self.rate_limit_wait = 0.0  # Seconds spent waiting on the send-rate limiter
+        
+        # Opt-in reuse of authenticated SMTP sessions across backend instances
+        self.use_pool = getattr(settings, 'SES_TRACKING_SMTP_POOL', False)
+        self._pooled = None
+    
+    def send_messages(self, email_messages):
+        if self.filter_suppressed and email_messages:
+            email_messages = self.remove_suppressed_recipients(email_messages)
+        self.rate_limit_wait = 0.0
+        try:
+            return super().send_messages(email_messages)
+        finally:
+            self.flush_outbound_log()
+    
+    @property
+    def pool_key(self):
+        return (self.host, self.port, self.username, self.use_tls, self.use_ssl)
+    
+    def open(self):
+        """
+        Check out a pooled session when pooling is enabled, opening (and
+        later pooling) a new one if none is available.
+        """
+        if not self.use_pool:
+            return super().open()
+        if self.connection:
+            return False
+        
+        from .smtp_pool import PooledConnection, get_pool
+        pooled = get_pool().checkout(self.pool_key)
+        if pooled is not None:
+            self.connection = pooled.connection
+            self._pooled = pooled
+            return True
+        
+        opened = super().open()
+        if self.connection:
+            self._pooled = PooledConnection(self.connection)
+        return opened
+    
+    def close(self):
+        """Return the session to the pool instead of quitting when pooling"""
+        if not self.use_pool or self._pooled is None:
+            return super().close()
+        
+        from .smtp_pool import get_pool
+        with self._lock:
+            get_pool().checkin(self.pool_key, self._pooled)
+            self.connection = None
+            self._pooled = None
     
     def _send(self, email_message):
         # Add configuration set header
@@ -24,6 +205,218 @@ class SESBackend(SMTPBackend):
             email_message.extra_headers = {}
         
         email_message.extra_headers['X-SES-CONFIGURATION-SET'] = self.configuration_set
+        if self.log_outbound:
+            self.ensure_message_id(email_message)
+        
+        if self.rate_limiter is not None and email_message.recipients():
+            self.rate_limit_wait += self.rate_limiter.acquire()
         
         # Call the original _send method of the parent SMTP backend
-        return super()._send(email_message)
\ No newline at end of file
+        try:
+            sent = super()._send(email_message)
+        except Exception:
+            if self._pooled is not None:
+                self._pooled.broken = True
+            raise
+        
+        if self._pooled is not None:
+            if sent:
+                self._pooled.messages_sent += 1
+            else:
+                # Failed silently; the session may be unusable, don't reuse it
+                self._pooled.broken = True
+        if sent:
+            self.record_outbound(email_message)
+        return sent
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_ses_client(region):
+    """
+    Return the process-wide SES v2 client for region.
+    
+    boto3 clients are thread-safe, so every SESApiBackend instance and worker
+    thread shares one client and its HTTPS connection pool.
+    """
+    with _clients_lock:
+        if region not in _clients:
+            import boto3
+            from botocore.config import Config
+            
+            max_workers = getattr(settings, 'AWS_SES_MAX_CONCURRENCY', 10)
+            _clients[region] = boto3.client(
+                'sesv2',
+                region_name=region,
+                config=Config(max_pool_connections=max_workers, retries={'mode': 'adaptive'}),
+            )
+        return _clients[region]
+
+
+class StubSESClient:
+    """
+    In-memory stand-in for the SES v2 client, for tests.
+    
+    Usage: SESApiBackend(client=StubSESClient())
+    """
+    
+    def __init__(self, max_send_rate=14.0, fail_for=()):
+        self.max_send_rate = max_send_rate
+        self.fail_for = set(fail_for)  # Recipient addresses that raise on send
+        self.sent = []
+        self._lock = threading.Lock()
+    
+    def send_email(self, **kwargs):
+        recipients = kwargs.get('Destination', {}).get('ToAddresses', [])
+        if self.fail_for.intersection(recipients):
+            raise RuntimeError(f"Stub send failure for {', '.join(recipients)}")
+        
+        message_id = f"{uuid.uuid4()}-000000"
+        with self._lock:
+            self.sent.append({**kwargs, 'MessageId': message_id})
+        return {'MessageId': message_id}
+    
+    def get_account(self):
+        return {
+            'SendQuota': {
+                'Max24HourSend': 50000.0,
+                'MaxSendRate': self.max_send_rate,
+                'SentLast24Hours': float(len(self.sent)),
+            }
+        }
+
+
+_send_quotas = {}
+
+
+class PartialSendError(Exception):
+    """
+    Raised by SESApiBackend.send_messages (unless fail_silently) when some
+    messages of a batch failed. The others were sent and must not be
+    retried: their SES message ids are in sent_message_ids.
+    """
+    
+    def __init__(self, num_sent, num_failed, sent_message_ids):
+        self.num_sent = num_sent
+        self.num_failed = num_failed
+        self.sent_message_ids = sent_message_ids
+        super().__init__(
+            f"{num_failed} message(s) failed to send through SES, {num_sent} sent"
+        )
+
+
+class SESApiBackend(SuppressionFilterMixin, OutboundLogMixin, BaseEmailBackend):
+    """
+    Email backend that sends through the SES v2 API (SendEmail with raw content)
+    instead of SMTP.
+    
+    Messages are sent concurrently from a bounded thread pool over a shared
+    boto3 client, paced by a token bucket to the account's maximum send rate. The SES MessageId
+    returned for each message is stored on it as ``ses_message_id`` and
+    matches SESEvent.message_id of the events SES later reports.
+    """
+    
+    def __init__(self, fail_silently=False, client=None, **kwargs):
+        super().__init__(fail_silently=fail_silently, **kwargs)
+        
+        self.aws_region = getattr(settings, 'AWS_SES_REGION', 'us-east-1')
+        self.configuration_set = getattr(settings, 'AWS_SES_CONFIGURATION_SET', 'rmu-config-set')
+        self.max_workers = getattr(settings, 'AWS_SES_MAX_CONCURRENCY', 10)
+        self._client = client
+        self.init_suppression_filter()
+        self.init_outbound_log()
+        
+        # Populated by send_messages
+        self.sent_message_ids = []
+        self.rate_limit_wait = 0.0  # Seconds spent waiting on the send-rate limiter
+    
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_ses_client(self.aws_region)
+        return self._client
+    
+    def get_max_send_rate(self):
+        """
+        Messages per second allowed for the account.
+        
+        AWS_SES_MAX_SEND_RATE takes precedence; otherwise the quota is read
+        once per process and region from GetAccount.
+        """
+        rate = getattr(settings, 'AWS_SES_MAX_SEND_RATE', None)
+        if rate:
+            return float(rate)
+        if self.aws_region not in _send_quotas:
+            try:
+                _send_quotas[self.aws_region] = float(
+                    self.client.get_account()['SendQuota']['MaxSendRate']
+                )
+            except Exception:
+                logger.warning("Could not read SES send quota, pacing at 1 message/second", exc_info=True)
+                return 1.0
+        return _send_quotas[self.aws_region]
+    
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        
+        if self.filter_suppressed:
+            email_messages = self.remove_suppressed_recipients(email_messages)
+        
+        self.sent_message_ids = []
+        self.rate_limit_wait = 0.0
+        email_messages = [message for message in email_messages if message.recipients()]
+        if not email_messages:
+            return 0
+        
+        limiter = get_rate_limiter(self.get_max_send_rate())
+        
+        def send(message):
+            return limiter.acquire(), self._send(message)
+        
+        workers = max(1, min(self.max_workers, len(email_messages)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(send, message) for message in email_messages]
+        
+        # Collect every result before raising, so the messages that did go
+        # out are recorded and logged for correlation either way
+        num_sent = 0
+        errors = []
+        try:
+            for message, future in zip(email_messages, futures):
+                try:
+                    wait, message_id = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    logger.error("Error sending message through SES API", exc_info=True)
+                    continue
+                self.rate_limit_wait += wait
+                message.ses_message_id = message_id
+                self.sent_message_ids.append(message_id)
+                self.record_outbound(message, ses_message_id=message_id)
+                num_sent += 1
+        finally:
+            self.flush_outbound_log()
+        
+        if errors and not self.fail_silently:
+            raise PartialSendError(num_sent, len(errors), list(self.sent_message_ids)) from errors[0]
+        return num_sent
+    
+    def _send(self, email_message):
+        encoding = email_message.encoding or settings.DEFAULT_CHARSET
+        from_email = sanitize_address(email_message.from_email, encoding)
+        recipients = [sanitize_address(addr, encoding) for addr in email_message.recipients()]
+        if self.log_outbound:
+            self.ensure_message_id(email_message)
+        message = email_message.message()
+        
+        response = self.client.send_email(
+            FromEmailAddress=from_email,
+            Destination={'ToAddresses': recipients},
+            Content={'Raw': {'Data': message.as_bytes(linesep='\r\n')}},
+            ConfigurationSetName=self.configuration_set,
+        )
+        return response['MessageId']
+
@@ -0,0 +1,633 @@
+# ses_tracking/benchmarks.py
+"""
+Synthetic benchmarks for ses_tracking hot paths.
+
+Run through the ``benchmark_ses_tracking`` management command. Every suite
+writes its synthetic data inside a transaction that is rolled back, so the
+benchmarks can be pointed at a copy of a real database without leaving rows
+behind.
+"""
+import json
+import platform
+import random
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+import django
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import DailyEmailStats, SESEvent
+
+
+SUITES = {}
+
+
+class _Rollback(Exception):
+    pass
+
+
+def suite(name):
+    """Register a benchmark suite under name"""
+    def decorator(func):
+        SUITES[name] = func
+        return func
+    return decorator
+
+
+def timed(func, repeat=5):
+    """Run func repeat times and return timing statistics in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        'repeat': repeat,
+        'min_ms': round(min(samples), 3),
+        'median_ms': round(statistics.median(samples), 3),
+        'mean_ms': round(statistics.mean(samples), 3),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+DOMAINS = ['example.com', 'example.org', 'mail.example.net', 'school.example.edu']
+
+
+def synthetic_address(rng):
+    return f"user{rng.randint(1, 10 ** 6)}@{rng.choice(DOMAINS)}"
+
+
+def synthetic_notification(event_type='bounce', recipients=1, rng=None, timestamp=None):
+    """
+    Build an SES event notification shaped like the ones SNS delivers.
+
+    Multi-recipient sends carry every destination, and the headers list
+    mirrors a real message (Received chains, DKIM, list headers).
+    """
+    rng = rng or random.Random()
+    timestamp = (timestamp or timezone.now()).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    addresses = [synthetic_address(rng) for _ in range(recipients)]
+    message_id = f"{uuid.UUID(int=rng.getrandbits(128))}-000000"
+    subject = f"Campaign {rng.randint(1, 20)}: Your weekly update"
+
+    headers = [
+        {'name': 'Received', 'value': f'from mta{i}.example.com by smtp.example.com; {timestamp}'}
+        for i in range(6)
+    ]
+    headers += [
+        {'name': 'From', 'value': 'Sender <no-reply@example.com>'},
+        {'name': 'To', 'value': ', '.join(addresses)},
+        {'name': 'Subject', 'value': subject},
+        {'name': 'Message-ID', 'value': f'<{uuid.UUID(int=rng.getrandbits(128))}@example.com>'},
+        {'name': 'MIME-Version', 'value': '1.0'},
+        {'name': 'Content-Type', 'value': 'multipart/alternative; boundary="b1"'},
+        {'name': 'DKIM-Signature', 'value': 'v=1; a=rsa-sha256; ' + 'x' * 380},
+        {'name': 'List-Unsubscribe', 'value': '<mailto:unsubscribe@example.com>'},
+        {'name': 'X-SES-CONFIGURATION-SET', 'value': 'bench-config-set'},
+    ]
+
+    message = {
+        'eventType': {
+            'bounce': 'Bounce',
+            'complaint': 'Complaint',
+            'delivery': 'Delivery',
+            'send': 'Send',
+        }[event_type],
+        'mail': {
+            'timestamp': timestamp,
+            'source': 'no-reply@example.com',
+            'messageId': message_id,
+            'destination': addresses,
+            'headersTruncated': False,
+            'headers': headers,
+            'commonHeaders': {
+                'from': ['Sender <no-reply@example.com>'],
+                'to': addresses,
+                'messageId': message_id,
+                'subject': subject,
+            },
+            'tags': {'ses:configuration-set': ['bench-config-set']},
+        },
+    }
+
+    if event_type == 'bounce':
+        message['bounce'] = {
+            'bounceType': rng.choice(['Permanent', 'Permanent', 'Transient', 'Undetermined']),
+            'bounceSubType': rng.choice(['General', 'NoEmail', 'MailboxFull']),
+            'bouncedRecipients': [
+                {'emailAddress': a, 'action': 'failed', 'status': '5.1.1',
+                 'diagnosticCode': 'smtp; 550 5.1.1 user unknown'}
+                for a in addresses
+            ],
+            'timestamp': timestamp,
+            'feedbackId': message_id,
+        }
+    elif event_type == 'complaint':
+        message['complaint'] = {
+            'complainedRecipients': [{'emailAddress': a} for a in addresses],
+            'timestamp': timestamp,
+            'feedbackId': message_id,
+            'complaintFeedbackType': 'abuse',
+        }
+    elif event_type == 'delivery':
+        message['delivery'] = {
+            'timestamp': timestamp,
+            'processingTimeMillis': rng.randint(200, 20000),
+            'recipients': addresses,
+            'smtpResponse': '250 2.6.0 Message received',
+        }
+
+    return message
+
+
+def synthetic_events(count, rng=None, days=30, end=None, compact=False):
+    """
+    Build unsaved SESEvent instances spread over the days before end (now).
+
+    compact stores only the mail headers in raw_message, which keeps
+    multi-million row loads for the aggregation suite tractable.
+    """
+    from .lookups import bounce_sub_types, complaint_feedback_types, email_subjects
+
+    rng = rng or random.Random(0)
+    end = end or timezone.now()
+    events = []
+    values = []  # (subject, bounce sub-type, feedback type) per event, interned below
+    for _ in range(count):
+        event_type = rng.choice(['bounce', 'complaint', 'delivery', 'send'])
+        timestamp = end - timedelta(seconds=rng.randint(0, days * 86400 - 1))
+        message = synthetic_notification(event_type, rng=rng, timestamp=timestamp)
+        mail = message['mail']
+        event = SESEvent(
+            event_type=event_type,
+            message_id=mail['messageId'],
+            email=mail['destination'][0],
+            timestamp=timestamp,
+            raw_message={'mail': {'headers': mail['headers'][6:]}} if compact else message,
+        )
+        if event_type == 'bounce':
+            event.bounce_type = message['bounce']['bounceType']
+        event.email_message_id = event.extract_email_message_id
+        event.email_to = event.extract_email_to
+        events.append(event)
+        values.append((
+            event.extract_email_subject,
+            message['bounce']['bounceSubType'] if event_type == 'bounce' else None,
+            'abuse' if event_type == 'complaint' else None,
+        ))
+
+    # One lookup per distinct value for the whole batch
+    subjects, sub_types, feedback_types = zip(*values) if values else ((), (), ())
+    subject_ids = email_subjects.get_ids(subjects)
+    sub_type_ids = bounce_sub_types.get_ids(sub_types)
+    feedback_type_ids = complaint_feedback_types.get_ids(feedback_types)
+    for event, (subject, sub_type, feedback_type) in zip(events, values):
+        event.email_subject_id = subject_ids[subject]
+        event.bounce_sub_type_id = sub_type_ids[sub_type]
+        event.complaint_feedback_type_id = feedback_type_ids[feedback_type]
+    return events
+
+
+def bulk_load_events(count, batch_size=5000, rng=None, **kwargs):
+    """Insert count synthetic events in batches so memory stays flat; return rows/s"""
+    rng = rng or random.Random(0)
+    started = time.perf_counter()
+    remaining = count
+    while remaining > 0:
+        batch = synthetic_events(min(batch_size, remaining), rng=rng, **kwargs)
+        SESEvent.objects.bulk_create(batch, batch_size=batch_size)
+        remaining -= len(batch)
+    elapsed = time.perf_counter() - started
+    return round(count / elapsed, 1) if elapsed else None
+
+
+def synthetic_daily_stats(count):
+    """
+    Build unsaved DailyEmailStats rows.
+
+    Dates start in 1900 so they never collide with the unique date of real
+    rows in the database being benchmarked.
+    """
+    epoch = date(1900, 1, 1)
+    stats = []
+    for offset in range(count):
+        stat = DailyEmailStats(
+            date=epoch + timedelta(days=offset),
+            total_sends=1000 + offset,
+            total_deliveries=950 + offset,
+            total_bounces=30,
+            total_complaints=2,
+            permanent_bounces=20,
+            transient_bounces=10,
+        )
+        stat.calculate_rates()
+        stats.append(stat)
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Suites
+# ---------------------------------------------------------------------------
+
+@suite('serializers')
+def bench_serializers(rows=1000, repeat=5, **options):
+    """ModelSerializer vs the lean .values() path for event and stats rows"""
+    from .serializers import (
+        DAILY_STATS_VALUES_FIELDS,
+        SES_EVENT_VALUES_FIELDS,
+        DailyEmailStatsSerializer,
+        SESEventSerializer,
+        serialize_daily_stats_rows,
+        serialize_event_rows,
+    )
+    from .api import DataTablesPagination
+
+    SESEvent.objects.bulk_create(synthetic_events(rows), batch_size=500)
+    DailyEmailStats.objects.bulk_create(synthetic_daily_stats(min(rows, 3650)), batch_size=500)
+
+    page_size = DataTablesPagination.max_page_size
+    # Join the lookup tables as SESEventViewSet does; without it the
+    # ModelSerializer numbers would mostly measure the N+1 queries
+    events = SESEvent.objects.select_related(
+        'email_subject', 'bounce_sub_type', 'complaint_feedback_type', 'reject_reason'
+    ).order_by('-timestamp')
+    stats = DailyEmailStats.objects.order_by('-date')
+
+    results = {}
+    for label, limit in (('page', page_size), ('export', rows)):
+        results[f'events_{label}_model_serializer'] = timed(
+            lambda: SESEventSerializer(list(events[:limit]), many=True).data, repeat)
+        results[f'events_{label}_lean'] = timed(
+            lambda: list(serialize_event_rows(events.values(*SES_EVENT_VALUES_FIELDS)[:limit])),
+            repeat)
+        results[f'stats_{label}_model_serializer'] = timed(
+            lambda: DailyEmailStatsSerializer(list(stats[:limit]), many=True).data, repeat)
+        results[f'stats_{label}_lean'] = timed(
+            lambda: list(serialize_daily_stats_rows(stats.values(*DAILY_STATS_VALUES_FIELDS)[:limit])),
+            repeat)
+
+    for prefix in ('events_page', 'events_export', 'stats_page', 'stats_export'):
+        baseline = results[f'{prefix}_model_serializer']['median_ms']
+        lean = results[f'{prefix}_lean']['median_ms']
+        results[f'{prefix}_speedup'] = round(baseline / lean, 2) if lean else None
+
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Load test
+# ---------------------------------------------------------------------------
+
+def _percentile(samples, percent):
+    index = min(len(samples) - 1, int(round(percent / 100 * (len(samples) - 1))))
+    return round(samples[index], 3)
+
+
+def load_test(url, requests=1000, concurrency=50, recipients=1, seed=0, timeout=30):
+    """
+    POST synthetic SNS notifications to a running webhook URL.
+
+    Unlike the suites this talks to a live server and its data is NOT
+    rolled back; point it at a disposable database. Returns throughput,
+    latency percentiles and a count of responses per status code (503s
+    are the async endpoint's backpressure).
+    """
+    import urllib.error
+    import urllib.request
+    from collections import Counter
+    from concurrent.futures import ThreadPoolExecutor
+
+    rng = random.Random(seed)
+    bodies = [
+        json.dumps({
+            'Type': 'Notification',
+            'Message': json.dumps(synthetic_notification(
+                rng.choice(['bounce', 'complaint', 'delivery', 'send']), recipients, rng)),
+        }).encode('utf-8')
+        for _ in range(requests)
+    ]
+
+    def post(body):
+        request = urllib.request.Request(
+            url, data=body, method='POST', headers={'Content-Type': 'text/plain; charset=UTF-8'})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except OSError:
+            status = 'error'
+        return status, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(post, bodies))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in outcomes)
+    statuses = Counter(str(status) for status, _ in outcomes)
+    return {
+        'url': url,
+        'requests': requests,
+        'concurrency': concurrency,
+        'elapsed_s': round(elapsed, 3),
+        'requests_per_s': round(requests / elapsed, 1) if elapsed else None,
+        'statuses': dict(statuses),
+        'p50_ms': _percentile(latencies, 50),
+        'p95_ms': _percentile(latencies, 95),
+        'p99_ms': _percentile(latencies, 99),
+        'max_ms': round(latencies[-1], 3),
+    }
+
+
+# Synthetic rows for the ingest and aggregation suites are dated in 1900, like
+# synthetic_daily_stats, so aggregating them never touches real days
+SYNTHETIC_EPOCH_END = datetime(1900, 12, 31, 23, 59, 59, tzinfo=dt_timezone.utc)
+
+
+@contextmanager
+def silenced_alerts():
+    """
+    Keep alerts evaluated (it is part of the ingest cost) but notify no one:
+    synthetic bounce bursts would otherwise reach the configured notifiers.
+    """
+    from .alerts import alert_evaluator
+
+    if not alert_evaluator._configured:
+        alert_evaluator.configure()
+    notifiers, alert_evaluator.notifiers = alert_evaluator.notifiers, []
+    try:
+        yield
+    finally:
+        alert_evaluator.notifiers = notifiers
+
+
+@suite('ingest')
+def bench_ingest(rows=1000, repeat=5, **options):
+    """
+    sns_endpoint throughput and per-event insert cost.
+
+    The view is called through RequestFactory, so middleware and URL
+    routing are excluded and the numbers are independent of the project.
+    Alert notifiers are silenced for the run.
+    """
+    from django.test import RequestFactory
+    from .webhooks import sns_endpoint
+
+    rng = random.Random(0)
+    factory = RequestFactory()
+    results = {}
+
+    cases = {
+        'bounce_1_recipient': ('bounce', 1),
+        'complaint_1_recipient': ('complaint', 1),
+        'delivery_1_recipient': ('delivery', 1),
+        'send_50_recipients': ('send', 50),
+        'bounce_50_recipients': ('bounce', 50),
+    }
+    for label, (event_type, recipients) in cases.items():
+        # Keep the number of events per case comparable
+        count = max(1, min(rows, 2000) // min(recipients, 10))
+        requests = [
+            factory.post(
+                '/sns/ses-events/',
+                data=json.dumps({
+                    'Type': 'Notification',
+                    'Message': json.dumps(synthetic_notification(
+                        event_type, recipients, rng, timestamp=SYNTHETIC_EPOCH_END)),
+                }),
+                content_type='text/plain; charset=UTF-8',
+            )
+            for _ in range(count)
+        ]
+        events_before = SESEvent.objects.count()
+        with silenced_alerts():
+            started = time.perf_counter()
+            for request in requests:
+                sns_endpoint(request)
+            elapsed = time.perf_counter() - started
+        inserted = SESEvent.objects.count() - events_before
+        results[label] = {
+            'requests': count,
+            'events': inserted,
+            'requests_per_s': round(count / elapsed, 1) if elapsed else None,
+            'ms_per_event': round(elapsed * 1000 / inserted, 4) if inserted else None,
+        }
+
+    # Bare insert cost without the webhook pipeline
+    count = max(1, min(rows, 2000))
+    events = synthetic_events(count, rng=rng, end=SYNTHETIC_EPOCH_END)
+    started = time.perf_counter()
+    for event in events:
+        event.pk = None
+        event.save(force_insert=True)
+    results['orm_create_ms_per_event'] = round((time.perf_counter() - started) * 1000 / count, 4)
+
+    events = synthetic_events(count, rng=rng, end=SYNTHETIC_EPOCH_END)
+    started = time.perf_counter()
+    SESEvent.objects.bulk_create(events, batch_size=500)
+    results['orm_bulk_create_ms_per_event'] = round((time.perf_counter() - started) * 1000 / count, 4)
+
+    return results
+
+
+@suite('aggregation')
+def bench_aggregation(rows=1000, repeat=5, days=30, **options):
+    """
+    aggregate_daily_stats runtime over rows synthetic events.
+
+    Use --rows 1000000 or 10000000 for the large-table numbers; loading
+    uses compact raw messages and batched inserts.
+    """
+    from io import StringIO
+    from django.core.management import call_command
+
+    load_rate = bulk_load_events(rows, days=days, end=SYNTHETIC_EPOCH_END, compact=True)
+    end_date = SYNTHETIC_EPOCH_END.date()
+
+    def aggregate():
+        call_command(
+            'aggregate_daily_stats',
+            date=end_date.isoformat(),
+            days=days,
+            force=True,
+            stdout=StringIO(),
+        )
+
+    return {
+        'rows': rows,
+        'days': days,
+        'load_rows_per_s': load_rate,
+        'aggregate_daily_stats': timed(aggregate, repeat),
+    }
+
+
+@suite('api')
+def bench_api(rows=1000, repeat=5, **options):
+    """SESEventViewSet.list latency at the first, middle and last pages"""
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from .api import DataTablesPagination, SESEventViewSet
+
+    bulk_load_events(rows, end=SYNTHETIC_EPOCH_END)
+
+    # An unsaved superuser satisfies whatever permission classes the project sets
+    user = get_user_model()(username='benchmark', is_staff=True, is_superuser=True)
+    factory = APIRequestFactory()
+    view = SESEventViewSet.as_view({'get': 'list'})
+
+    page_size = DataTablesPagination.max_page_size
+    total = SESEventViewSet.queryset.count()
+    last_page = max(1, -(-total // page_size))
+    pages = sorted({1, 10, 100, last_page // 2 or 1, last_page} & set(range(1, last_page + 1)))
+
+    def fetch(params):
+        request = factory.get('/api/events/', {'length': page_size, **params})
+        force_authenticate(request, user=user)
+        response = view(request)
+        response.render()
+        assert response.status_code == 200, response.status_code
+
+    results = {'rows': total, 'page_size': page_size}
+    for page in pages:
+        # list() derives the page from DataTables' start offset, not ?page=
+        results[f'list_page_{page}'] = timed(lambda: fetch({'start': (page - 1) * page_size}), repeat)
+    results['list_search'] = timed(lambda: fetch({'search[value]': 'example.org'}), repeat)
+    return results
+
+
+# Modules a webhook-only worker should never load
+WEBHOOK_FORBIDDEN_MODULES = ('boto3', 'rest_framework.viewsets', 'cis.menu', f'{__package__}.api', f'{__package__}.serializers')
+WEBHOOK_IMPORT_BUDGET_MS = 50
+
+_IMPORT_PROBE = """
+import json, sys, time, tracemalloc
+import django
+django.setup()
+before = set(sys.modules)
+if {trace_memory}:
+    tracemalloc.start()
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+allocated = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+print(json.dumps({{'ms': elapsed * 1000, 'allocated': allocated, 'modules': sorted(set(sys.modules) - before)}}))
+"""
+
+
+def _parse_importtime(stderr, module):
+    """Cumulative microseconds -X importtime reports for module, or None"""
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1])
+    return None
+
+
+def probe_import(module, trace_memory=False):
+    """
+    Import module in a fresh interpreter after django.setup(). With
+    trace_memory, also report the bytes it left allocated (tracemalloc slows
+    the import down, so timings from that run are not comparable).
+    """
+    import subprocess
+    import sys
+
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _IMPORT_PROBE.format(module=module, trace_memory=trace_memory)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['importtime_us'] = _parse_importtime(completed.stderr, module)
+    return result
+
+
+@suite('importtime')
+def bench_importtime(repeat=5, **options):
+    """
+    Cold import cost of the webhook, API and URL modules.
+
+    Each module is imported in a fresh interpreter after django.setup(), so
+    the numbers exclude Django and the app registry and cover only what the
+    module itself pulls in. ses_tracking.webhook_urls is checked against
+    WEBHOOK_IMPORT_BUDGET_MS and WEBHOOK_FORBIDDEN_MODULES.
+    """
+    results = {}
+    for module in ('webhooks', 'webhook_urls', 'api', 'urls'):
+        module = f'{__package__}.{module}'
+        samples = [probe_import(module) for _ in range(repeat)]
+        loaded = set(samples[0]['modules'])
+        allocated = probe_import(module, trace_memory=True)['allocated']
+        results[module] = {
+            'median_ms': round(statistics.median(sample['ms'] for sample in samples), 3),
+            'importtime_us': statistics.median(sample['importtime_us'] or 0 for sample in samples),
+            'allocated_kb': round(allocated / 1024, 1),
+            'modules_loaded': len(loaded),
+            'forbidden_loaded': sorted(name for name in WEBHOOK_FORBIDDEN_MODULES if name in loaded),
+        }
+
+    webhook = results[f'{__package__}.webhook_urls']
+    results['budget'] = {
+        'budget_ms': WEBHOOK_IMPORT_BUDGET_MS,
+        'within_budget': webhook['median_ms'] <= WEBHOOK_IMPORT_BUDGET_MS and not webhook['forbidden_loaded'],
+    }
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'database_version': getattr(connection, 'pg_version', None)
+            or getattr(connection.Database, 'sqlite_version', None),
+        'timestamp': timezone.now().isoformat(),
+    }
+
+
+def run(names, **options):
+    """
+    Run the named suites and return a JSON-serializable result document.
+
+    Synthetic rows are rolled back after each suite.
+    """
+    from .alerts import alert_evaluator
+    from .latency import latency_buffer
+    from .lookups import clear_lookup_caches
+    from .suppression import suppression_cache
+
+    document = {'environment': environment(), 'options': options, 'results': {}}
+    for name in names:
+        results = {}
+        try:
+            with transaction.atomic():
+                results = SUITES[name](**options)
+                raise _Rollback()
+        except _Rollback:
+            pass
+        finally:
+            # Ingest adds synthetic addresses to the in-process suppression set
+            suppression_cache.clear()
+            clear_lookup_caches()
+            # Drop the synthetic traffic from the process's alert windows
+            alert_evaluator.reset()
+            latency_buffer.clear()
+        document['results'][name] = results
+    return document
+
+
+def dumps(document):
+    return json.dumps(document, indent=2, sort_keys=True, default=str)
@@ -0,0 +1,190 @@
+# ses_tracking/extraction.py
+"""
+Derive SESEvent's header fields (email_message_id, email_subject, email_to)
+from raw_message for rows that already exist.
+
+On PostgreSQL and SQLite (with JSON1) each field is filled by one
+set-based UPDATE per id range using the database's JSON functions; the
+subject is first interned into EmailSubject with one INSERT ... SELECT
+DISTINCT. Other databases fall back to SESEvent's Python extract_*
+properties and bulk_update. Both paths produce the values SESEvent.save()
+would.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max, Min, Q
+
+from .lookups import email_subjects
+from .models import EmailSubject, SESEvent
+
+FIELDS = ('email_message_id', 'email_subject', 'email_to')
+
+# Per-vendor SQL fragments. {raw} is the qualified raw_message column and
+# {name} a header name (a fixed literal, never user input).
+SQL = {
+    'postgresql': {
+        'header': (
+            "(SELECT h->>'value' FROM jsonb_array_elements("
+            "CASE WHEN jsonb_typeof({raw}->'mail'->'headers') = 'array' "
+            "THEN {raw}->'mail'->'headers' ELSE '[]'::jsonb END) h "
+            "WHERE h->>'name' = '{name}' LIMIT 1)"
+        ),
+        'common_subject': "{raw}->'mail'->'commonHeaders'->>'subject'",
+        'common_to': (
+            "(SELECT string_agg(t.address, ', ' ORDER BY t.ord) FROM jsonb_array_elements_text("
+            "CASE WHEN jsonb_typeof({raw}->'mail'->'commonHeaders'->'to') = 'array' "
+            "THEN {raw}->'mail'->'commonHeaders'->'to' ELSE '[]'::jsonb END"
+            ") WITH ORDINALITY AS t(address, ord))"
+        ),
+        'trim': "btrim({value}, '<>')",
+        'insert_ignore': 'INSERT INTO {table} ({column}) {select} ON CONFLICT ({column}) DO NOTHING',
+        'distinct': '{column} IS DISTINCT FROM {value}',
+    },
+    'sqlite': {
+        'header': (
+            "(SELECT json_extract(CASE WHEN h.type = 'object' THEN h.value END, '$.value') "
+            "FROM json_each({raw}, '$.mail.headers') h "
+            "WHERE json_extract(CASE WHEN h.type = 'object' THEN h.value END, '$.name') = '{name}' LIMIT 1)"
+        ),
+        'common_subject': "json_extract({raw}, '$.mail.commonHeaders.subject')",
+        'common_to': "(SELECT group_concat(t.value, ', ') FROM json_each({raw}, '$.mail.commonHeaders.to') t)",
+        'trim': "trim({value}, '<>')",
+        'insert_ignore': 'INSERT OR IGNORE INTO {table} ({column}) {select}',
+        'distinct': '{column} IS NOT {value}',
+    },
+}
+
+
+def supports_sql_extraction(connection):
+    if connection.vendor == 'postgresql':
+        return True
+    return connection.vendor == 'sqlite' and connection.features.supports_json_field
+
+
+def _expressions(connection):
+    """SQL expressions for each field, mirroring SESEvent.extract_*"""
+    sql = SQL[connection.vendor]
+    qn = connection.ops.quote_name
+    raw = f"{qn(SESEvent._meta.db_table)}.{qn(SESEvent._meta.get_field('raw_message').column)}"
+
+    def header(name):
+        return sql['header'].format(raw=raw, name=name)
+
+    subject_length = EmailSubject._meta.get_field('value').max_length
+    return {
+        'email_message_id': sql['trim'].format(value=header('Message-ID')),
+        'email_subject': (
+            f"substr(COALESCE(NULLIF({sql['common_subject'].format(raw=raw)}, ''), {header('Subject')}), 1, {subject_length})"
+        ),
+        'email_to': f"COALESCE({sql['common_to'].format(raw=raw)}, {header('To')})",
+    }
+
+
+def _derive_sql(connection, fields, overwrite, low, high):
+    qn = connection.ops.quote_name
+    table = qn(SESEvent._meta.db_table)
+    pk = f"{table}.{qn(SESEvent._meta.pk.column)}"
+    expressions = _expressions(connection)
+    updated = {}
+    with connection.cursor() as cursor:
+        for field in fields:
+            column = qn(SESEvent._meta.get_field(field).column)
+            where = f"{pk} >= %s AND {pk} < %s"
+            if not overwrite:
+                where += f" AND {table}.{column} IS NULL"
+            expression = expressions[field]
+
+            if field == 'email_subject':
+                subjects = qn(EmailSubject._meta.db_table)
+                value = qn(EmailSubject._meta.get_field('value').column)
+                select = (
+                    f"SELECT DISTINCT s.v FROM (SELECT {expression} AS v FROM {table} WHERE {where}) s "
+                    f"WHERE s.v IS NOT NULL"
+                )
+                cursor.execute(
+                    SQL[connection.vendor]['insert_ignore'].format(table=subjects, column=value, select=select),
+                    [low, high],
+                )
+                expression = (
+                    f"(SELECT {subjects}.{qn(EmailSubject._meta.pk.column)} FROM {subjects} "
+                    f"WHERE {subjects}.{value} = {expression})"
+                )
+
+            # Skip rows the UPDATE would not change, so they are not rewritten
+            if overwrite:
+                unchanged = SQL[connection.vendor]['distinct'].format(column=f'{table}.{column}', value=expression)
+            else:
+                unchanged = f"{expression} IS NOT NULL"
+            cursor.execute(
+                f"UPDATE {table} SET {column} = {expression} WHERE {where} AND {unchanged}",
+                [low, high],
+            )
+            updated[field] = cursor.rowcount
+    return updated
+
+
+def _derive_python(using, fields, overwrite, low, high):
+    queryset = SESEvent.objects.using(using).filter(pk__gte=low, pk__lt=high)
+    if not overwrite:
+        missing = Q()
+        for field in fields:
+            missing |= Q(**{f'{field}__isnull': True})
+        queryset = queryset.filter(missing)
+
+    updated = dict.fromkeys(fields, 0)
+    events = list(queryset.only('pk', 'raw_message', *fields))
+    subject_ids = {}
+    if 'email_subject' in fields:
+        subject_ids = email_subjects.get_ids(
+            [event.extract_email_subject for event in events if overwrite or event.email_subject_id is None]
+        )
+
+    changed = []
+    for event in events:
+        dirty = False
+        for field in fields:
+            attname = SESEvent._meta.get_field(field).attname
+            current = getattr(event, attname)
+            if current is not None and not overwrite:
+                continue
+            if field == 'email_subject':
+                value = subject_ids[event.extract_email_subject]
+            else:
+                value = getattr(event, f'extract_{field}')
+            if value != current:
+                setattr(event, attname, value)
+                updated[field] += 1
+                dirty = True
+        if dirty:
+            changed.append(event)
+    SESEvent.objects.using(using).bulk_update(changed, list(fields), batch_size=1000)
+    return updated
+
+
+def derive_header_fields(fields=FIELDS, overwrite=False, batch_size=100000, use_sql=None, using=DEFAULT_DB_ALIAS):
+    """
+    Fill header fields from raw_message, batch_size ids at a time.
+
+    Only NULL fields are filled unless overwrite is set. A batch_size of 0
+    runs one statement per field over the whole table. use_sql=None picks
+    the SQL path where the database supports it. Yields (low id, high id,
+    {field: rows changed}) per batch, each committed on its own.
+    """
+    connection = connections[using]
+    if use_sql is None:
+        use_sql = supports_sql_extraction(connection)
+    elif use_sql and not supports_sql_extraction(connection):
+        raise ValueError(f'SQL extraction is not supported on {connection.vendor}')
+
+    bounds = SESEvent.objects.using(using).aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return
+    low = bounds['low']
+    while low <= bounds['high']:
+        high = low + batch_size if batch_size else bounds['high'] + 1
+        with transaction.atomic(using=using):
+            if use_sql:
+                updated = _derive_sql(connection, fields, overwrite, low, high)
+            else:
+                updated = _derive_python(using, fields, overwrite, low, high)
+        yield low, high, updated
+        low = high
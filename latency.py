@@ -0,0 +1,220 @@
+# ses_tracking/latency.py
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from dateutil import parser as date_parser
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import DeliveryLatencySketch
+from .sketches import DDSketch
+
+logger = logging.getLogger(__name__)
+
+
+def recipient_domain(email):
+    return (email or '').rsplit('@', 1)[-1].strip().lower()
+
+
+def _local_date(timestamp):
+    return timezone.localtime(timestamp).date() if timezone.is_aware(timestamp) else timestamp.date()
+
+
+def _delivery_samples(message):
+    """(date, {domain: recipients}, processing ms, end-to-end ms) of a delivery, or None"""
+    delivery = message.get('delivery', {})
+    mail = message.get('mail', {})
+    domains = Counter(recipient_domain(r) for r in delivery.get('recipients', []))
+    domains.pop('', None)
+    if not domains or not delivery.get('timestamp'):
+        return None
+
+    delivered_at = date_parser.parse(delivery['timestamp'])
+    processing_ms = delivery.get('processingTimeMillis')
+    end_to_end_ms = None
+    if mail.get('timestamp'):
+        end_to_end_ms = (delivered_at - date_parser.parse(mail['timestamp'])).total_seconds() * 1000
+    if processing_ms is None and end_to_end_ms is None:
+        return None
+    return _local_date(delivered_at), domains, processing_ms, end_to_end_ms
+
+
+class LatencyBuffer:
+    """
+    Process-local sketches per (date, domain), merged into
+    DeliveryLatencySketch in bulk.
+
+    Adding a delivery only touches memory. The buffer is flushed by a daemon
+    timer SES_TRACKING_LATENCY_FLUSH_INTERVAL seconds after its first
+    buffered delivery (so an idle worker does not hold samples), as soon as
+    SES_TRACKING_LATENCY_FLUSH_SIZE deliveries are waiting, and at process
+    exit, so a busy domain's row is locked once per flush instead of once per
+    delivery. At most one interval of samples is lost if the process is
+    killed.
+    """
+
+    def __init__(self):
+        self._pending = {}  # (date, domain) -> [processing DDSketch, end-to-end DDSketch, count]
+        self._deliveries = 0
+        self._next_flush = None
+        self._timer = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def add(self, date, domains, processing_ms, end_to_end_ms):
+        with self._lock:
+            for domain, count in domains.items():
+                entry = self._pending.get((date, domain))
+                if entry is None:
+                    entry = self._pending[(date, domain)] = [DDSketch(), DDSketch(), 0]
+                if processing_ms is not None:
+                    entry[0].add(float(processing_ms), count)
+                if end_to_end_ms is not None:
+                    entry[1].add(max(0.0, end_to_end_ms), count)
+                entry[2] += count
+            self._deliveries += 1
+            now = time.monotonic()
+            if self._next_flush is None:
+                self._schedule(now)
+            due = (
+                now >= self._next_flush
+                or self._deliveries >= getattr(settings, 'SES_TRACKING_LATENCY_FLUSH_SIZE', 1000)
+            )
+        if due:
+            self.flush()
+
+    def _schedule(self, now):
+        # Called with self._lock held, when the first samples are buffered
+        interval = getattr(settings, 'SES_TRACKING_LATENCY_FLUSH_INTERVAL', 10)
+        self._next_flush = now + interval
+        self._timer = threading.Timer(interval, self._timed_flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel(self):
+        # Called with self._lock held
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _timed_flush(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread has its own database connection
+            connection.close()
+
+    def flush(self):
+        """Merge the buffered sketches into their rows; returns the rows written"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._deliveries = 0
+                self._next_flush = None
+                self._cancel()
+            if not pending:
+                return 0
+            try:
+                self._write(pending)
+            except Exception:
+                logger.error(f"Could not flush latency sketches for {len(pending)} day/domain pair(s)", exc_info=True)
+                self._restore(pending)
+                return 0
+            return len(pending)
+
+    def _write(self, pending):
+        with transaction.atomic():
+            DeliveryLatencySketch.objects.bulk_create(
+                [DeliveryLatencySketch(date=date, domain=domain) for date, domain in pending],
+                ignore_conflicts=True,
+            )
+            # Lock in one (date, domain) order so concurrent flushes cannot deadlock
+            by_date = defaultdict(list)
+            for date, domain in pending:
+                by_date[date].append(domain)
+            for date in sorted(by_date):
+                rows = DeliveryLatencySketch.objects.select_for_update().filter(
+                    date=date, domain__in=by_date[date]
+                ).order_by('domain')
+                for row in rows:
+                    processing, end_to_end, count = pending[(date, row.domain)]
+                    if processing.count:
+                        sketch = DDSketch.from_dict(row.processing_time)
+                        sketch.merge(processing)
+                        row.processing_time = sketch.to_dict()
+                    if end_to_end.count:
+                        sketch = DDSketch.from_dict(row.end_to_end)
+                        sketch.merge(end_to_end)
+                        row.end_to_end = sketch.to_dict()
+                    row.count += count
+                    row.save(update_fields=['processing_time', 'end_to_end', 'count', 'updated_at'])
+
+    def _restore(self, pending):
+        # Keep the samples for the next flush
+        with self._lock:
+            if self._next_flush is None:
+                self._schedule(time.monotonic())
+            for key, (processing, end_to_end, count) in pending.items():
+                entry = self._pending.get(key)
+                if entry is None:
+                    self._pending[key] = [processing, end_to_end, count]
+                else:
+                    entry[0].merge(processing)
+                    entry[1].merge(end_to_end)
+                    entry[2] += count
+
+    def clear(self):
+        with self._lock:
+            self._pending = {}
+            self._deliveries = 0
+            self._next_flush = None
+            self._cancel()
+
+
+latency_buffer = LatencyBuffer()
+atexit.register(latency_buffer.flush)
+
+
+def record_delivery_latency(message):
+    """
+    Add one delivery notification's latencies to the buffered sketches of
+    its day and each recipient domain (see LatencyBuffer).
+
+    Samples are buffered once the surrounding transaction commits, so a
+    rolled-back notification adds nothing.
+    """
+    samples = _delivery_samples(message)
+    if samples is not None:
+        transaction.on_commit(lambda: latency_buffer.add(*samples))
+
+
+def merge_latency(rows, limit=20):
+    """
+    Merge (domain, processing_time, end_to_end) rows into overall and
+    per-domain summaries; domains are ordered by delivery count.
+    """
+    overall = {'processing_time_ms': DDSketch(), 'end_to_end_ms': DDSketch()}
+    by_domain = defaultdict(lambda: {'processing_time_ms': DDSketch(), 'end_to_end_ms': DDSketch()})
+
+    for domain, processing_time, end_to_end in rows:
+        for key, data in (('processing_time_ms', processing_time), ('end_to_end_ms', end_to_end)):
+            sketch = DDSketch.from_dict(data)
+            overall[key].merge(sketch)
+            by_domain[domain][key].merge(sketch)
+
+    domains = sorted(
+        by_domain.items(),
+        key=lambda item: max(item[1]['processing_time_ms'].count, item[1]['end_to_end_ms'].count),
+        reverse=True,
+    )
+    return {
+        'overall': {key: sketch.summary() for key, sketch in overall.items()},
+        'domains': [
+            {'domain': domain, **{key: sketch.summary() for key, sketch in sketches.items()}}
+            for domain, sketches in domains[:limit]
+        ],
+    }
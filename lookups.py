@@ -0,0 +1,104 @@
+# ses_tracking/lookups.py
+"""
+In-process value -> id caches for the SESEvent lookup tables.
+
+Ingest calls get_id() once per notification; after the first occurrence of
+a value the id comes from memory with no query. Misses select the row and
+insert it if needed (insert-ignore, so concurrent workers converge on one
+row).
+
+An id is only cached once the row is known to be committed: a row inserted
+inside a transaction that later rolls back would otherwise leave a cached
+id that no longer exists.
+"""
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import BounceSubType, ComplaintFeedbackType, EmailSubject, RejectReason
+
+
+class LookupCache:
+    """value -> id for one LookupValue model"""
+
+    def __init__(self, model):
+        self.model = model
+        self.max_length = model._meta.get_field('value').max_length
+        self._ids = {}
+        self._inserted = set()  # Values this process inserted, until known committed
+        self._lock = threading.Lock()
+
+    def _max_size(self):
+        return getattr(settings, 'SES_TRACKING_LOOKUP_CACHE_SIZE', 10000)
+
+    def _remember(self, mapping):
+        with self._lock:
+            if len(self._ids) + len(mapping) > self._max_size():
+                self._ids.clear()
+            self._ids.update(mapping)
+            self._inserted.difference_update(mapping)
+
+    def get_id(self, value):
+        """Id for value, creating the row if needed; None for None"""
+        if value is None:
+            return None
+        return self.get_ids([value])[value]
+
+    def get_ids(self, values):
+        """Map each value (None passes through) to its id with at most two queries"""
+        result = {None: None}
+        missing = set()
+        for value in values:
+            if value is None or value in result:
+                continue
+            cached = self._ids.get(value[:self.max_length])
+            if cached is None:
+                missing.add(value)
+            else:
+                result[value] = cached
+        if not missing:
+            return result
+
+        truncated = {value: value[:self.max_length] for value in missing}
+        stored = set(truncated.values())
+        found = dict(self.model.objects.filter(value__in=stored).values_list('value', 'id'))
+        new = stored - set(found)
+        if new:
+            self.model.objects.bulk_create(
+                [self.model(value=value) for value in new],
+                ignore_conflicts=True,
+            )
+            found.update(self.model.objects.filter(value__in=new).values_list('value', 'id'))
+            with self._lock:
+                self._inserted.update(new)
+
+        committed = {value: id for value, id in found.items() if value not in self._inserted}
+        pending = {value: id for value, id in found.items() if value in self._inserted}
+        if committed:
+            self._remember(committed)
+        if pending:
+            if connection.in_atomic_block:
+                transaction.on_commit(lambda: self._remember(pending))
+            else:
+                self._remember(pending)
+
+        for value, stored_value in truncated.items():
+            result[value] = found[stored_value]
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+            self._inserted.clear()
+
+
+email_subjects = LookupCache(EmailSubject)
+bounce_sub_types = LookupCache(BounceSubType)
+complaint_feedback_types = LookupCache(ComplaintFeedbackType)
+reject_reasons = LookupCache(RejectReason)
+
+
+def clear_lookup_caches():
+    for cache in (email_subjects, bounce_sub_types, complaint_feedback_types, reject_reasons):
+        cache.clear()
@@ -1,25 +1,62 @@
-# ses_tracking/management/commands/aggregate_daily_stats.py
-from django.core.management.base import BaseCommand
-from django.db.models import Count, Q
-from django.utils import timezone
-from ses_tracking.models import SESEvent, DailyEmailStats
-from datetime import datetime, timedelta
-import logging
-
-logger = logging.getLogger(__name__)
+# ses_tracking/management/commands/backfill.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from ses_tracking.extraction import FIELDS, derive_header_fields, supports_sql_extraction
 
 
 class Command(BaseCommand):
-    help = 'Aggregate SES events into daily statistics'
+    help = 'Derive Message-ID, subject and To of existing SES events from their raw messages'
 
     def add_arguments(self, parser):
-        ...
+        parser.add_argument(
+            '--field',
+            action='append',
+            dest='fields',
+            choices=FIELDS,
+            help='Field to derive, may be repeated. Defaults to all.'
+        )
+        parser.add_argument(
+            '--overwrite',
+            action='store_true',
+            help='Re-derive fields that are already set, not only empty ones'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100000,
+            help='Event ids per transaction (0 for a single statement per field)'
+        )
+        parser.add_argument(
+            '--python',
+            action='store_true',
+            help='Extract in Python even where the database can do it in SQL'
+        )
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Database alias to backfill'
+        )
 
     def handle(self, *args, **options):
-        # Django shell
-        from ses_tracking.models import SESEvent
+        fields = options['fields'] or list(FIELDS)
+        if options['batch_size'] < 0:
+            raise CommandError('--batch-size must be 0 or positive')
+
+        use_sql = not options['python'] and supports_sql_extraction(connections[options['database']])
+        self.stdout.write(f"Deriving {', '.join(fields)} {'in SQL' if use_sql else 'in Python'}")
 
-        for event in SESEvent.objects.filter(email_message_id__isnull=True):
-            event.save()  # This will trigger the save() method to extract Message-ID
+        totals = dict.fromkeys(fields, 0)
+        for low, high, updated in derive_header_fields(
+            fields=fields,
+            overwrite=options['overwrite'],
+            batch_size=options['batch_size'],
+            use_sql=use_sql,
+            using=options['database'],
+        ):
+            for field, count in updated.items():
+                totals[field] += count
+            self.stdout.write(f"ids {low}-{high - 1}: " + ', '.join(f'{field} {count}' for field, count in updated.items()))
 
-        self.stdout.write(self.style.SUCCESS('Successfully backfilled ID'))
+        self.stdout.write(self.style.SUCCESS(
+            'Backfill complete: ' + ', '.join(f'{field} {count}' for field, count in totals.items())
+        ))
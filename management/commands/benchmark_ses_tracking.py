@@ -0,0 +1,65 @@
+# ses_tracking/management/commands/benchmark_ses_tracking.py
+from django.core.management.base import BaseCommand, CommandError
+from ses_tracking import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Run synthetic benchmarks against the configured database (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--suite',
+            action='append',
+            dest='suites',
+            help=f"Suite to run, may be repeated. Available: {', '.join(sorted(benchmarks.SUITES))}. Defaults to all."
+        )
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1000,
+            help='Number of synthetic rows to generate'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of timed repetitions per case'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Write JSON results to this file instead of stdout'
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Exit with an error if a suite reports a budget it did not meet (importtime)'
+        )
+
+    def handle(self, *args, **options):
+        suites = options['suites'] or sorted(benchmarks.SUITES)
+        unknown = [name for name in suites if name not in benchmarks.SUITES]
+        if unknown:
+            raise CommandError(f"Unknown suite(s): {', '.join(unknown)}")
+
+        document = benchmarks.run(
+            suites,
+            rows=options['rows'],
+            repeat=options['repeat'],
+        )
+        output = benchmarks.dumps(document)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                fh.write(output)
+            self.stdout.write(self.style.SUCCESS(f"Wrote benchmark results to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+        if options['check']:
+            over = [
+                name for name, results in document['results'].items()
+                if results.get('budget', {}).get('within_budget') is False
+            ]
+            if over:
+                raise CommandError(f"Over budget: {', '.join(over)}")
@@ -0,0 +1,79 @@
+# ses_tracking/management/commands/consume_ses_sqs.py
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from ses_tracking.sqs import MAX_MESSAGES, SQSConsumer, get_sqs_client
+
+
+class Command(BaseCommand):
+    help = 'Long-poll an SQS queue subscribed to the SES SNS topic and store its events'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queue-url',
+            type=str,
+            default=getattr(settings, 'SES_TRACKING_SQS_QUEUE_URL', None),
+            help='Queue URL. Defaults to SES_TRACKING_SQS_QUEUE_URL.'
+        )
+        parser.add_argument(
+            '--region',
+            type=str,
+            default=getattr(settings, 'AWS_SES_REGION', 'us-east-1'),
+            help='AWS region of the queue. Defaults to AWS_SES_REGION.'
+        )
+        parser.add_argument(
+            '--endpoint-url',
+            type=str,
+            help='Custom SQS endpoint, e.g. a local ElasticMQ or LocalStack'
+        )
+        parser.add_argument(
+            '--wait-time',
+            type=int,
+            default=20,
+            help='Long-poll wait in seconds (0-20)'
+        )
+        parser.add_argument(
+            '--max-messages',
+            type=int,
+            default=MAX_MESSAGES,
+            help='Messages per receive (1-10)'
+        )
+        parser.add_argument(
+            '--visibility-timeout',
+            type=int,
+            help="Override the queue's visibility timeout for received messages"
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            help='Exit after this many non-empty batches'
+        )
+        parser.add_argument(
+            '--drain',
+            action='store_true',
+            help='Exit as soon as a receive comes back empty'
+        )
+
+    def handle(self, *args, **options):
+        if not options['queue_url']:
+            raise CommandError('Pass --queue-url or set SES_TRACKING_SQS_QUEUE_URL')
+
+        consumer = SQSConsumer(
+            get_sqs_client(options['region'], options['endpoint_url']),
+            options['queue_url'],
+            wait_time=options['wait_time'],
+            max_messages=options['max_messages'],
+            visibility_timeout=options['visibility_timeout'],
+        )
+
+        # Finish the current batch before exiting
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: consumer.stop())
+
+        self.stdout.write(f"Consuming {options['queue_url']}")
+        consumer.run(max_batches=options['max_batches'], idle_exit=options['drain'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Processed {consumer.processed} message(s), {consumer.duplicates} duplicate(s), {consumer.failed} failed")
+        )
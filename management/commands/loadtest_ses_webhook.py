@@ -0,0 +1,56 @@
+# ses_tracking/management/commands/loadtest_ses_webhook.py
+from django.core.management.base import BaseCommand
+from ses_tracking import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Fire concurrent synthetic SNS notifications at running webhook URLs and compare them (data is NOT rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'urls',
+            nargs='+',
+            help='Webhook URLs to test, e.g. the sync and async endpoints of a running server'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=1000,
+            help='Notifications to send per URL'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=50,
+            help='Concurrent connections'
+        )
+        parser.add_argument(
+            '--recipients',
+            type=int,
+            default=1,
+            help='Recipients per notification'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Write JSON results to this file instead of stdout'
+        )
+
+    def handle(self, *args, **options):
+        document = {'environment': benchmarks.environment(), 'results': []}
+        for url in options['urls']:
+            self.stderr.write(f"Load testing {url} ...")
+            document['results'].append(benchmarks.load_test(
+                url,
+                requests=options['requests'],
+                concurrency=options['concurrency'],
+                recipients=options['recipients'],
+            ))
+        output = benchmarks.dumps(document)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                fh.write(output)
+            self.stdout.write(self.style.SUCCESS(f"Wrote load test results to {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,241 @@
+# ses_tracking/metrics.py
+"""
+Metrics for the webhook, aggregation and API hot paths.
+
+Instrumented code calls inc(), observe() and timer() here; the calls go to
+the exporter named by SES_TRACKING_METRICS_EXPORTER (a dotted path). The
+default NoopExporter drops everything, and the module-level helpers check
+a single flag before doing any work, so disabled metrics cost one attribute
+lookup per call site.
+
+PrometheusExporter keeps counters and histograms in process memory and
+renders them in the Prometheus text format for metrics_view. Each process
+keeps its own values; scrape every worker, or plug in an exporter backed by
+a shared client library for multi-process deployments.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# name -> (type, help, buckets)
+METRICS = {
+    'webhook_duration_seconds': (
+        'histogram', 'Time to handle one SNS notification, by SES event type', LATENCY_BUCKETS),
+    'notification_recipients': (
+        'histogram', 'Recipients per SES notification, by event type', COUNT_BUCKETS),
+    'db_write_duration_seconds': (
+        'histogram', 'Time spent writing events and derived rows per notification', LATENCY_BUCKETS),
+    'handler_errors_total': (
+        'counter', 'Notifications whose handler raised, by event type', None),
+    'dedup_hits_total': (
+        'counter', 'Duplicate deliveries skipped, by kind', None),
+    'webhook_rejected_total': (
+        'counter', 'Notifications refused with 503 by the async webhook', None),
+    'subscription_rejected_total': (
+        'counter', 'SubscriptionConfirmations ignored because their SubscribeURL failed validation', None),
+    'sqs_batch_duration_seconds': (
+        'histogram', 'Time to process and delete one SQS batch', LATENCY_BUCKETS),
+    'sqs_messages_total': (
+        'counter', 'SQS messages handled by consume_ses_sqs, by outcome', None),
+    'aggregation_duration_seconds': (
+        'histogram', 'Time to aggregate one day into DailyEmailStats', LATENCY_BUCKETS),
+    'api_queries': (
+        'histogram', 'Database queries per API request, by view and action', COUNT_BUCKETS),
+    'api_duration_seconds': (
+        'histogram', 'API request duration, by view and action', LATENCY_BUCKETS),
+}
+
+PREFIX = 'ses_tracking_'
+
+
+class NoopExporter:
+    """Default exporter: records nothing"""
+    enabled = False
+
+    def inc(self, name, value=1, **labels):
+        pass
+
+    def observe(self, name, value, **labels):
+        pass
+
+    def render(self):
+        return ''
+
+
+class PrometheusExporter:
+    """In-process counters and histograms rendered in Prometheus text format"""
+    enabled = True
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        buckets = METRICS[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # Per-bucket (non-cumulative) counts, then +Inf, sum
+                histogram = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0]
+            histogram[0][bisect_left(buckets, value)] += 1
+            histogram[1] += value
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (
+            (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for key, value in pairs
+        )
+        return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+    def render(self):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(counts), total) for key, (counts, total) in self._histograms.items()}
+
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            series = counters if kind == 'counter' else histograms
+            keys = sorted(key for key in series if key[0] == name)
+            if not keys:
+                continue
+            full_name = PREFIX + name
+            lines.append(f'# HELP {full_name} {help_text}')
+            lines.append(f'# TYPE {full_name} {kind}')
+            for key in keys:
+                labels = key[1]
+                if kind == 'counter':
+                    lines.append(f'{full_name}{self._labels(labels)} {series[key]}')
+                    continue
+                counts, total = series[key]
+                cumulative = 0
+                for bound, count in zip(list(buckets) + ['+Inf'], counts):
+                    cumulative += count
+                    lines.append(f'{full_name}_bucket{self._labels(labels, [("le", bound)])} {cumulative}')
+                lines.append(f'{full_name}_sum{self._labels(labels)} {total}')
+                lines.append(f'{full_name}_count{self._labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter():
+    """Return the configured exporter, created on first use"""
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                path = getattr(settings, 'SES_TRACKING_METRICS_EXPORTER', None)
+                _exporter = import_string(path)() if path else NoopExporter()
+    return _exporter
+
+
+def set_exporter(exporter):
+    """Replace the exporter, e.g. with a fresh PrometheusExporter in tests"""
+    global _exporter
+    with _exporter_lock:
+        _exporter = exporter
+
+
+def inc(name, value=1, **labels):
+    exporter = _exporter or get_exporter()
+    if exporter.enabled:
+        exporter.inc(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    exporter = _exporter or get_exporter()
+    if exporter.enabled:
+        exporter.observe(name, value, **labels)
+
+
+@contextmanager
+def timer(name, **labels):
+    """Observe the duration of the block in seconds"""
+    exporter = _exporter or get_exporter()
+    if not exporter.enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        exporter.observe(name, time.perf_counter() - started, **labels)
+
+
+@contextmanager
+def count_queries():
+    """
+    Yield a one-item list holding the number of queries run in the block
+    on any database alias.
+
+    Uses connection execute wrappers only while metrics are enabled.
+    """
+    counter = [0]
+    exporter = _exporter or get_exporter()
+    if not exporter.enabled:
+        yield counter
+        return
+
+    from contextlib import ExitStack
+    from django.db import connections
+
+    def wrapper(execute, sql, params, many, context):
+        counter[0] += 1
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield counter
+
+
+def metrics_view(request):
+    """
+    Expose the exporter in Prometheus text format.
+
+    404 unless the exporter can render. When SES_TRACKING_METRICS_TOKEN is
+    set, requests must send it as a bearer token; without a token only
+    logged-in staff users can read the metrics.
+    """
+    import hmac
+
+    from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+    exporter = get_exporter()
+    if not exporter.enabled or not hasattr(exporter, 'content_type'):
+        raise Http404('Metrics are disabled')
+
+    token = getattr(settings, 'SES_TRACKING_METRICS_TOKEN', None)
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponseForbidden('Invalid metrics token')
+    else:
+        user = getattr(request, 'user', None)
+        if not (user and user.is_active and user.is_staff):
+            return HttpResponseForbidden('Set SES_TRACKING_METRICS_TOKEN or log in as staff')
+
+    return HttpResponse(exporter.render(), content_type=exporter.content_type)
+# Authenticated above (bearer token or staff session)
+metrics_view.login_required = False
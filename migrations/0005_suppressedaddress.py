@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-19 03:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ses_tracking', '0004_sesevent_email_subject_sesevent_email_to'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SuppressedAddress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('suppressed', models.BooleanField(db_index=True, default=False)),
+                ('reason', models.CharField(blank=True, choices=[('bounce', 'Permanent Bounce'), ('complaint', 'Complaint'), ('transient', 'Repeated Transient Bounces')], max_length=20, null=True)),
+                ('transient_bounce_count', models.IntegerField(default=0)),
+                ('last_event_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Suppressed Address',
+                'verbose_name_plural': 'Suppressed Addresses',
+                'ordering': ['-updated_at'],
+            },
+        ),
+    ]
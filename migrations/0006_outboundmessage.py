@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-19 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ses_tracking', '0005_suppressedaddress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message_id', models.CharField(db_index=True, max_length=500)),
+                ('ses_message_id', models.CharField(blank=True, db_index=True, max_length=255, null=True)),
+                ('recipients', models.TextField()),
+                ('subject_hash', models.CharField(max_length=16)),
+                ('sent_at', models.DateTimeField(db_index=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Outbound Message',
+                'verbose_name_plural': 'Outbound Messages',
+                'ordering': ['-sent_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-19 03:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ses_tracking', '0006_outboundmessage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipientState',
+            fields=[
+                ('email', models.EmailField(max_length=254, primary_key=True, serialize=False)),
+                ('last_event_type', models.CharField(choices=[('bounce', 'Bounce'), ('complaint', 'Complaint'), ('delivery', 'Delivery'), ('send', 'Send'), ('reject', 'Reject'), ('rendering_failure', 'Rendering Failure'), ('delivery_delay', 'Delivery Delay'), ('subscription', 'Subscription')], max_length=20)),
+                ('last_bounce_type', models.CharField(blank=True, choices=[('Permanent', 'Permanent'), ('Transient', 'Transient'), ('Undetermined', 'Undetermined')], max_length=20, null=True)),
+                ('last_event_at', models.DateTimeField(db_index=True)),
+                ('first_seen_at', models.DateTimeField()),
+                ('send_count', models.IntegerField(default=0)),
+                ('delivery_count', models.IntegerField(default=0)),
+                ('bounce_count', models.IntegerField(default=0)),
+                ('complaint_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Recipient State',
+                'verbose_name_plural': 'Recipient States',
+                'ordering': ['-last_event_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-19 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ses_tracking', '0007_recipientstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SNSSubscription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic_arn', models.CharField(max_length=500, unique=True)),
+                ('subscribe_url', models.TextField()),
+                ('confirmed_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'SNS Subscription',
+                'verbose_name_plural': 'SNS Subscriptions',
+                'ordering': ['-updated_at'],
+            },
+        ),
+    ]
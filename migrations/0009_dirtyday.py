@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-19 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ses_tracking', '0008_snssubscription'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirtyDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('marked_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Dirty Day',
+                'verbose_name_plural': 'Dirty Days',
+                'ordering': ['date'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-19 05:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ses_tracking', '0009_dirtyday'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeliveryLatencySketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('domain', models.CharField(max_length=255)),
+                ('processing_time', models.JSONField(default=dict)),
+                ('end_to_end', models.JSONField(default=dict)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Delivery Latency Sketch',
+                'verbose_name_plural': 'Delivery Latency Sketches',
+                'ordering': ['-date', 'domain'],
+                'unique_together': {('date', 'domain')},
+            },
+        ),
+    ]
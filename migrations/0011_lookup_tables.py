@@ -0,0 +1,136 @@
+# Generated by Django 4.2 on 2026-10-19 06:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+# SESEvent field -> lookup model
+LOOKUPS = [
+    ('email_subject', 'EmailSubject'),
+    ('bounce_sub_type', 'BounceSubType'),
+    ('complaint_feedback_type', 'ComplaintFeedbackType'),
+    ('reject_reason', 'RejectReason'),
+]
+
+
+def intern_values(apps, schema_editor):
+    """Create one lookup row per distinct value, then point events at it in one UPDATE"""
+    SESEvent = apps.get_model('ses_tracking', 'SESEvent')
+    for field, model_name in LOOKUPS:
+        Lookup = apps.get_model('ses_tracking', model_name)
+        text_field = f'{field}_text'
+        events = SESEvent.objects.filter(**{f'{text_field}__isnull': False})
+        values = events.order_by().values_list(text_field, flat=True).distinct()
+        Lookup.objects.bulk_create(
+            [Lookup(value=value) for value in values.iterator()],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        events.update(**{
+            field: Subquery(Lookup.objects.filter(value=OuterRef(text_field)).values('pk')[:1]),
+        })
+
+
+def restore_values(apps, schema_editor):
+    SESEvent = apps.get_model('ses_tracking', 'SESEvent')
+    for field, model_name in LOOKUPS:
+        Lookup = apps.get_model('ses_tracking', model_name)
+        SESEvent.objects.filter(**{f'{field}__isnull': False}).update(**{
+            f'{field}_text': Subquery(Lookup.objects.filter(pk=OuterRef(f'{field}_id')).values('value')[:1]),
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ses_tracking', '0010_deliverylatencysketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailSubject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.CharField(max_length=500, unique=True)),
+            ],
+            options={
+                'ordering': ['value'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='BounceSubType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'ordering': ['value'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ComplaintFeedbackType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'ordering': ['value'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='RejectReason',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.CharField(max_length=255, unique=True)),
+            ],
+            options={
+                'ordering': ['value'],
+                'abstract': False,
+            },
+        ),
+        migrations.RenameField(
+            model_name='sesevent',
+            old_name='email_subject',
+            new_name='email_subject_text',
+        ),
+        migrations.RenameField(
+            model_name='sesevent',
+            old_name='bounce_sub_type',
+            new_name='bounce_sub_type_text',
+        ),
+        migrations.RenameField(
+            model_name='sesevent',
+            old_name='complaint_feedback_type',
+            new_name='complaint_feedback_type_text',
+        ),
+        migrations.RenameField(
+            model_name='sesevent',
+            old_name='reject_reason',
+            new_name='reject_reason_text',
+        ),
+        migrations.AddField(
+            model_name='sesevent',
+            name='email_subject',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='ses_tracking.emailsubject'),
+        ),
+        migrations.AddField(
+            model_name='sesevent',
+            name='bounce_sub_type',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='ses_tracking.bouncesubtype'),
+        ),
+        migrations.AddField(
+            model_name='sesevent',
+            name='complaint_feedback_type',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='ses_tracking.complaintfeedbacktype'),
+        ),
+        migrations.AddField(
+            model_name='sesevent',
+            name='reject_reason',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='ses_tracking.rejectreason'),
+        ),
+        migrations.RunPython(intern_values, restore_values),
+    ]
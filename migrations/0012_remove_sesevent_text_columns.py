@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-19 06:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Separate from 0011 so the UPDATE there commits before these ALTERs
+    # (PostgreSQL refuses to alter a table with pending FK trigger events)
+
+    dependencies = [
+        ('ses_tracking', '0011_lookup_tables'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='sesevent',
+            name='email_subject_text',
+        ),
+        migrations.RemoveField(
+            model_name='sesevent',
+            name='bounce_sub_type_text',
+        ),
+        migrations.RemoveField(
+            model_name='sesevent',
+            name='complaint_feedback_type_text',
+        ),
+        migrations.RemoveField(
+            model_name='sesevent',
+            name='reject_reason_text',
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2 on 2026-10-19 09:00
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_urls(apps, schema_editor):
+    SNSSubscription = apps.get_model('ses_tracking', 'SNSSubscription')
+    for subscription in SNSSubscription.objects.all():
+        subscription.url_hash = hashlib.sha256(subscription.subscribe_url.encode('utf-8')).hexdigest()
+        subscription.save(update_fields=['url_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ses_tracking', '0012_remove_sesevent_text_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='snssubscription',
+            name='url_hash',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.RunPython(hash_urls, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='snssubscription',
+            name='url_hash',
+            field=models.CharField(max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='snssubscription',
+            name='topic_arn',
+            field=models.CharField(db_index=True, max_length=500),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-19 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ses_tracking', '0013_snssubscription_url_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessedNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message_id', models.CharField(max_length=100, unique=True)),
+                ('processed_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Processed Notification',
+                'verbose_name_plural': 'Processed Notifications',
+                'ordering': ['-processed_at'],
+            },
+        ),
+    ]
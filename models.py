@@ -1,10 +1,45 @@
 # ses_tracking/models.py
-from django.db import models
+import hashlib
+import time
+from django.db import models, transaction
 from django.utils import timezone
 
 from django.conf import settings
 
 
+class LookupValue(models.Model):
+    """
+    Interned string referenced from SESEvent by integer id.
+    
+    Values repeat across thousands of events (one campaign subject, a
+    handful of bounce sub-types), so each is stored once and SESEvent keeps
+    a small integer key. Ingest resolves values to ids through the
+    in-process caches in lookups.py.
+    """
+    class Meta:
+        abstract = True
+        ordering = ['value']
+    
+    def __str__(self):
+        return self.value
+
+
+class EmailSubject(LookupValue):
+    value = models.CharField(max_length=500, unique=True)
+
+
+class BounceSubType(LookupValue):
+    value = models.CharField(max_length=50, unique=True)
+
+
+class ComplaintFeedbackType(LookupValue):
+    value = models.CharField(max_length=50, unique=True)
+
+
+class RejectReason(LookupValue):
+    value = models.CharField(max_length=255, unique=True)
+
+
 class SESEvent(models.Model):
     EVENT_TYPES = [
         ('bounce', 'Bounce'),
@@ -28,18 +63,18 @@ class SESEvent(models.Model):
     message_id = models.CharField(max_length=255, db_index=True)  # SES message ID
     email_message_id = models.CharField(max_length=500, null=True, blank=True, db_index=True)  # Email Message-ID header
     email = models.EmailField(db_index=True)
-    email_subject = models.CharField(max_length=500, null=True, blank=True, db_index=True)  # Email Subject
+    email_subject = models.ForeignKey(EmailSubject, null=True, blank=True, on_delete=models.PROTECT, related_name='+')  # Email Subject
     email_to = models.TextField(null=True, blank=True)  # To addresses (can be multiple, comma-separated)
     
     # Bounce specific
     bounce_type = models.CharField(max_length=20, choices=BOUNCE_TYPES, null=True, blank=True)
-    bounce_sub_type = models.CharField(max_length=50, null=True, blank=True)
+    bounce_sub_type = models.ForeignKey(BounceSubType, null=True, blank=True, on_delete=models.PROTECT, related_name='+', db_index=False)
     
     # Complaint specific
-    complaint_feedback_type = models.CharField(max_length=50, null=True, blank=True)
+    complaint_feedback_type = models.ForeignKey(ComplaintFeedbackType, null=True, blank=True, on_delete=models.PROTECT, related_name='+', db_index=False)
     
     # Reject specific
-    reject_reason = models.CharField(max_length=255, null=True, blank=True)
+    reject_reason = models.ForeignKey(RejectReason, null=True, blank=True, on_delete=models.PROTECT, related_name='+', db_index=False)
     
     # Common fields
     timestamp = models.DateTimeField(db_index=True)
@@ -109,8 +144,9 @@ class SESEvent(models.Model):
         """Extract and save email metadata before saving"""
         if not self.email_message_id and self.raw_message:
             self.email_message_id = self.extract_email_message_id
-        if not self.email_subject and self.raw_message:
-            self.email_subject = self.extract_email_subject
+        if not self.email_subject_id and self.raw_message:
+            from .lookups import email_subjects
+            self.email_subject_id = email_subjects.get_id(self.extract_email_subject)
         if not self.email_to and self.raw_message:
             self.email_to = self.extract_email_to
         super().save(*args, **kwargs)
@@ -160,6 +196,17 @@ class DailyEmailStats(models.Model):
     def __str__(self):
         return f"Stats for {self.date}"
     
+    def save(self, *args, **kwargs):
+        """Invalidate cached range aggregates covering this day"""
+        super().save(*args, **kwargs)
+        from .aggregates import invalidate_aggregate_cache
+        invalidate_aggregate_cache(self.date)
+    
+    def delete(self, *args, **kwargs):
+        from .aggregates import invalidate_aggregate_cache
+        invalidate_aggregate_cache(self.date)
+        return super().delete(*args, **kwargs)
+    
     def calculate_rates(self):
         """Calculate bounce, complaint, and delivery rates"""
         # Use deliveries as the base if sends is 0 (SES might not track sends)
@@ -198,4 +245,270 @@ class DailyEmailStats(models.Model):
             is_acceptable = stats.bounce_rate <= threshold
             return (is_acceptable, stats.bounce_rate, stats)
         except cls.DoesNotExist:
-            return (True, 0, None)  # No data yet, assume acceptable
\ No newline at end of file
+            return (True, 0, None)  # No data yet, assume acceptable
+
+class SuppressedAddress(models.Model):
+    """
+    Addresses that should not be mailed again.
+    
+    Maintained incrementally by the webhook handlers: a permanent bounce or a
+    complaint suppresses the address immediately, transient bounces are
+    counted and suppress it once SES_TRACKING_TRANSIENT_BOUNCE_THRESHOLD is
+    reached. Rows below the threshold are kept with suppressed=False so the
+    count survives between bounces.
+    """
+    REASONS = [
+        ('bounce', 'Permanent Bounce'),
+        ('complaint', 'Complaint'),
+        ('transient', 'Repeated Transient Bounces'),
+    ]
+    
+    email = models.EmailField(unique=True)  # Stored lower-cased
+    suppressed = models.BooleanField(default=False, db_index=True)
+    reason = models.CharField(max_length=20, choices=REASONS, null=True, blank=True)
+    transient_bounce_count = models.IntegerField(default=0)
+    last_event_at = models.DateTimeField(null=True, blank=True)
+    
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # Watermark for incremental cache refresh
+    
+    class Meta:
+        ordering = ['-updated_at']
+        verbose_name = 'Suppressed Address'
+        verbose_name_plural = 'Suppressed Addresses'
+    
+    def __str__(self):
+        state = self.get_reason_display() if self.suppressed else 'Not suppressed'
+        return f"{self.email} - {state}"
+
+
+class OutboundMessage(models.Model):
+    """
+    Compact record of each message handed to SES by the backends.
+    
+    message_id is the Message-ID header without brackets, the same value
+    SESEvent.email_message_id is extracted from, so events join to the sent
+    message through that indexed column.
+    """
+    message_id = models.CharField(max_length=500, db_index=True)  # Email Message-ID header
+    ses_message_id = models.CharField(max_length=255, null=True, blank=True, db_index=True)  # Set by SESApiBackend
+    recipients = models.TextField()  # Comma-separated envelope recipients
+    subject_hash = models.CharField(max_length=16)  # blake2b-64 hex of the subject
+    sent_at = models.DateTimeField(db_index=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)  # First delivery event
+    
+    class Meta:
+        ordering = ['-sent_at']
+        verbose_name = 'Outbound Message'
+        verbose_name_plural = 'Outbound Messages'
+    
+    def __str__(self):
+        return f"{self.message_id} - {self.sent_at}"
+    
+    @staticmethod
+    def hash_subject(subject):
+        return hashlib.blake2b((subject or '').encode('utf-8'), digest_size=8).hexdigest()
+    
+    @property
+    def events(self):
+        """SES events reported for this message"""
+        return SESEvent.objects.filter(email_message_id=self.message_id)
+    
+    @property
+    def status(self):
+        """Type of the most recent SES event for this message, or None"""
+        return self.events.order_by('-timestamp').values_list('event_type', flat=True).first()
+    
+    @property
+    def delivery_latency(self):
+        """Time from send to first delivery, or None if not delivered yet"""
+        if self.delivered_at is None:
+            return None
+        return self.delivered_at - self.sent_at
+
+
+class RecipientState(models.Model):
+    """
+    Latest delivery state per recipient address, upserted on ingest.
+    
+    Answers "is this address healthy?" with a primary-key lookup instead of
+    sorting the address's SESEvent history.
+    """
+    email = models.EmailField(primary_key=True)  # Stored lower-cased
+    last_event_type = models.CharField(max_length=20, choices=SESEvent.EVENT_TYPES)
+    last_bounce_type = models.CharField(max_length=20, choices=SESEvent.BOUNCE_TYPES, null=True, blank=True)
+    last_event_at = models.DateTimeField(db_index=True)
+    first_seen_at = models.DateTimeField()
+    
+    # Event counts
+    send_count = models.IntegerField(default=0)
+    delivery_count = models.IntegerField(default=0)
+    bounce_count = models.IntegerField(default=0)
+    complaint_count = models.IntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-last_event_at']
+        verbose_name = 'Recipient State'
+        verbose_name_plural = 'Recipient States'
+    
+    def __str__(self):
+        return f"{self.email} - {self.get_last_event_type_display()}"
+    
+    @property
+    def is_healthy(self):
+        """No complaints and the latest event is not a permanent bounce"""
+        if self.complaint_count:
+            return False
+        return not (self.last_event_type == 'bounce' and self.last_bounce_type == 'Permanent')
+    
+    @classmethod
+    def is_address_healthy(cls, email):
+        """Primary-key lookup; unknown addresses are considered healthy"""
+        state = cls.objects.filter(pk=(email or '').strip().lower()).first()
+        return state.is_healthy if state else True
+
+
+
+class SNSSubscription(models.Model):
+    """
+    SNS SubscriptionConfirmations that have been handled, one row per
+    SubscribeURL.
+    
+    A SubscribeURL carries the subscription's one-time token, so repeats of
+    a confirmed URL are skipped while a re-subscribe to the same topic (new
+    token, new URL) is confirmed again.
+    """
+    topic_arn = models.CharField(max_length=500, db_index=True)
+    subscribe_url = models.TextField()
+    url_hash = models.CharField(max_length=64, unique=True)  # sha256 of subscribe_url
+    confirmed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-updated_at']
+        verbose_name = 'SNS Subscription'
+        verbose_name_plural = 'SNS Subscriptions'
+    
+    def __str__(self):
+        state = 'confirmed' if self.confirmed_at else 'pending'
+        return f"{self.topic_arn} - {state}"
+
+
+
+class DirtyDay(models.Model):
+    """
+    Days that received events since they were last aggregated.
+    
+    Ingest marks the (local) day of each event; aggregate_daily_stats
+    --dirty re-aggregates the marked days and removes a mark only if it was
+    not renewed while the day was being aggregated.
+    """
+    date = models.DateField(unique=True)
+    marked_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['date']
+        verbose_name = 'Dirty Day'
+        verbose_name_plural = 'Dirty Days'
+    
+    def __str__(self):
+        return f"{self.date} (marked {self.marked_at})"
+    
+    @classmethod
+    def mark(cls, timestamps):
+        """
+        Mark the days of timestamps; one UPDATE when they are all already marked.
+        
+        Days this process marked (and committed) less than
+        SES_TRACKING_DIRTY_MARK_INTERVAL seconds ago are skipped, so ingest
+        does not rewrite today's row for every notification.
+        aggregate_daily_stats --dirty keeps marks younger than the interval
+        to make up for the skipped renewals.
+        """
+        dates = {
+            timezone.localtime(ts).date() if timezone.is_aware(ts) else ts.date()
+            for ts in timestamps
+        }
+        interval = getattr(settings, 'SES_TRACKING_DIRTY_MARK_INTERVAL', 10)
+        started = time.monotonic()
+        dates = {
+            date for date in dates
+            if started - _recently_marked.get(date, float('-inf')) >= interval
+        }
+        if not dates:
+            return
+        now = timezone.now()
+        if cls.objects.filter(date__in=dates).update(marked_at=now) < len(dates):
+            cls.objects.bulk_create(
+                [cls(date=date, marked_at=now) for date in dates],
+                ignore_conflicts=True,
+            )
+        
+        def remember():
+            # Only once committed: a rolled-back mark must not suppress the next one
+            for date in dates:
+                _recently_marked[date] = started
+            if len(_recently_marked) > 1000:
+                for date, marked in list(_recently_marked.items()):
+                    if started - marked >= interval:
+                        _recently_marked.pop(date, None)
+        
+        transaction.on_commit(remember)
+
+
+# date -> time.monotonic() of this process's last committed DirtyDay mark
+_recently_marked = {}
+
+
+
+class DeliveryLatencySketch(models.Model):
+    """
+    Delivery latency distribution for one day and recipient domain.
+    
+    Both columns hold serialized DDSketches (see sketches.py) in
+    milliseconds: SES's processingTimeMillis, and the gap from
+    mail.timestamp to delivery.timestamp. Percentiles for any range come
+    from merging rows, never from scanning delivery events.
+    """
+    date = models.DateField()
+    domain = models.CharField(max_length=255)
+    processing_time = models.JSONField(default=dict)
+    end_to_end = models.JSONField(default=dict)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-date', 'domain']
+        unique_together = [('date', 'domain')]
+        verbose_name = 'Delivery Latency Sketch'
+        verbose_name_plural = 'Delivery Latency Sketches'
+    
+    def __str__(self):
+        return f"{self.date} {self.domain} ({self.count} deliveries)"
+
+
+
+class ProcessedNotification(models.Model):
+    """
+    Notifications already stored by the SQS consumer, so a redelivered
+    message is acknowledged without storing its events twice.
+    
+    message_id is the SNS MessageId, or the SQS MessageId for raw message
+    delivery. The row is inserted in the same transaction as the events.
+    """
+    message_id = models.CharField(max_length=100, unique=True)
+    processed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        ordering = ['-processed_at']
+        verbose_name = 'Processed Notification'
+        verbose_name_plural = 'Processed Notifications'
+    
+    def __str__(self):
+        return f"{self.message_id} - {self.processed_at}"
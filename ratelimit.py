@@ -0,0 +1,120 @@
+# ses_tracking/ratelimit.py
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    acquire() reserves a token and sleeps until it is available, so callers
+    on any number of threads are paced to ``rate`` per second with at most
+    ``burst`` sends back to back. The total and last wait are kept for
+    reporting.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.total_wait = 0.0
+        self.last_wait = 0.0
+
+    def _reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Going negative reserves a future token; the debt is the wait
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.total_wait += wait
+            self.last_wait = wait
+            return wait
+
+    def acquire(self):
+        """Block until a send is allowed; return the seconds waited"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class CacheTokenBucket(TokenBucket):
+    """
+    Token bucket shared by every process using the same Django cache.
+
+    The bucket state (tokens, last update) lives under one cache key and is
+    updated under a short cache lock taken with atomic cache.add, so rate,
+    burst and fractional rates behave exactly as in TokenBucket; only the
+    wall clock replaces the monotonic one. Needs a cache backend shared
+    between processes with atomic add (Redis, Memcached).
+    """
+
+    lock_timeout = 1  # Seconds before a lock left by a dead process expires
+
+    def __init__(self, rate, burst=1, cache_alias='default', key='ses_tracking:send_rate'):
+        from django.core.cache import caches
+
+        super().__init__(rate, burst)
+        self.cache = caches[cache_alias]
+        self.key = key
+        self.lock_key = f'{key}:lock'
+
+    def _reserve(self):
+        token = uuid.uuid4().hex
+        while not self.cache.add(self.lock_key, token, timeout=self.lock_timeout):
+            time.sleep(0.001)
+        try:
+            now = time.time()
+            state = self.cache.get(self.key)
+            tokens, updated = state if state is not None else (self.burst, now)
+            tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+            # Going negative reserves a future token; the debt is the wait
+            tokens -= 1
+            # Keep the state until the bucket would be full again anyway
+            self.cache.set(self.key, (tokens, now), timeout=int((self.burst - tokens) / self.rate) + 60)
+        finally:
+            # Only release our own lock, not one taken after ours expired
+            if self.cache.get(self.lock_key) == token:
+                self.cache.delete(self.lock_key)
+
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        with self._lock:
+            self.total_wait += wait
+            self.last_wait = wait
+        return wait
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(rate, burst=None):
+    """
+    Return the process-wide limiter for rate.
+
+    When SES_TRACKING_RATE_LIMIT_CACHE names a cache alias the limiter is
+    shared across processes through that cache; otherwise it is shared
+    across threads of this process. Burst defaults to AWS_SES_SEND_BURST.
+    """
+    if burst is None:
+        burst = getattr(settings, 'AWS_SES_SEND_BURST', 1)
+    cache_alias = getattr(settings, 'SES_TRACKING_RATE_LIMIT_CACHE', None)
+
+    key = (float(rate), burst, cache_alias)
+    with _limiters_lock:
+        if key not in _limiters:
+            if cache_alias:
+                _limiters[key] = CacheTokenBucket(rate, burst, cache_alias=cache_alias)
+            else:
+                _limiters[key] = TokenBucket(rate, burst)
+        return _limiters[key]
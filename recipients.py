@@ -0,0 +1,70 @@
+# ses_tracking/recipients.py
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import RecipientState
+
+
+COUNTERS = {
+    'send': 'send_count',
+    'delivery': 'delivery_count',
+    'bounce': 'bounce_count',
+    'complaint': 'complaint_count',
+}
+
+
+def update_recipient_states(events):
+    """
+    Upsert RecipientState for a batch of newly created SESEvents.
+
+    Missing rows are inserted (ignoring conflicts), then events are grouped
+    by (type, bounce type, timestamp) - one group for a typical notification
+    however many recipients it has - and each group is applied with
+    set-based UPDATEs: an atomic F() increment of the counter, and
+    conditional updates of the last event and first-seen time. Concurrent
+    batches for the same address therefore never lose counts and no row
+    locks are held across statements.
+    """
+    by_email = defaultdict(list)
+    for event in events:
+        email = (event.email or '').strip().lower()
+        if email:
+            by_email[email].append(event)
+    if not by_email:
+        return
+
+    groups = defaultdict(list)
+    for email, batch in by_email.items():
+        seen = Counter((e.event_type, e.bounce_type or None, e.timestamp) for e in batch)
+        for key, count in seen.items():
+            groups[key + (count,)].append(email)
+
+    now = timezone.now()
+    with transaction.atomic():
+        RecipientState.objects.bulk_create(
+            [
+                RecipientState(
+                    email=email,
+                    last_event_type=batch[0].event_type,
+                    last_event_at=batch[0].timestamp,
+                    first_seen_at=batch[0].timestamp,
+                )
+                for email, batch in by_email.items()
+            ],
+            ignore_conflicts=True,
+        )
+
+        for (event_type, bounce_type, timestamp, count), emails in groups.items():
+            states = RecipientState.objects.filter(email__in=emails)
+            counter = COUNTERS.get(event_type)
+            if counter:
+                states.update(**{counter: F(counter) + count, 'updated_at': now})
+
+            latest = {'last_event_type': event_type, 'last_event_at': timestamp, 'updated_at': now}
+            if event_type == 'bounce':
+                latest['last_bounce_type'] = bounce_type
+            states.filter(last_event_at__lte=timestamp).update(**latest)
+            states.filter(first_seen_at__gt=timestamp).update(first_seen_at=timestamp)
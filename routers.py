@@ -0,0 +1,64 @@
+# ses_tracking/routers.py
+"""
+Send ses_tracking's heavy read paths to a read replica.
+
+Add the router and name the replica alias in settings:
+
+    DATABASE_ROUTERS = ['ses_tracking.routers.ReplicaRouter']
+    SES_TRACKING_REPLICA_DATABASE = 'replica'
+
+Only reads made inside replica_reads() are routed: the stats/events API,
+admin changelists and aggregate_daily_stats's scans. Everything else,
+including the webhook and any read inside a transaction on the primary,
+stays on the primary so read-after-write paths see their own writes.
+"""
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_replica_reads = ContextVar('ses_tracking_replica_reads', default=False)
+
+
+def replica_alias():
+    return getattr(settings, 'SES_TRACKING_REPLICA_DATABASE', None)
+
+
+class replica_reads(ContextDecorator):
+    """Route ses_tracking reads in this block (or decorated function) to the replica"""
+
+    def _recreate_cm(self):
+        # A fresh instance per use keeps decorated functions reentrant
+        return type(self)()
+
+    def __enter__(self):
+        self._token = _replica_reads.set(True)
+        return self
+
+    def __exit__(self, *exc_info):
+        _replica_reads.reset(self._token)
+        return False
+
+
+class ReplicaRouter:
+    app_label = 'ses_tracking'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != self.app_label or not _replica_reads.get():
+            return None
+        alias = replica_alias()
+        if not alias or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == replica_alias():
+            return False
+        return None
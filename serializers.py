@@ -88,6 +88,10 @@ class SESEventSerializer(serializers.ModelSerializer):
     """
     event_type_display = serializers.CharField(source='get_event_type_display', read_only=True)
     bounce_type_display = serializers.CharField(source='get_bounce_type_display', read_only=True)
+    email_subject = serializers.CharField(source='email_subject.value', read_only=True, allow_null=True)
+    bounce_sub_type = serializers.CharField(source='bounce_sub_type.value', read_only=True, allow_null=True)
+    complaint_feedback_type = serializers.CharField(source='complaint_feedback_type.value', read_only=True, allow_null=True)
+    reject_reason = serializers.CharField(source='reject_reason.value', read_only=True, allow_null=True)
     
     class Meta:
         model = SESEvent
@@ -107,4 +111,127 @@ class SESEventSerializer(serializers.ModelSerializer):
             'reject_reason',
             'message_id',
         ]
-        read_only_fields = fields
\ No newline at end of file
+        read_only_fields = fields
+
+
+# ---------------------------------------------------------------------------
+# Lean serialization
+#
+# The functions below produce the same output as the ModelSerializers above
+# from ``.values()`` rows. They skip model instantiation and per-field
+# serializer dispatch, which dominates the cost of DataTables pages and
+# exports. Keep the field lists in sync with the serializers' Meta.fields.
+# ---------------------------------------------------------------------------
+
+EVENT_TYPE_LABELS = dict(SESEvent.EVENT_TYPES)
+BOUNCE_TYPE_LABELS = dict(SESEvent.BOUNCE_TYPES)
+
+SES_EVENT_VALUES_FIELDS = [
+    'id',
+    'event_type',
+    'timestamp',
+    'email',
+    'email_to',
+    'email_subject__value',
+    'email_message_id',
+    'bounce_type',
+    'bounce_sub_type__value',
+    'complaint_feedback_type__value',
+    'reject_reason__value',
+    'message_id',
+]
+
+DAILY_STATS_VALUES_FIELDS = [
+    field for field in DailyEmailStatsSerializer.Meta.fields
+    if not field.endswith('_display')
+]
+
+_datetime_field = serializers.DateTimeField()
+
+# Same field ModelSerializer builds for the rate columns, so the output
+# follows REST_FRAMEWORK['COERCE_DECIMAL_TO_STRING'] like the serializer's
+_rate_model_field = DailyEmailStats._meta.get_field('bounce_rate')
+_rate_field = serializers.DecimalField(
+    max_digits=_rate_model_field.max_digits,
+    decimal_places=_rate_model_field.decimal_places,
+)
+
+
+def _datetime(value):
+    return _datetime_field.to_representation(value) if value is not None else None
+
+
+def _date(value):
+    return value.isoformat() if value is not None else None
+
+
+def _rate(value):
+    return _rate_field.to_representation(value) if value is not None else None
+
+
+def serialize_event_rows(rows):
+    """
+    Serialize SESEvent ``.values(*SES_EVENT_VALUES_FIELDS)`` rows.
+    
+    Output matches SESEventSerializer.
+    """
+    event_labels = EVENT_TYPE_LABELS
+    bounce_labels = BOUNCE_TYPE_LABELS
+    for row in rows:
+        event_type = row['event_type']
+        bounce_type = row['bounce_type']
+        yield {
+            'id': row['id'],
+            'event_type': event_type,
+            'event_type_display': event_labels.get(event_type, event_type),
+            'timestamp': _datetime(row['timestamp']),
+            'email': row['email'],
+            'email_to': row['email_to'],
+            'email_subject': row['email_subject__value'],
+            'email_message_id': row['email_message_id'],
+            'bounce_type': bounce_type,
+            'bounce_type_display': bounce_labels.get(bounce_type, bounce_type),
+            'bounce_sub_type': row['bounce_sub_type__value'],
+            'complaint_feedback_type': row['complaint_feedback_type__value'],
+            'reject_reason': row['reject_reason__value'],
+            'message_id': row['message_id'],
+        }
+
+
+def _percent(value):
+    return f"{value}%"
+
+
+def _daily_stats_plan(fields):
+    """Resolve (output key, source column, converter) once per call"""
+    plan = []
+    for field in fields:
+        if field.endswith('_display'):
+            plan.append((field, field[:-len('_display')], _percent))
+        elif field.endswith('_rate'):
+            plan.append((field, field, _rate))
+        elif field == 'date':
+            plan.append((field, field, _date))
+        elif field in ('created_at', 'updated_at'):
+            plan.append((field, field, _datetime))
+        else:
+            plan.append((field, field, None))
+    return plan
+
+
+def serialize_daily_stats_rows(rows, summary=False):
+    """
+    Serialize DailyEmailStats ``.values()`` rows.
+    
+    Output matches DailyEmailStatsSerializer, or DailyEmailStatsSummarySerializer
+    when summary is True.
+    """
+    plan = _daily_stats_plan(
+        DailyEmailStatsSummarySerializer.Meta.fields if summary
+        else DailyEmailStatsSerializer.Meta.fields
+    )
+    for row in rows:
+        yield {
+            key: convert(row[source]) if convert else row[source]
+            for key, source, convert in plan
+        }
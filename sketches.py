@@ -0,0 +1,108 @@
+# ses_tracking/sketches.py
+"""
+DDSketch quantile sketches for delivery latency.
+
+A DDSketch maps each positive value x to the bucket ceil(log_gamma(x)) with
+gamma = (1 + alpha) / (1 - alpha), so every quantile it returns is within
+relative error alpha of the true value. Sketches merge by adding bucket
+counts, which makes per-day, per-domain sketches combinable into any range
+without touching the raw events. Latencies from 1 ms to a day need about
+900 buckets at the default 1% accuracy.
+"""
+import math
+
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_MAX_BUCKETS = 2048
+MIN_VALUE = 1e-9  # Values at or below this are counted in the zero bucket
+
+
+class DDSketch:
+    """Mergeable quantile sketch with relative-error guarantees"""
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY, max_buckets=DEFAULT_MAX_BUCKETS):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, value, count=1):
+        if value <= MIN_VALUE:
+            self.zero_count += count
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        self.count += count
+        self.sum += value * count
+
+    def _collapse(self):
+        # Fold the lowest buckets together; only the smallest quantiles lose accuracy
+        indexes = sorted(self.buckets)
+        excess = len(indexes) - self.max_buckets + 1
+        target = indexes[excess]
+        self.buckets[target] += sum(self.buckets.pop(index) for index in indexes[:excess])
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError('Cannot merge sketches with different relative accuracy')
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        return self
+
+    def quantile(self, q):
+        """Estimated value at quantile q (0..1), or None for an empty sketch"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def summary(self, quantiles=(0.5, 0.95, 0.99), precision=1):
+        """Count, mean and the given quantiles as a JSON-friendly dict"""
+        result = {
+            'count': self.count,
+            'mean': round(self.sum / self.count, precision) if self.count else None,
+        }
+        for q in quantiles:
+            value = self.quantile(q)
+            result[f'p{round(q * 100):g}'] = round(value, precision) if value is not None else None
+        return result
+
+    def to_dict(self):
+        indexes = sorted(self.buckets)
+        return {
+            'alpha': self.relative_accuracy,
+            'zero': self.zero_count,
+            'count': self.count,
+            'sum': self.sum,
+            'index': indexes,
+            'counts': [self.buckets[index] for index in indexes],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data:
+            return cls()
+        sketch = cls(relative_accuracy=data.get('alpha', DEFAULT_RELATIVE_ACCURACY))
+        sketch.buckets = dict(zip(data.get('index', []), data.get('counts', [])))
+        sketch.zero_count = data.get('zero', 0)
+        sketch.count = data.get('count', 0)
+        sketch.sum = data.get('sum', 0.0)
+        return sketch
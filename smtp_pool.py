@@ -0,0 +1,120 @@
+# ses_tracking/smtp_pool.py
+import logging
+import smtplib
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PooledConnection:
+    """An authenticated SMTP session plus the bookkeeping used for eviction"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.messages_sent = 0
+        self.broken = False
+
+    @property
+    def age(self):
+        return time.monotonic() - self.created_at
+
+    @property
+    def idle(self):
+        return time.monotonic() - self.last_used
+
+    def close(self):
+        try:
+            self.connection.quit()
+        except (smtplib.SMTPException, OSError):
+            try:
+                self.connection.close()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+
+class SMTPConnectionPool:
+    """
+    Process-wide pool of open SMTP sessions, keyed by server and credentials.
+
+    Connections are evicted once they exceed max_age seconds or
+    max_messages sent, and connections idle for longer than
+    health_check_after seconds are probed with NOOP before reuse.
+    """
+
+    def __init__(self, max_size=4, max_age=300, max_messages=100, health_check_after=5):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.max_messages = max_messages
+        self.health_check_after = health_check_after
+        self._idle = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def _expired(self, pooled):
+        return (
+            pooled.broken
+            or pooled.age >= self.max_age
+            or pooled.messages_sent >= self.max_messages
+        )
+
+    def _healthy(self, pooled):
+        if pooled.idle < self.health_check_after:
+            return True
+        try:
+            return pooled.connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def checkout(self, key):
+        """Return a live pooled connection for key, or None"""
+        while True:
+            with self._lock:
+                idle = self._idle[key]
+                if not idle:
+                    return None
+                pooled = idle.pop()
+
+            if not self._expired(pooled) and self._healthy(pooled):
+                return pooled
+            pooled.close()
+
+    def checkin(self, key, pooled):
+        """Return a connection to the pool, closing it if it should not be reused"""
+        pooled.last_used = time.monotonic()
+        if not self._expired(pooled):
+            with self._lock:
+                idle = self._idle[key]
+                if len(idle) < self.max_size:
+                    idle.append(pooled)
+                    return
+        pooled.close()
+
+    def clear(self):
+        with self._lock:
+            pools, self._idle = self._idle, defaultdict(deque)
+        for idle in pools.values():
+            for pooled in idle:
+                pooled.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool, configured from settings on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SMTPConnectionPool(
+                max_size=getattr(settings, 'SES_TRACKING_SMTP_POOL_SIZE', 4),
+                max_age=getattr(settings, 'SES_TRACKING_SMTP_POOL_MAX_AGE', 300),
+                max_messages=getattr(settings, 'SES_TRACKING_SMTP_POOL_MAX_MESSAGES', 100),
+                health_check_after=getattr(settings, 'SES_TRACKING_SMTP_POOL_HEALTH_CHECK_AFTER', 5),
+            )
+        return _pool
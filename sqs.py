@@ -0,0 +1,250 @@
+# ses_tracking/sqs.py
+"""
+Consume SES notifications from an SQS queue subscribed to the SES topic.
+
+An alternative to the HTTP webhook: SNS delivers into SQS, which holds
+events through spikes and outages, and any number of consume_ses_sqs
+processes drain it in parallel. SQS hides each received message from the
+other consumers for the queue's visibility timeout, so a message is
+processed by one consumer at a time, and only messages whose events were
+committed are deleted. Failures reappear after the timeout and end up in
+the queue's dead-letter queue if a redrive policy is configured.
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from . import metrics
+from .latency import latency_buffer
+from .models import ProcessedNotification
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGES = 10  # SQS limit per ReceiveMessage / DeleteMessageBatch call
+
+
+def get_sqs_client(region, endpoint_url=None):
+    import boto3
+    return boto3.client('sqs', region_name=region, endpoint_url=endpoint_url)
+
+
+def unwrap(body):
+    """
+    Return the SES notification carried by an SQS message body, or None for
+    SNS envelopes that carry no notification (subscription confirmations).
+
+    Handles both SNS envelopes and raw message delivery. Raises ValueError
+    for bodies that are not JSON.
+    """
+    payload = json.loads(body)
+    if 'Type' in payload and 'Message' in payload:
+        if payload['Type'] != 'Notification':
+            return None
+        return json.loads(payload['Message'])
+    return payload
+
+
+def notification_id(message):
+    """
+    Dedup key for an SQS message: the SNS MessageId of its envelope, which
+    is the same for every copy SNS delivers, or the SQS MessageId for raw
+    message delivery.
+    """
+    try:
+        payload = json.loads(message['Body'])
+    except ValueError:
+        payload = None
+    if isinstance(payload, dict) and 'Type' in payload and payload.get('MessageId'):
+        return payload['MessageId']
+    return message['MessageId']
+
+
+class SQSConsumer:
+    """
+    Long-poll one queue and feed its messages to process_ses_message.
+
+    Each message is committed in its own transaction, so row locks on the
+    shared derived rows (dirty days, recipient states, latency sketches)
+    are held for one message only and parallel consumers do not queue
+    behind each other's batches. A bad message only rolls back itself and
+    is left on the queue; the rest are deleted with one DeleteMessageBatch
+    call. Each notification's id is recorded in ProcessedNotification with
+    its events, so a redelivered message is acknowledged without storing
+    its events twice.
+    """
+    
+    prune_interval = 3600  # Seconds between ProcessedNotification clean-ups
+
+    def __init__(self, client, queue_url, wait_time=20, max_messages=MAX_MESSAGES, visibility_timeout=None):
+        self.client = client
+        self.queue_url = queue_url
+        self.wait_time = wait_time
+        self.max_messages = max(1, min(max_messages, MAX_MESSAGES))
+        self.visibility_timeout = visibility_timeout
+        self.stopped = threading.Event()
+        self.processed = 0
+        self.failed = 0
+        self.duplicates = 0
+        self._pruned_at = None
+
+    def receive(self):
+        params = {
+            'QueueUrl': self.queue_url,
+            'MaxNumberOfMessages': self.max_messages,
+            'WaitTimeSeconds': self.wait_time,
+        }
+        if self.visibility_timeout is not None:
+            params['VisibilityTimeout'] = self.visibility_timeout
+        return self.client.receive_message(**params).get('Messages', [])
+
+    def process_batch(self, messages):
+        """Process messages and return the receipt handles that can be deleted"""
+        from .webhooks import process_ses_message
+
+        acknowledged = []
+        duplicates = 0
+        for message in messages:
+            try:
+                with transaction.atomic():
+                    # Inserted first: a copy being processed by another
+                    # consumer blocks here until that one commits
+                    _, created = ProcessedNotification.objects.get_or_create(
+                        message_id=notification_id(message)
+                    )
+                    if created:
+                        ses_message = unwrap(message['Body'])
+                        if ses_message is not None:
+                            process_ses_message(ses_message)
+                    else:
+                        duplicates += 1
+            except Exception as e:
+                self.failed += 1
+                metrics.inc('sqs_messages_total', outcome='failed')
+                logger.error(
+                    f"Error processing SQS message {message.get('MessageId')}: {str(e)}",
+                    exc_info=True,
+                )
+                continue
+            acknowledged.append(message['ReceiptHandle'])
+        self.processed += len(acknowledged) - duplicates
+        self.duplicates += duplicates
+        metrics.inc('sqs_messages_total', len(acknowledged) - duplicates, outcome='processed')
+        if duplicates:
+            metrics.inc('dedup_hits_total', duplicates, kind='sqs_message')
+        return acknowledged
+    
+    def prune(self):
+        """Forget notification ids older than SES_TRACKING_SQS_DEDUP_RETENTION days"""
+        retention = getattr(settings, 'SES_TRACKING_SQS_DEDUP_RETENTION', 14)
+        cutoff = timezone.now() - timedelta(days=retention)
+        ProcessedNotification.objects.filter(processed_at__lt=cutoff).delete()
+        self._pruned_at = time.monotonic()
+
+    def delete(self, receipt_handles):
+        if not receipt_handles:
+            return
+        response = self.client.delete_message_batch(
+            QueueUrl=self.queue_url,
+            Entries=[
+                {'Id': str(index), 'ReceiptHandle': handle}
+                for index, handle in enumerate(receipt_handles)
+            ],
+        )
+        for failure in response.get('Failed', []):
+            # Already committed; the redelivery will be stored again
+            logger.warning(f"Failed to delete SQS message {failure.get('Id')}: {failure.get('Message')}")
+
+    def poll_once(self):
+        """Receive, process and delete one batch; return the number received"""
+        messages = self.receive()
+        if not messages:
+            return 0
+        close_old_connections()
+        with metrics.timer('sqs_batch_duration_seconds'):
+            self.delete(self.process_batch(messages))
+        return len(messages)
+
+    def run(self, max_batches=None, idle_exit=False):
+        """
+        Poll until stop() is called, max_batches non-empty batches were
+        handled, or (with idle_exit) a receive comes back empty.
+        """
+        batches = 0
+        while not self.stopped.is_set():
+            try:
+                if self._pruned_at is None or time.monotonic() - self._pruned_at > self.prune_interval:
+                    self.prune()
+                received = self.poll_once()
+            except Exception as e:
+                logger.error(f"Error polling SQS queue {self.queue_url}: {str(e)}", exc_info=True)
+                self.stopped.wait(5)
+                continue
+            if received:
+                batches += 1
+                if max_batches and batches >= max_batches:
+                    break
+            elif idle_exit:
+                break
+        latency_buffer.flush()
+
+    def stop(self):
+        self.stopped.set()
+
+
+class StubSQSClient:
+    """
+    In-memory stand-in for the SQS client, for tests.
+
+    Received messages are hidden for visibility_timeout seconds and come
+    back unless deleted, like a real queue.
+
+    Usage: SQSConsumer(StubSQSClient(), 'stub-queue')
+    """
+
+    def __init__(self, visibility_timeout=30):
+        self.visibility_timeout = visibility_timeout
+        self.messages = {}  # MessageId -> [body, visible_at, receipt_handle]
+        self.deleted = []
+        self._lock = threading.Lock()
+
+    def send_message(self, QueueUrl, MessageBody, **kwargs):
+        message_id = str(uuid.uuid4())
+        with self._lock:
+            self.messages[message_id] = [MessageBody, 0.0, None]
+        return {'MessageId': message_id}
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages=1, WaitTimeSeconds=0, VisibilityTimeout=None, **kwargs):
+        timeout = self.visibility_timeout if VisibilityTimeout is None else VisibilityTimeout
+        now = time.monotonic()
+        received = []
+        with self._lock:
+            for message_id, entry in self.messages.items():
+                if len(received) >= MaxNumberOfMessages:
+                    break
+                if entry[1] <= now:
+                    entry[1] = now + timeout
+                    entry[2] = f'{message_id}:{uuid.uuid4()}'
+                    received.append({'MessageId': message_id, 'ReceiptHandle': entry[2], 'Body': entry[0]})
+        return {'Messages': received} if received else {}
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        successful, failed = [], []
+        with self._lock:
+            for entry in Entries:
+                message_id = entry['ReceiptHandle'].split(':', 1)[0]
+                current = self.messages.get(message_id)
+                if current and current[2] == entry['ReceiptHandle']:
+                    del self.messages[message_id]
+                    self.deleted.append(message_id)
+                    successful.append({'Id': entry['Id']})
+                else:
+                    failed.append({'Id': entry['Id'], 'Code': 'ReceiptHandleIsInvalid', 'Message': 'Stale receipt handle'})
+        return {'Successful': successful, 'Failed': failed}
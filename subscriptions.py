@@ -0,0 +1,147 @@
+# ses_tracking/subscriptions.py
+import hashlib
+import logging
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from . import metrics
+from .models import SNSSubscription
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ses-sns-confirm')
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+# Where SNS serves SubscribeURLs; override for LocalStack and similar
+DEFAULT_URL_PATTERN = r'^https://sns\.[a-z0-9-]+\.amazonaws\.com(\.cn)?/'
+
+
+def url_hash(subscribe_url):
+    """Dedup key: the URL carries the subscription's one-time token"""
+    return hashlib.sha256(subscribe_url.encode('utf-8')).hexdigest()
+
+
+def validate_subscribe_url(subscribe_url, topic_arn):
+    """
+    Return why subscribe_url must not be fetched, or None if it is safe.
+
+    The URL must match SES_TRACKING_SNS_CONFIRM_URL_PATTERN (https on an SNS
+    endpoint by default) and confirm the message's own TopicArn, so an
+    unauthenticated POST cannot make this process fetch arbitrary URLs.
+    """
+    pattern = getattr(settings, 'SES_TRACKING_SNS_CONFIRM_URL_PATTERN', DEFAULT_URL_PATTERN)
+    if not re.match(pattern, subscribe_url):
+        return 'SubscribeURL is not an SNS endpoint'
+    query = parse_qs(urlsplit(subscribe_url).query)
+    if query.get('Action') != ['ConfirmSubscription']:
+        return 'SubscribeURL is not a ConfirmSubscription request'
+    if not topic_arn or query.get('TopicArn') != [topic_arn]:
+        return 'SubscribeURL does not match TopicArn'
+    return None
+
+
+def is_confirmed(subscribe_url):
+    return SNSSubscription.objects.filter(url_hash=url_hash(subscribe_url), confirmed_at__isnull=False).exists()
+
+
+def _record_attempts(topic_arn, subscribe_url, attempts, error=''):
+    key = url_hash(subscribe_url)
+    SNSSubscription.objects.get_or_create(
+        url_hash=key, defaults={'topic_arn': topic_arn, 'subscribe_url': subscribe_url}
+    )
+    updates = {'attempts': F('attempts') + attempts, 'last_error': error, 'updated_at': timezone.now()}
+    if not error:
+        updates['confirmed_at'] = timezone.now()
+    SNSSubscription.objects.filter(url_hash=key).update(**updates)
+
+
+def confirm_subscription(topic_arn, subscribe_url):
+    """
+    Fetch subscribe_url, retrying with exponential backoff.
+
+    Each attempt is bounded by SES_TRACKING_SNS_CONFIRM_TIMEOUT seconds and
+    at most SES_TRACKING_SNS_CONFIRM_RETRIES retries are made. The outcome is
+    recorded on the URL's SNSSubscription row. Returns True on success.
+    The URL must already have passed validate_subscribe_url.
+    """
+    timeout = getattr(settings, 'SES_TRACKING_SNS_CONFIRM_TIMEOUT', 10)
+    retries = getattr(settings, 'SES_TRACKING_SNS_CONFIRM_RETRIES', 3)
+    backoff = getattr(settings, 'SES_TRACKING_SNS_CONFIRM_BACKOFF', 1)
+
+    error = ''
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(backoff * 2 ** (attempt - 1))
+        try:
+            with urllib.request.urlopen(subscribe_url, timeout=timeout) as response:
+                response.read()
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            error = str(e)
+            logger.warning(f"SNS subscription confirmation for {topic_arn} failed (attempt {attempt + 1}): {error}")
+            continue
+        _record_attempts(topic_arn, subscribe_url, attempt + 1)
+        logger.info(f"SNS Subscription confirmed successfully: {topic_arn}")
+        return True
+
+    _record_attempts(topic_arn, subscribe_url, retries + 1, error)
+    logger.error(f"Giving up confirming SNS subscription for {topic_arn}: {error}")
+    return False
+
+
+def _confirm_in_background(topic_arn, subscribe_url):
+    close_old_connections()
+    try:
+        confirm_subscription(topic_arn, subscribe_url)
+    except Exception as e:
+        logger.error(f"Error confirming SNS subscription for {topic_arn}: {str(e)}", exc_info=True)
+    finally:
+        close_old_connections()
+        with _in_flight_lock:
+            _in_flight.discard(url_hash(subscribe_url))
+
+
+def schedule_confirmation(message_data):
+    """
+    Queue a SubscriptionConfirmation for background confirmation.
+
+    Returns the Future, or None when the SubscribeURL is rejected by
+    validate_subscribe_url, was already confirmed, or is already being
+    confirmed in this process. Deduplication is per SubscribeURL (and so per
+    token): a re-subscribe to a confirmed topic is confirmed again.
+    """
+    topic_arn = message_data.get('TopicArn') or ''
+    subscribe_url = message_data.get('SubscribeURL')
+    if not subscribe_url:
+        logger.warning(f"SubscriptionConfirmation without SubscribeURL for {topic_arn}")
+        return None
+
+    error = validate_subscribe_url(subscribe_url, topic_arn)
+    if error:
+        logger.warning(f"Ignoring SubscriptionConfirmation for {topic_arn}: {error} ({subscribe_url})")
+        metrics.inc('subscription_rejected_total')
+        return None
+
+    if is_confirmed(subscribe_url):
+        logger.info(f"SNS subscription already confirmed, skipping: {topic_arn}")
+        metrics.inc('dedup_hits_total', kind='subscription_confirmation')
+        return None
+
+    key = url_hash(subscribe_url)
+    with _in_flight_lock:
+        if key in _in_flight:
+            metrics.inc('dedup_hits_total', kind='subscription_confirmation')
+            return None
+        _in_flight.add(key)
+
+    return _executor.submit(_confirm_in_background, topic_arn, subscribe_url)
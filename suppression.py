@@ -0,0 +1,213 @@
+# ses_tracking/suppression.py
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .models import SuppressedAddress
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_address(email):
+    return (email or '').strip().lower()
+
+
+def _threshold():
+    return getattr(settings, 'SES_TRACKING_TRANSIENT_BOUNCE_THRESHOLD', 3)
+
+
+def suppress_addresses(emails, reason, timestamp=None):
+    """
+    Mark addresses as suppressed, creating rows as needed.
+
+    One query to find existing rows, one bulk insert and one bulk update
+    per call, regardless of the number of addresses.
+    """
+    emails = {normalize_address(email) for email in emails} - {''}
+    if not emails:
+        return
+
+    now = timezone.now()
+    timestamp = timestamp or now
+
+    existing = set(
+        SuppressedAddress.objects.filter(email__in=emails).values_list('email', flat=True)
+    )
+    SuppressedAddress.objects.bulk_create(
+        [
+            SuppressedAddress(email=email, suppressed=True, reason=reason, last_event_at=timestamp)
+            for email in emails - existing
+        ],
+        ignore_conflicts=True,
+    )
+    if existing:
+        SuppressedAddress.objects.filter(email__in=existing).update(
+            suppressed=True,
+            reason=reason,
+            last_event_at=timestamp,
+            updated_at=now,
+        )
+
+    suppression_cache.add_on_commit(emails)
+    logger.info(f"Suppressed {len(emails)} address(es): {reason}")
+
+
+def record_transient_bounces(emails, timestamp=None):
+    """
+    Count a transient bounce against each address and suppress the ones
+    that reached SES_TRACKING_TRANSIENT_BOUNCE_THRESHOLD.
+    """
+    emails = {normalize_address(email) for email in emails} - {''}
+    if not emails:
+        return
+
+    now = timezone.now()
+    timestamp = timestamp or now
+
+    SuppressedAddress.objects.bulk_create(
+        [SuppressedAddress(email=email, last_event_at=timestamp) for email in emails],
+        ignore_conflicts=True,
+    )
+    SuppressedAddress.objects.filter(email__in=emails).update(
+        transient_bounce_count=F('transient_bounce_count') + 1,
+        last_event_at=timestamp,
+        updated_at=now,
+    )
+
+    over_threshold = SuppressedAddress.objects.filter(
+        email__in=emails,
+        suppressed=False,
+        transient_bounce_count__gte=_threshold(),
+    )
+    newly_suppressed = list(over_threshold.values_list('email', flat=True))
+    if newly_suppressed:
+        over_threshold.update(suppressed=True, reason='transient', updated_at=now)
+        suppression_cache.add_on_commit(newly_suppressed)
+        logger.info(f"Suppressed {len(newly_suppressed)} address(es) after repeated transient bounces")
+
+
+def record_bounces(emails, bounce_type, timestamp=None):
+    """Update the suppression list for the recipients of one bounce notification"""
+    if bounce_type == 'Permanent':
+        suppress_addresses(emails, 'bounce', timestamp)
+    elif bounce_type == 'Transient':
+        record_transient_bounces(emails, timestamp)
+
+
+def record_complaints(emails, timestamp=None):
+    """Update the suppression list for the recipients of one complaint notification"""
+    suppress_addresses(emails, 'complaint', timestamp)
+
+
+class SuppressionCache:
+    """
+    Process-local set of suppressed addresses in front of SuppressedAddress.
+
+    Lookups are plain set membership tests. The set is refreshed at most
+    every SES_TRACKING_SUPPRESSION_REFRESH_INTERVAL seconds by fetching only
+    rows whose updated_at moved past the last watermark, and reloaded in full
+    every SES_TRACKING_SUPPRESSION_FULL_REFRESH_INTERVAL seconds so deleted
+    rows drop out.
+
+    updated_at is stamped before the writing transaction commits, so a row
+    can become visible after a newer one has already advanced the watermark.
+    Incremental refreshes therefore re-read the last
+    SES_TRACKING_SUPPRESSION_REFRESH_OVERLAP seconds before the watermark;
+    re-applying a row already seen is harmless since each row sets its
+    address's current state.
+    """
+
+    def __init__(self):
+        self._emails = frozenset()
+        self._watermark = None
+        self._next_refresh = 0.0
+        self._next_full_load = 0.0
+        self._lock = threading.Lock()
+
+    def _intervals(self):
+        return (
+            getattr(settings, 'SES_TRACKING_SUPPRESSION_REFRESH_INTERVAL', 60),
+            getattr(settings, 'SES_TRACKING_SUPPRESSION_FULL_REFRESH_INTERVAL', 3600),
+        )
+
+    def _full_load(self):
+        queryset = SuppressedAddress.objects.filter(suppressed=True)
+        self._emails = frozenset(queryset.values_list('email', flat=True))
+        self._watermark = SuppressedAddress.objects.aggregate(Max('updated_at'))['updated_at__max']
+
+    def _incremental_load(self):
+        if self._watermark is None:
+            return self._full_load()
+
+        overlap = timedelta(seconds=getattr(settings, 'SES_TRACKING_SUPPRESSION_REFRESH_OVERLAP', 300))
+        changes = list(
+            SuppressedAddress.objects.filter(updated_at__gte=self._watermark - overlap)
+            .values_list('email', 'suppressed', 'updated_at')
+        )
+        if not changes:
+            return
+
+        emails = set(self._emails)
+        for email, suppressed, updated_at in changes:
+            if suppressed:
+                emails.add(email)
+            else:
+                emails.discard(email)
+            self._watermark = max(self._watermark, updated_at)
+        self._emails = frozenset(emails)
+
+    def refresh(self, force=False):
+        """Bring the set up to date if the refresh interval has elapsed"""
+        now = time.monotonic()
+        if not force and now < self._next_refresh:
+            return
+
+        with self._lock:
+            if not force and now < self._next_refresh:
+                return
+            interval, full_interval = self._intervals()
+            if force or now >= self._next_full_load:
+                self._full_load()
+                self._next_full_load = now + full_interval
+            else:
+                self._incremental_load()
+            self._next_refresh = now + interval
+
+    def add(self, emails):
+        """Record addresses suppressed by this process without waiting for a refresh"""
+        with self._lock:
+            self._emails = self._emails | {normalize_address(email) for email in emails}
+
+    def add_on_commit(self, emails):
+        """add() once the surrounding transaction commits, so a rollback suppresses nothing"""
+        emails = list(emails)
+        transaction.on_commit(lambda: self.add(emails))
+
+    def clear(self):
+        with self._lock:
+            self._emails = frozenset()
+            self._watermark = None
+            self._next_refresh = 0.0
+            self._next_full_load = 0.0
+
+    def __contains__(self, email):
+        self.refresh()
+        return normalize_address(email) in self._emails
+
+    def suppressed_among(self, emails):
+        """Return the subset of emails (normalized) that are suppressed, in one lookup"""
+        self.refresh()
+        return {normalize_address(email) for email in emails} & self._emails
+
+
+suppression_cache = SuppressionCache()
+
+
+def is_suppressed(email):
+    return email in suppression_cache
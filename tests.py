@@ -1,3 +1,1436 @@
-from django.test import TestCase
+import asyncio
+import json
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlencode
 
-# Create your tests here.
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.mail import EmailMessage
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse
+from unittest import mock
+from django.utils import timezone
+
+from .admin import EstimatedCountPaginator, SESEventAdmin
+from . import aggregates
+from .aggregates import get_aggregate
+from .alerts import AlertEvaluator, alert_evaluator
+from .backend import PartialSendError, SESApiBackend, SESBackend, StubSESClient
+from .benchmarks import WEBHOOK_FORBIDDEN_MODULES, WEBHOOK_IMPORT_BUDGET_MS, probe_import, synthetic_notification
+from . import models as ses_models
+from .models import (
+    DailyEmailStats, DeliveryLatencySketch, DirtyDay, EmailSubject, OutboundMessage, ProcessedNotification,
+    RecipientState, SESEvent, SNSSubscription, SuppressedAddress,
+)
+from .extraction import derive_header_fields, supports_sql_extraction
+from . import metrics
+from .latency import latency_buffer, record_delivery_latency
+from .ratelimit import CacheTokenBucket
+from .recipients import update_recipient_states
+from . import routers, smtp_pool
+from .serializers import (
+    DAILY_STATS_VALUES_FIELDS, SES_EVENT_VALUES_FIELDS, DailyEmailStatsSerializer, DailyEmailStatsSummarySerializer,
+    SESEventSerializer, serialize_daily_stats_rows, serialize_event_rows,
+)
+from .sqs import SQSConsumer, StubSQSClient
+from .suppression import SuppressionCache, record_bounces, record_complaints, suppression_cache
+from .subscriptions import confirm_subscription, schedule_confirmation, validate_subscribe_url
+from .webhooks import WebhookExecutor
+
+
+urlpatterns = [
+    path('ses/webhooks/', include(f'{__package__}.urls')),
+]
+
+
+class AggregateTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.day = timezone.localdate().replace(day=1)
+        DailyEmailStats.objects.create(date=self.day, total_sends=100, total_bounces=2)
+
+    def test_lagging_read_is_not_cached_under_the_new_generation(self):
+        from .aggregates import invalidate_aggregate_cache
+
+        # The generation is bumped as soon as the primary saves the row, but
+        # a lagging replica still returns the old figures
+        invalidate_aggregate_cache(self.day)
+        self.assertEqual(get_aggregate(self.day, self.day)['totals']['total_bounces'], 2)
+
+        # Once the new row is visible it is picked up without another bump
+        DailyEmailStats.objects.filter(date=self.day).update(
+            total_bounces=5, updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        self.assertEqual(get_aggregate(self.day, self.day)['totals']['total_bounces'], 5)
+
+    def test_rates_are_weighted_by_volume(self):
+        DailyEmailStats.objects.create(date=date(2020, 1, 6), total_sends=100, total_bounces=10, total_deliveries=90)
+        DailyEmailStats.objects.create(date=date(2020, 1, 7), total_sends=900, total_deliveries=900)
+
+        totals = get_aggregate(date(2020, 1, 1), date(2020, 1, 31))['totals']
+
+        # 10 / 1000 sends, not the 5% average of the daily rates
+        self.assertEqual((totals['total_sends'], totals['total_bounces']), (1000, 10))
+        self.assertEqual((totals['bounce_rate'], totals['delivery_rate']), (1.0, 99.0))
+
+    def test_rates_fall_back_to_deliveries_without_sends(self):
+        DailyEmailStats.objects.create(date=date(2020, 1, 6), total_deliveries=200, total_complaints=1)
+
+        totals = get_aggregate(date(2020, 1, 1), date(2020, 1, 31))['totals']
+        self.assertEqual(totals['complaint_rate'], 0.5)
+
+    def test_group_by_week_and_month(self):
+        for day, sends, bounces in ((date(2020, 1, 30), 100, 1), (date(2020, 2, 1), 100, 3), (date(2020, 2, 3), 200, 2)):
+            DailyEmailStats.objects.create(date=day, total_sends=sends, total_bounces=bounces)
+
+        months = get_aggregate(date(2020, 1, 1), date(2020, 2, 29), 'month')['groups']
+        self.assertEqual(
+            [(group['period'], group['total_sends'], group['bounce_rate']) for group in months],
+            [(date(2020, 1, 1), 100, 1.0), (date(2020, 2, 1), 300, 1.67)],
+        )
+
+        # Weeks start on Monday: Thu 30 Jan and Sat 1 Feb share a week
+        weeks = get_aggregate(date(2020, 1, 1), date(2020, 2, 29), 'week')['groups']
+        self.assertEqual(
+            [(group['period'], group['total_bounces']) for group in weeks],
+            [(date(2020, 1, 27), 4), (date(2020, 2, 3), 2)],
+        )
+
+    def test_saving_a_covered_day_invalidates_the_cached_range(self):
+        with mock.patch.object(aggregates, 'compute_aggregate', wraps=aggregates.compute_aggregate) as compute:
+            get_aggregate(self.day, self.day)
+            get_aggregate(self.day, self.day)
+            self.assertEqual(compute.call_count, 1)
+
+            stats = DailyEmailStats.objects.get(date=self.day)
+            stats.total_bounces = 7
+            stats.save()
+            self.assertEqual(get_aggregate(self.day, self.day)['totals']['total_bounces'], 7)
+            self.assertEqual(compute.call_count, 2)
+
+    @override_settings(SES_TRACKING_AGGREGATE_CACHE_MAX_MONTHS=24)
+    def test_long_ranges_are_not_cached(self):
+        with mock.patch.object(aggregates, '_generations') as generations:
+            totals = get_aggregate(date(1900, 1, 1), self.day)['totals']
+
+        generations.assert_not_called()
+        self.assertEqual(totals['total_bounces'], 2)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class StatsConditionalResponseTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        today = timezone.localdate()
+        for days in range(3):
+            DailyEmailStats.objects.create(date=today - timedelta(days=days), total_sends=100, total_bounces=days)
+        self.url = reverse('ses_tracking:daily-stats-date-range')
+        self.params = {'start_date': (today - timedelta(days=7)).isoformat(), 'end_date': today.isoformat()}
+
+    def get(self, **headers):
+        return self.client.get(self.url, self.params, headers=headers)
+
+    def test_unchanged_payload_answers_304(self):
+        first = self.get()
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn('Last-Modified', first)
+
+        second = self.get(if_none_match=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+
+    def test_etag_changes_when_a_day_is_re_aggregated_or_deleted(self):
+        etag = self.get()['ETag']
+
+        stats = DailyEmailStats.objects.order_by('date').first()
+        stats.total_bounces = 9
+        stats.save()
+        response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['stats'][-1]['total_bounces'], 9)
+
+        # Deleting a day other than the newest leaves Max('updated_at') alone
+        etag = response['ETag']
+        DailyEmailStats.objects.order_by('updated_at').first().delete()
+        response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 2)
+
+    def test_if_modified_since_alone_never_answers_304(self):
+        self.get()
+        DailyEmailStats.objects.order_by('updated_at').first().delete()
+
+        response = self.get(if_modified_since='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 2)
+
+    def test_latest_is_404_when_empty(self):
+        DailyEmailStats.objects.all().delete()
+
+        response = self.client.get(reverse('ses_tracking:daily-stats-latest'))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class ExportTests(TestCase):
+
+    def setUp(self):
+        now = timezone.now()
+        for i, event_type in enumerate(['bounce', 'bounce', 'complaint', 'delivery']):
+            SESEvent.objects.create(
+                event_type=event_type, email=f'user{i}@example.com', timestamp=now - timedelta(minutes=i),
+                message_id=f'm{i}', raw_message={},
+            )
+        for days in range(3):
+            DailyEmailStats.objects.create(date=timezone.localdate() - timedelta(days=days), total_sends=10)
+
+    def export(self, name, **params):
+        response = self.client.get(reverse(f'ses_tracking:{name}-export'), params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_events_csv(self):
+        lines = self.export('ses-events').splitlines()
+
+        self.assertEqual(lines[0], ','.join(SESEventSerializer.Meta.fields))
+        self.assertEqual(len(lines), 1 + 3)  # Bounces and complaints only
+
+    def test_events_ndjson_applies_the_list_filters(self):
+        rows = [json.loads(line) for line in self.export('ses-events', file_format='ndjson', event_type='bounce').splitlines()]
+
+        self.assertEqual([row['email'] for row in rows], ['user0@example.com', 'user1@example.com'])
+        self.assertEqual(set(rows[0]), set(SESEventSerializer.Meta.fields))
+
+    def test_daily_stats_csv(self):
+        lines = self.export('daily-stats').splitlines()
+
+        self.assertEqual(lines[0], ','.join(DailyEmailStatsSerializer.Meta.fields))
+        self.assertEqual(len(lines), 1 + 3)
+
+    def test_invalid_format_is_400(self):
+        response = self.client.get(reverse('ses_tracking:ses-events-export'), {'file_format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(DATABASE_ROUTERS=[f'{__package__}.routers.ReplicaRouter'])
+    def test_streamed_rows_stay_on_the_database_chosen_in_dispatch(self):
+        # Reads routed after dispatch returned would leave replica_reads()
+        # and silently switch to the primary
+        outside = []
+
+        def db_for_read(router, model, **hints):
+            if model._meta.app_label == 'ses_tracking' and not routers._replica_reads.get():
+                outside.append(model)
+            return None
+
+        with mock.patch.object(routers.ReplicaRouter, 'db_for_read', autospec=True, side_effect=db_for_read):
+            for name in ('ses-events', 'daily-stats'):
+                response = self.client.get(reverse(f'ses_tracking:{name}-export'))
+                self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 4)
+
+        self.assertEqual(outside, [])
+
+
+@override_settings(SES_TRACKING_TRANSIENT_BOUNCE_THRESHOLD=3)
+class SuppressionTests(TestCase):
+
+    def setUp(self):
+        suppression_cache.clear()
+        self.addCleanup(suppression_cache.clear)
+
+    def suppressed(self):
+        return dict(SuppressedAddress.objects.values_list('email', 'suppressed'))
+
+    def test_permanent_bounces_and_complaints_suppress_immediately(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record_bounces(['Hard@Example.com'], 'Permanent')
+            record_complaints(['angry@example.com'])
+
+        self.assertEqual(self.suppressed(), {'hard@example.com': True, 'angry@example.com': True})
+        self.assertEqual(
+            dict(SuppressedAddress.objects.values_list('email', 'reason')),
+            {'hard@example.com': 'bounce', 'angry@example.com': 'complaint'},
+        )
+        self.assertEqual(
+            suppression_cache.suppressed_among(['hard@example.com', 'ANGRY@example.com', 'ok@example.com']),
+            {'hard@example.com', 'angry@example.com'},
+        )
+
+    def test_transient_bounces_suppress_at_the_threshold(self):
+        for _ in range(2):
+            record_bounces(['soft@example.com'], 'Transient')
+        self.assertEqual(self.suppressed(), {'soft@example.com': False})
+
+        record_bounces(['soft@example.com'], 'Transient')
+        address = SuppressedAddress.objects.get()
+        self.assertEqual((address.suppressed, address.reason, address.transient_bounce_count), (True, 'transient', 3))
+
+    def test_rolled_back_suppression_does_not_reach_the_cache(self):
+        SuppressedAddress.objects.create(email='other@example.com', suppressed=True)
+        suppression_cache.refresh(force=True)
+
+        with self.captureOnCommitCallbacks(execute=False):
+            record_bounces(['hard@example.com'], 'Permanent')
+
+        self.assertNotIn('hard@example.com', suppression_cache._emails)
+
+    @override_settings(SES_TRACKING_SUPPRESSION_REFRESH_INTERVAL=0)
+    def test_incremental_refresh_picks_up_late_commits(self):
+        cache = SuppressionCache()
+        now = timezone.now()
+        SuppressedAddress.objects.create(email='a@example.com', suppressed=True)
+        SuppressedAddress.objects.filter(email='a@example.com').update(updated_at=now)
+        cache.refresh(force=True)
+
+        # b commits first and advances the watermark...
+        SuppressedAddress.objects.create(email='b@example.com', suppressed=True)
+        SuppressedAddress.objects.filter(email='b@example.com').update(updated_at=now + timedelta(seconds=10))
+        self.assertIn('b@example.com', cache)
+
+        # ...then c, stamped earlier by a transaction that committed later
+        SuppressedAddress.objects.create(email='c@example.com', suppressed=True)
+        SuppressedAddress.objects.filter(email='c@example.com').update(updated_at=now + timedelta(seconds=5))
+        self.assertIn('c@example.com', cache)
+
+        # Un-suppressing is picked up too
+        SuppressedAddress.objects.filter(email='a@example.com').update(
+            suppressed=False, updated_at=now + timedelta(seconds=11)
+        )
+        self.assertNotIn('a@example.com', cache)
+
+
+@override_settings(AWS_SES_MAX_SEND_RATE=1000)
+class SESApiBackendTests(TestCase):
+
+    def make_messages(self, *recipients):
+        return [EmailMessage('Subject', 'Body', 'from@example.com', [to]) for to in recipients]
+
+    def test_partial_failure_logs_sent_messages_and_reports_count(self):
+        client = StubSESClient(fail_for={'bad@example.com'})
+        backend = SESApiBackend(client=client)
+        messages = self.make_messages('a@example.com', 'bad@example.com', 'b@example.com')
+
+        with self.assertRaises(PartialSendError) as raised:
+            backend.send_messages(messages)
+
+        self.assertEqual(raised.exception.num_sent, 2)
+        self.assertEqual(raised.exception.num_failed, 1)
+        self.assertIsInstance(raised.exception.__cause__, RuntimeError)
+        self.assertEqual(len(client.sent), 2)
+        self.assertEqual(
+            set(OutboundMessage.objects.values_list('ses_message_id', flat=True)),
+            set(raised.exception.sent_message_ids),
+        )
+
+    def test_fail_silently_returns_sent_count(self):
+        backend = SESApiBackend(fail_silently=True, client=StubSESClient(fail_for={'bad@example.com'}))
+        sent = backend.send_messages(self.make_messages('a@example.com', 'bad@example.com'))
+
+        self.assertEqual(sent, 1)
+        self.assertEqual(OutboundMessage.objects.count(), 1)
+
+
+@override_settings(AWS_SES_MAX_SEND_RATE=1000, SES_TRACKING_FILTER_SUPPRESSED=True)
+class SuppressionFilterTests(TestCase):
+
+    def setUp(self):
+        suppression_cache.clear()
+        self.addCleanup(suppression_cache.clear)
+        with self.captureOnCommitCallbacks(execute=True):
+            record_bounces(['hard@example.com'], 'Permanent')
+            record_complaints(['angry@example.com'])
+
+    def test_suppressed_addresses_are_removed_from_to_cc_and_bcc(self):
+        message = EmailMessage(
+            'Subject', 'Body', 'from@example.com',
+            to=['ok@example.com', 'Hard <HARD@example.com>'],
+            cc=['angry@example.com', 'cc@example.com'],
+            bcc=['Angry <Angry@Example.com>', 'bcc@example.com'],
+        )
+        client = StubSESClient()
+        backend = SESApiBackend(client=client)
+
+        self.assertEqual(backend.send_messages([message]), 1)
+
+        self.assertEqual(message.to, ['ok@example.com'])
+        self.assertEqual(message.cc, ['cc@example.com'])
+        self.assertEqual(message.bcc, ['bcc@example.com'])
+        self.assertEqual(
+            sorted(backend.suppressed_recipients),
+            ['Angry <Angry@Example.com>', 'Hard <HARD@example.com>', 'angry@example.com'],
+        )
+        self.assertEqual(backend.skipped_messages, [])
+        self.assertEqual(
+            client.sent[0]['Destination']['ToAddresses'],
+            ['ok@example.com', 'cc@example.com', 'bcc@example.com'],
+        )
+
+    def test_message_left_without_recipients_is_dropped(self):
+        suppressed_only = EmailMessage(
+            'Subject', 'Body', 'from@example.com', to=['hard@example.com'], cc=['angry@example.com']
+        )
+        deliverable = EmailMessage('Subject', 'Body', 'from@example.com', to=['ok@example.com'])
+        client = StubSESClient()
+        backend = SESApiBackend(client=client)
+
+        self.assertEqual(backend.send_messages([suppressed_only, deliverable]), 1)
+
+        self.assertEqual(backend.skipped_messages, [suppressed_only])
+        self.assertEqual(
+            [sent['Destination']['ToAddresses'] for sent in client.sent], [['ok@example.com']]
+        )
+        self.assertEqual(len(backend.sent_message_ids), 1)
+        self.assertEqual(OutboundMessage.objects.get().recipients, 'ok@example.com')
+
+    def test_clean_batch_is_sent_unchanged(self):
+        message = EmailMessage('Subject', 'Body', 'from@example.com', to=['ok@example.com'])
+        backend = SESApiBackend(client=StubSESClient())
+
+        self.assertEqual(backend.remove_suppressed_recipients([message]), [message])
+        self.assertEqual(message.to, ['ok@example.com'])
+        self.assertEqual(backend.suppressed_recipients, [])
+
+    @override_settings(SES_TRACKING_FILTER_SUPPRESSED=False)
+    def test_filter_can_be_disabled(self):
+        message = EmailMessage('Subject', 'Body', 'from@example.com', to=['hard@example.com'])
+        client = StubSESClient()
+
+        self.assertEqual(SESApiBackend(client=client).send_messages([message]), 1)
+        self.assertEqual(client.sent[0]['Destination']['ToAddresses'], ['hard@example.com'])
+
+
+@override_settings(AWS_SES_MAX_SEND_RATE=1000)
+class OutboundDeliveryTests(TestCase):
+
+    def delivery(self, ses_message_id, header_message_id, recipient, timestamp):
+        return {
+            'eventType': 'Delivery',
+            'mail': {
+                'timestamp': '2026-10-01T11:59:00.000Z',
+                'messageId': ses_message_id,
+                'destination': [recipient],
+                'headers': [{'name': 'Message-ID', 'value': f'<{header_message_id}>'}],
+            },
+            'delivery': {'timestamp': timestamp, 'recipients': [recipient], 'processingTimeMillis': 100},
+        }
+
+    def test_each_message_of_a_batch_is_stamped_by_its_own_delivery(self):
+        from .webhooks import process_ses_message
+
+        # Both messages carry the caller's Message-ID; only the SES ids differ
+        messages = [
+            EmailMessage('Subject', 'Body', 'from@example.com', [to], headers={'Message-ID': '<campaign@example.com>'})
+            for to in ('a@example.com', 'b@example.com')
+        ]
+        SESApiBackend(client=StubSESClient()).send_messages(messages)
+        first, second = messages
+
+        # Deliveries arrive in the opposite order to the sends
+        process_ses_message(self.delivery(
+            second.ses_message_id, 'campaign@example.com', 'b@example.com', '2026-10-01T12:00:05.000Z'
+        ))
+        process_ses_message(self.delivery(
+            first.ses_message_id, 'campaign@example.com', 'a@example.com', '2026-10-01T12:00:09.000Z'
+        ))
+
+        delivered = dict(OutboundMessage.objects.values_list('ses_message_id', 'delivered_at__second'))
+        self.assertEqual(delivered, {second.ses_message_id: 5, first.ses_message_id: 9})
+
+    def test_smtp_rows_are_matched_by_message_id_header(self):
+        from .webhooks import process_ses_message
+
+        sent_at = timezone.now()
+        for message_id in ('one@example.com', 'two@example.com'):
+            OutboundMessage.objects.create(
+                message_id=message_id, recipients='a@example.com', subject_hash='0', sent_at=sent_at
+            )
+
+        process_ses_message(self.delivery(
+            'ses-id-of-two', 'two@example.com', 'a@example.com', '2026-10-01T12:00:05.000Z'
+        ))
+
+        self.assertEqual(
+            dict(OutboundMessage.objects.values_list('message_id', 'delivered_at__second')),
+            {'one@example.com': None, 'two@example.com': 5},
+        )
+
+
+class CacheTokenBucketTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_burst_then_paced(self):
+        bucket = CacheTokenBucket(rate=10, burst=3)
+        waits = [bucket._reserve() for _ in range(5)]
+
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 0.1, delta=0.02)
+        self.assertAlmostEqual(waits[4], 0.2, delta=0.02)
+
+    def test_fractional_rate(self):
+        bucket = CacheTokenBucket(rate=0.5)
+
+        self.assertEqual(bucket._reserve(), 0.0)
+        self.assertAlmostEqual(bucket._reserve(), 2.0, delta=0.02)
+
+    def test_state_shared_between_instances(self):
+        first = CacheTokenBucket(rate=10, burst=2)
+        second = CacheTokenBucket(rate=10, burst=2)
+
+        self.assertEqual(first._reserve(), 0.0)
+        self.assertEqual(second._reserve(), 0.0)
+        self.assertAlmostEqual(first._reserve(), 0.1, delta=0.02)
+        self.assertAlmostEqual(second._reserve(), 0.2, delta=0.02)
+
+
+class StubSMTPHandler(socketserver.StreamRequestHandler):
+    """Accepts every command and counts sessions, messages, NOOPs and QUITs"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        stats = self.server.stats
+        stats['sessions'] += 1
+        self.server.sockets.append(self.connection)
+        self.reply('220 stub ESMTP')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().upper()
+            if command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                stats['messages'] += 1
+                self.reply('250 OK')
+            elif command == 'NOOP':
+                stats['noops'] += 1
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                stats['quits'] += 1
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+@override_settings(
+    EMAIL_HOST='127.0.0.1',
+    SES_TRACKING_SMTP_POOL=True,
+    SES_TRACKING_FILTER_SUPPRESSED=False,
+    SES_TRACKING_OUTBOUND_LOG=False,
+)
+class SMTPConnectionPoolTests(SimpleTestCase):
+
+    def setUp(self):
+        server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), StubSMTPHandler)
+        server.daemon_threads = True
+        server.stats = {'sessions': 0, 'messages': 0, 'noops': 0, 'quits': 0}
+        server.sockets = []
+        threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.server = server
+
+    def use_pool(self, **options):
+        pool = smtp_pool.SMTPConnectionPool(**options)
+        patcher = mock.patch.object(smtp_pool, '_pool', pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(pool.clear)
+        return pool
+
+    def send(self):
+        with override_settings(EMAIL_PORT=self.server.server_address[1]):
+            backend = SESBackend()
+        message = EmailMessage('Subject', 'Body', 'from@example.com', ['to@example.com'])
+        self.assertEqual(backend.send_messages([message]), 1)
+        self.assertIsNone(backend.connection)
+
+    def wait_for(self, key, value):
+        deadline = time.monotonic() + 2
+        while self.server.stats[key] != value and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.server.stats[key], value)
+
+    def test_session_is_reused_across_backends(self):
+        self.use_pool()
+        for _ in range(3):
+            self.send()
+
+        # close() returned the session to the pool instead of quitting it
+        self.assertEqual(self.server.stats, {'sessions': 1, 'messages': 3, 'noops': 0, 'quits': 0})
+
+    def test_dead_session_is_discarded_after_noop(self):
+        self.use_pool(health_check_after=0)
+        self.send()
+        for sock in self.server.sockets:
+            sock.shutdown(socket.SHUT_RDWR)
+
+        self.send()
+
+        self.assertEqual(self.server.stats['sessions'], 2)
+        self.assertEqual(self.server.stats['messages'], 2)
+
+    def test_live_idle_session_passes_the_noop_check(self):
+        self.use_pool(health_check_after=0)
+        self.send()
+        self.send()
+
+        self.assertEqual(self.server.stats['sessions'], 1)
+        self.assertEqual(self.server.stats['noops'], 1)
+
+    def test_max_messages_evicts_the_session(self):
+        self.use_pool(max_messages=2)
+        for _ in range(3):
+            self.send()
+
+        self.assertEqual(self.server.stats['sessions'], 2)
+        self.wait_for('quits', 1)
+
+    def test_max_age_evicts_the_session(self):
+        self.use_pool(max_age=0)
+        self.send()
+        self.send()
+
+        self.assertEqual(self.server.stats['sessions'], 2)
+        self.wait_for('quits', 2)
+
+
+class RecipientStateTests(TestCase):
+
+    def event(self, email, event_type, timestamp, bounce_type=None):
+        return SESEvent(email=email, event_type=event_type, timestamp=timestamp, bounce_type=bounce_type)
+
+    def test_counts_and_latest_event(self):
+        now = timezone.now()
+        update_recipient_states([
+            self.event('A@example.com', 'send', now),
+            self.event('b@example.com', 'send', now),
+        ])
+        update_recipient_states([
+            self.event('a@example.com', 'delivery', now + timedelta(seconds=1)),
+            self.event('b@example.com', 'bounce', now + timedelta(seconds=2), 'Permanent'),
+            # Arrives late: counted, but neither the latest event nor the first seen
+            self.event('b@example.com', 'delivery', now + timedelta(seconds=1)),
+        ])
+
+        a = RecipientState.objects.get(email='a@example.com')
+        b = RecipientState.objects.get(email='b@example.com')
+        self.assertEqual((a.send_count, a.delivery_count, a.last_event_type), (1, 1, 'delivery'))
+        self.assertEqual((b.send_count, b.delivery_count, b.bounce_count), (1, 1, 1))
+        self.assertEqual((b.last_event_type, b.last_bounce_type), ('bounce', 'Permanent'))
+        self.assertEqual(b.last_event_at, now + timedelta(seconds=2))
+        self.assertEqual(b.first_seen_at, now)
+
+    def test_earlier_event_moves_first_seen(self):
+        now = timezone.now()
+        update_recipient_states([self.event('a@example.com', 'delivery', now)])
+        update_recipient_states([self.event('a@example.com', 'send', now - timedelta(seconds=5))])
+
+        state = RecipientState.objects.get(email='a@example.com')
+        self.assertEqual(state.first_seen_at, now - timedelta(seconds=5))
+        self.assertEqual((state.last_event_type, state.send_count), ('delivery', 1))
+
+    def test_queries_do_not_grow_with_recipients(self):
+        now = timezone.now()
+        with CaptureQueriesContext(connection) as one:
+            update_recipient_states([self.event('r0@example.com', 'delivery', now)])
+        with CaptureQueriesContext(connection) as many:
+            update_recipient_states([self.event(f'r{i}@example.com', 'delivery', now) for i in range(1, 51)])
+
+        self.assertEqual(len(one), len(many))
+        self.assertEqual(RecipientState.objects.filter(delivery_count=1).count(), 51)
+
+
+class WebhookExecutorTests(SimpleTestCase):
+
+    def test_cancelled_submission_releases_its_slot(self):
+        executor = WebhookExecutor(workers=1, max_pending=2)
+        release = threading.Event()
+
+        async def scenario():
+            running = executor.submit(release.wait, 5)
+            queued = asyncio.ensure_future(executor.submit(sum, [1, 2]))
+            await asyncio.sleep(0)
+            self.assertIsNone(executor.submit(sum, [3]))
+            # A client disconnect cancels the queued work before it starts
+            queued.cancel()
+            await asyncio.sleep(0)
+            release.set()
+            await running
+
+        asyncio.run(scenario())
+        self.assertEqual(executor.pending, 0)
+
+    def test_completed_submission_releases_its_slot(self):
+        executor = WebhookExecutor(workers=1, max_pending=1)
+
+        async def scenario():
+            return await executor.submit(sum, [1, 2])
+
+        self.assertEqual(asyncio.run(scenario()), 3)
+        self.assertEqual(executor.pending, 0)
+
+
+class StubSNSHandler(BaseHTTPRequestHandler):
+    """Answers with the server's next queued status (200 once the queue is empty)"""
+
+    def do_GET(self):
+        self.server.hits.append(self.path)
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.send_response(status)
+        self.end_headers()
+        self.wfile.write(b'<ConfirmSubscriptionResponse/>')
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(
+    SES_TRACKING_SNS_CONFIRM_URL_PATTERN=r'^http://127\.0\.0\.1:\d+/',
+    SES_TRACKING_SNS_CONFIRM_TIMEOUT=2,
+    SES_TRACKING_SNS_CONFIRM_RETRIES=2,
+    SES_TRACKING_SNS_CONFIRM_BACKOFF=0.05,
+)
+class SubscriptionConfirmationTests(TransactionTestCase):
+    topic_arn = 'arn:aws:sns:us-east-1:123456789012:ses-events'
+
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), StubSNSHandler)
+        self.server.hits = []
+        self.server.statuses = []
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def subscribe_url(self, token='token-1', topic_arn=None):
+        query = urlencode({
+            'Action': 'ConfirmSubscription',
+            'TopicArn': topic_arn or self.topic_arn,
+            'Token': token,
+        })
+        return f'http://127.0.0.1:{self.server.server_port}/?{query}'
+
+    def message(self, token='token-1', **kwargs):
+        return {
+            'Type': 'SubscriptionConfirmation',
+            'TopicArn': self.topic_arn,
+            'Token': token,
+            'SubscribeURL': self.subscribe_url(token),
+            **kwargs,
+        }
+
+    def test_success(self):
+        schedule_confirmation(self.message()).result(timeout=5)
+
+        subscription = SNSSubscription.objects.get()
+        self.assertIsNotNone(subscription.confirmed_at)
+        self.assertEqual((subscription.topic_arn, subscription.attempts), (self.topic_arn, 1))
+        self.assertEqual(len(self.server.hits), 1)
+
+    def test_retries_with_backoff(self):
+        self.server.statuses = [500, 503]
+        started = time.monotonic()
+
+        self.assertTrue(confirm_subscription(self.topic_arn, self.subscribe_url()))
+
+        # Backoff of 0.05s then 0.1s between the three attempts
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+        self.assertEqual(len(self.server.hits), 3)
+        subscription = SNSSubscription.objects.get()
+        self.assertEqual((subscription.attempts, subscription.last_error), (3, ''))
+        self.assertIsNotNone(subscription.confirmed_at)
+
+    def test_gives_up(self):
+        self.server.statuses = [500, 500, 500, 500]
+
+        self.assertFalse(confirm_subscription(self.topic_arn, self.subscribe_url()))
+
+        self.assertEqual(len(self.server.hits), 3)
+        subscription = SNSSubscription.objects.get()
+        self.assertIsNone(subscription.confirmed_at)
+        self.assertEqual(subscription.attempts, 3)
+        self.assertIn('500', subscription.last_error)
+
+    def test_repeated_url_is_skipped_but_resubscribe_is_confirmed(self):
+        schedule_confirmation(self.message()).result(timeout=5)
+
+        self.assertIsNone(schedule_confirmation(self.message()))
+        schedule_confirmation(self.message(token='token-2')).result(timeout=5)
+
+        self.assertEqual(len(self.server.hits), 2)
+        self.assertEqual(SNSSubscription.objects.filter(confirmed_at__isnull=False).count(), 2)
+
+    def test_spoofed_confirmation_is_not_fetched(self):
+        spoofed = [
+            self.message(SubscribeURL='http://attacker.example/?' + urlencode({
+                'Action': 'ConfirmSubscription', 'TopicArn': self.topic_arn,
+            })),
+            self.message(SubscribeURL=self.subscribe_url(topic_arn='arn:aws:sns:us-east-1:123456789012:other')),
+            self.message(TopicArn='arn:aws:sns:us-east-1:123456789012:other'),
+        ]
+        for message in spoofed:
+            self.assertIsNone(schedule_confirmation(message))
+
+        self.assertEqual(self.server.hits, [])
+        self.assertFalse(SNSSubscription.objects.exists())
+        # The genuine confirmation still goes through
+        schedule_confirmation(self.message()).result(timeout=5)
+        self.assertEqual(len(self.server.hits), 1)
+
+
+class SubscribeURLValidationTests(SimpleTestCase):
+
+    def test_default_pattern(self):
+        topic_arn = 'arn:aws:sns:eu-west-1:123456789012:ses-events'
+        query = urlencode({'Action': 'ConfirmSubscription', 'TopicArn': topic_arn, 'Token': 't'})
+
+        self.assertIsNone(validate_subscribe_url(f'https://sns.eu-west-1.amazonaws.com/?{query}', topic_arn))
+        self.assertIsNotNone(validate_subscribe_url(f'http://sns.eu-west-1.amazonaws.com/?{query}', topic_arn))
+        self.assertIsNotNone(validate_subscribe_url(f'https://sns.eu-west-1.amazonaws.com.evil.io/?{query}', topic_arn))
+        self.assertIsNotNone(validate_subscribe_url(f'https://169.254.169.254/?{query}', topic_arn))
+
+
+class SQSConsumerTests(TestCase):
+
+    def setUp(self):
+        self.client = StubSQSClient(visibility_timeout=0)
+        self.consumer = SQSConsumer(self.client, 'stub-queue', wait_time=0)
+
+    def send(self, ses_message, sns_message_id=None):
+        body = json.dumps({
+            'Type': 'Notification',
+            'MessageId': sns_message_id or str(uuid.uuid4()),
+            'Message': json.dumps(ses_message),
+        })
+        return self.client.send_message(QueueUrl='stub-queue', MessageBody=body)['MessageId']
+
+    def test_poison_message_is_left_on_the_queue(self):
+        good = self.send(synthetic_notification('bounce'))
+        poison = self.client.send_message(QueueUrl='stub-queue', MessageBody='not json')['MessageId']
+
+        self.consumer.poll_once()
+
+        self.assertEqual(self.client.deleted, [good])
+        self.assertIn(poison, self.client.messages)
+        self.assertEqual((self.consumer.processed, self.consumer.failed), (1, 1))
+        self.assertEqual(SESEvent.objects.count(), 1)
+
+    def test_partial_failure_deletes_only_committed_messages(self):
+        from . import webhooks
+
+        process = webhooks.process_ses_message
+        first = self.send(synthetic_notification('delivery'))
+        failing = self.send(synthetic_notification('complaint'))
+        last = self.send(synthetic_notification('delivery'))
+
+        def flaky(ses_message):
+            events = process(ses_message)
+            if ses_message['eventType'] == 'Complaint':
+                raise RuntimeError('handler failed after writing')
+            return events
+
+        with mock.patch.object(webhooks, 'process_ses_message', flaky):
+            self.consumer.poll_once()
+
+        self.assertEqual(self.client.deleted, [first, last])
+        self.assertIn(failing, self.client.messages)
+        # The failed message rolled back its events and its dedup record
+        self.assertFalse(SESEvent.objects.filter(event_type='complaint').exists())
+        self.assertEqual(ProcessedNotification.objects.count(), 2)
+
+        self.consumer.poll_once()
+        self.assertEqual(self.client.messages, {})
+        self.assertEqual(SESEvent.objects.filter(event_type='complaint').count(), 1)
+
+    def test_redelivery_is_idempotent(self):
+        ses_message = synthetic_notification('bounce', recipients=3)
+        self.send(ses_message, sns_message_id='sns-1')
+        # SNS delivered the same notification twice
+        self.send(ses_message, sns_message_id='sns-1')
+
+        self.consumer.poll_once()
+
+        self.assertEqual(self.client.messages, {})
+        self.assertEqual(SESEvent.objects.count(), 3)
+        self.assertEqual((self.consumer.processed, self.consumer.duplicates), (1, 1))
+
+    def test_message_redelivered_after_a_lost_delete_is_not_stored_twice(self):
+        self.send(synthetic_notification('delivery', recipients=2))
+
+        with mock.patch.object(self.consumer, 'delete'):
+            self.consumer.poll_once()
+        self.consumer.poll_once()
+
+        self.assertEqual(self.client.messages, {})
+        self.assertEqual(SESEvent.objects.count(), 2)
+
+
+class DirtyDayTests(TestCase):
+
+    def setUp(self):
+        ses_models._recently_marked.clear()
+        self.addCleanup(ses_models._recently_marked.clear)
+
+    def test_repeat_marks_within_the_interval_skip_the_write(self):
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            DirtyDay.mark([now])
+
+        with CaptureQueriesContext(connection) as queries:
+            DirtyDay.mark([now, now])
+        self.assertEqual(len(queries), 0)
+
+        # A different day is still written
+        with CaptureQueriesContext(connection) as queries:
+            DirtyDay.mark([now - timedelta(days=3)])
+        self.assertEqual(DirtyDay.objects.count(), 2)
+        self.assertGreater(len(queries), 0)
+
+    def test_uncommitted_mark_is_not_remembered(self):
+        now = timezone.now()
+        DirtyDay.mark([now])  # on_commit never runs inside the test transaction
+
+        with CaptureQueriesContext(connection) as queries:
+            DirtyDay.mark([now])
+        self.assertGreater(len(queries), 0)
+
+    @override_settings(SES_TRACKING_DIRTY_MARK_INTERVAL=0)
+    def test_zero_interval_always_writes(self):
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            DirtyDay.mark([now])
+        with CaptureQueriesContext(connection) as queries:
+            DirtyDay.mark([now])
+        self.assertGreater(len(queries), 0)
+
+    def test_dirty_aggregation_keeps_marks_within_the_interval(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        recent = timezone.now()
+        DirtyDay.objects.create(date=timezone.localdate() - timedelta(days=1), marked_at=recent)
+        DirtyDay.objects.create(date=timezone.localdate() - timedelta(days=2), marked_at=recent - timedelta(minutes=5))
+
+        call_command('aggregate_daily_stats', dirty=True, stdout=StringIO())
+
+        self.assertEqual(list(DirtyDay.objects.values_list('marked_at', flat=True)), [recent])
+
+
+class PrometheusExporterTests(SimpleTestCase):
+
+    def test_render(self):
+        exporter = metrics.PrometheusExporter()
+        exporter.inc('dedup_hits_total', kind='sqs_message')
+        exporter.inc('dedup_hits_total', 2, kind='sqs_message')
+        exporter.observe('notification_recipients', 3, event_type='bounce')
+        exporter.observe('notification_recipients', 700, event_type='bounce')
+
+        lines = exporter.render().splitlines()
+
+        self.assertIn('# TYPE ses_tracking_dedup_hits_total counter', lines)
+        self.assertIn('ses_tracking_dedup_hits_total{kind="sqs_message"} 3', lines)
+        self.assertIn('# TYPE ses_tracking_notification_recipients histogram', lines)
+        self.assertIn('ses_tracking_notification_recipients_bucket{event_type="bounce",le="2"} 0', lines)
+        self.assertIn('ses_tracking_notification_recipients_bucket{event_type="bounce",le="5"} 1', lines)
+        self.assertIn('ses_tracking_notification_recipients_bucket{event_type="bounce",le="500"} 1', lines)
+        self.assertIn('ses_tracking_notification_recipients_bucket{event_type="bounce",le="+Inf"} 2', lines)
+        self.assertIn('ses_tracking_notification_recipients_sum{event_type="bounce"} 703.0', lines)
+        self.assertIn('ses_tracking_notification_recipients_count{event_type="bounce"} 2', lines)
+        # Metrics without samples are left out
+        self.assertFalse(any('webhook_duration_seconds' in line for line in lines))
+
+    def test_label_values_are_escaped(self):
+        exporter = metrics.PrometheusExporter()
+        exporter.inc('dedup_hits_total', kind='a"b\\c\nd')
+
+        self.assertIn('ses_tracking_dedup_hits_total{kind="a\\"b\\\\c\\nd"} 1', exporter.render().splitlines())
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class MetricsViewTests(TestCase):
+
+    def setUp(self):
+        exporter = metrics.PrometheusExporter()
+        exporter.inc('dedup_hits_total', kind='sqs_message')
+        metrics.set_exporter(exporter)
+        self.addCleanup(metrics.set_exporter, None)
+        self.url = reverse('ses_tracking:metrics')
+
+    @override_settings(SES_TRACKING_METRICS_TOKEN='s3cret')
+    def test_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.assertEqual(self.client.get(self.url, headers={'authorization': 'Bearer wrong'}).status_code, 403)
+
+        response = self.client.get(self.url, headers={'authorization': 'Bearer s3cret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], metrics.PrometheusExporter.content_type)
+        self.assertIn(b'ses_tracking_dedup_hits_total{kind="sqs_message"} 1', response.content)
+
+    @override_settings(SES_TRACKING_METRICS_TOKEN=None)
+    def test_staff_login_is_required_without_a_token(self):
+        from django.contrib.auth.models import User
+
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        self.client.force_login(User.objects.create_user('user'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_disabled_exporter_is_404(self):
+        metrics.set_exporter(metrics.NoopExporter())
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+@override_settings(SES_TRACKING_LATENCY_FLUSH_INTERVAL=3600, SES_TRACKING_LATENCY_FLUSH_SIZE=1000)
+class LatencyBufferTests(TestCase):
+
+    def setUp(self):
+        latency_buffer.clear()
+        self.addCleanup(latency_buffer.clear)
+
+    def delivery(self, recipients, processing_ms=120):
+        return {
+            'eventType': 'Delivery',
+            'mail': {'timestamp': '2026-10-01T10:00:00.000Z'},
+            'delivery': {
+                'timestamp': '2026-10-01T10:00:02.000Z',
+                'processingTimeMillis': processing_ms,
+                'recipients': recipients,
+            },
+        }
+
+    def record(self, message):
+        with self.captureOnCommitCallbacks(execute=True):
+            record_delivery_latency(message)
+
+    def test_deliveries_are_buffered_until_flushed(self):
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(50):
+                self.record(self.delivery(['a@big.example', 'b@big.example', 'c@small.example']))
+        self.assertEqual(len(queries), 0)
+        self.assertFalse(DeliveryLatencySketch.objects.exists())
+
+        self.assertEqual(latency_buffer.flush(), 2)
+
+        rows = dict(DeliveryLatencySketch.objects.values_list('domain', 'count'))
+        self.assertEqual(rows, {'big.example': 100, 'small.example': 50})
+        big = DeliveryLatencySketch.objects.get(domain='big.example')
+        self.assertEqual(big.processing_time['count'], 100)
+
+    def test_flush_merges_into_existing_rows(self):
+        self.record(self.delivery(['a@example.com'], processing_ms=100))
+        latency_buffer.flush()
+        self.record(self.delivery(['b@example.com'], processing_ms=300))
+        latency_buffer.flush()
+
+        row = DeliveryLatencySketch.objects.get()
+        self.assertEqual((row.count, row.processing_time['count'], row.end_to_end['count']), (2, 2, 2))
+
+    @override_settings(SES_TRACKING_LATENCY_FLUSH_SIZE=3)
+    def test_flush_size_triggers_a_merge(self):
+        for _ in range(3):
+            self.record(self.delivery(['a@example.com']))
+
+        self.assertEqual(DeliveryLatencySketch.objects.get().count, 3)
+
+    def test_failed_flush_keeps_the_samples(self):
+        self.record(self.delivery(['a@example.com']))
+        with mock.patch.object(latency_buffer, '_write', side_effect=RuntimeError('database down')):
+            self.assertEqual(latency_buffer.flush(), 0)
+        self.record(self.delivery(['a@example.com']))
+        latency_buffer.flush()
+
+        self.assertEqual(DeliveryLatencySketch.objects.get().count, 2)
+
+    @override_settings(SES_TRACKING_LATENCY_FLUSH_INTERVAL=0.01)
+    def test_idle_buffer_is_flushed_by_the_timer(self):
+        flushed = threading.Event()
+        with mock.patch.object(latency_buffer, 'flush', side_effect=flushed.set):
+            self.record(self.delivery(['a@example.com']))
+
+            # No further add(): the timer merges the samples on its own
+            self.assertTrue(flushed.wait(2))
+
+    @override_settings(ROOT_URLCONF=__name__)
+    def test_latency_endpoint_reports_buffered_samples(self):
+        for _ in range(3):
+            self.record(self.delivery(['a@example.com']))
+
+        response = self.client.get(
+            reverse('ses_tracking:daily-stats-latency'), {'start_date': '2026-10-01', 'end_date': '2026-10-01'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['overall']['processing_time_ms']['count'], 3)
+
+    def test_rolled_back_delivery_is_not_buffered(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            record_delivery_latency(self.delivery(['a@example.com']))
+
+        self.assertEqual(latency_buffer.flush(), 0)
+
+
+@override_settings(
+    SES_TRACKING_ALERT_BOUNCE_RATE=5.0,
+    SES_TRACKING_ALERT_MIN_VOLUME=10,
+    SES_TRACKING_ALERT_COOLDOWN=900,
+    SES_TRACKING_ALERT_WINDOW=3600,
+)
+class AlertEvaluatorTests(SimpleTestCase):
+
+    def setUp(self):
+        self.fired = []
+        self.evaluator = AlertEvaluator()
+        self.evaluator.configure()
+        self.evaluator.notifiers = [mock.Mock(notify=self.fired.append)]
+
+    def record(self, event_type, count=1, domain='example.com', now=1000.0):
+        for _ in range(count):
+            self.evaluator.record(event_type, 'marketing', domain, now=now)
+
+    def test_alert_fires_when_the_rate_crosses_the_threshold(self):
+        self.record('send', 20)
+        self.assertEqual(self.fired, [])
+
+        self.record('bounce')  # 1 / 20 = 5%
+        self.assertEqual(
+            sorted((alert.scope, alert.key, alert.kind) for alert in self.fired),
+            [('configuration_set', 'marketing', 'bounce'), ('domain', 'example.com', 'bounce')],
+        )
+        self.assertEqual((self.fired[0].rate, self.fired[0].volume), (5.0, 20))
+
+    def test_no_alert_below_min_volume(self):
+        self.record('send', 5)
+        self.record('bounce', 3)
+
+        self.assertEqual(self.fired, [])
+
+    def test_cooldown_suppresses_repeat_alerts(self):
+        self.record('send', 20)
+        self.record('bounce')
+        self.record('bounce', now=1500.0)
+        self.assertEqual(len(self.fired), 2)
+
+        self.record('bounce', now=1000.0 + 901)
+        self.assertEqual(len(self.fired), 4)
+
+    @override_settings(SES_TRACKING_ALERT_MAX_KEYS=2)
+    def test_least_recently_seen_windows_are_evicted(self):
+        self.evaluator.configure()
+        for domain in ('a.example', 'b.example', 'a.example', 'c.example'):
+            self.evaluator.record('send', None, domain, now=1000.0)
+
+        keys = [entry['key'] for entry in self.evaluator.snapshot(now=1000.0)]
+        self.assertEqual(keys, ['a.example', 'c.example'])
+
+
+class AlertIngestTests(TestCase):
+
+    def setUp(self):
+        alert_evaluator.reset()
+        self.addCleanup(alert_evaluator.reset)
+
+    def test_events_are_counted_only_once_committed(self):
+        from .webhooks import process_ses_message
+
+        with self.captureOnCommitCallbacks(execute=False):
+            process_ses_message(synthetic_notification('bounce'))
+        self.assertEqual(alert_evaluator.snapshot(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            process_ses_message(synthetic_notification('bounce'))
+        self.assertEqual({entry['volume'] for entry in alert_evaluator.snapshot()}, {1})
+
+
+class WebhookImportBudgetTests(SimpleTestCase):
+
+    def test_webhook_urls_import_within_budget(self):
+        module = f'{__package__}.webhook_urls'
+        samples = [probe_import(module) for _ in range(3)]
+
+        forbidden = sorted(name for name in WEBHOOK_FORBIDDEN_MODULES if name in samples[0]['modules'])
+        self.assertEqual(forbidden, [])
+        median_ms = sorted(sample['ms'] for sample in samples)[1]
+        self.assertLessEqual(median_ms, WEBHOOK_IMPORT_BUDGET_MS)
+
+
+class SESEventAdminTests(TestCase):
+
+    def setUp(self):
+        now = timezone.now()
+        for i, email in enumerate(['Alice@example.com', 'bob@example.com', 'carol@example.com', 'dave@example.com', 'erin@example.com']):
+            SESEvent.objects.create(
+                event_type='bounce', email=email, timestamp=now, raw_message={},
+                message_id=f'0100abc-{i}', email_message_id=f'msg-{i}@example.com',
+            )
+        self.model_admin = SESEventAdmin(SESEvent, admin.site)
+        self.request = RequestFactory().get('/')
+
+    def search(self, term):
+        queryset, _ = self.model_admin.get_search_results(self.request, SESEvent.objects.all(), term)
+        return sorted(queryset.values_list('email', flat=True))
+
+    @override_settings(SES_TRACKING_ADMIN_COUNT_LIMIT=3)
+    def test_paginator_caps_counts_without_an_estimate(self):
+        # SQLite has no planner estimate
+        self.assertEqual(EstimatedCountPaginator(SESEvent.objects.all(), 2).count, 3)
+        self.assertEqual(EstimatedCountPaginator(SESEvent.objects.filter(event_type='bounce'), 2).count, 3)
+
+    @override_settings(SES_TRACKING_ADMIN_ESTIMATE_THRESHOLD=100)
+    def test_paginator_uses_the_estimate_for_large_unfiltered_tables(self):
+        with mock.patch(f'{__package__}.admin.estimated_row_count', return_value=250000) as estimate:
+            self.assertEqual(EstimatedCountPaginator(SESEvent.objects.all(), 2).count, 250000)
+        estimate.assert_called_once()
+
+        # Small tables are still counted exactly
+        with mock.patch(f'{__package__}.admin.estimated_row_count', return_value=50):
+            self.assertEqual(EstimatedCountPaginator(SESEvent.objects.all(), 2).count, 5)
+
+    @override_settings(SES_TRACKING_ADMIN_LARGE_TABLE_MODE=True)
+    def test_large_table_mode_uses_indexed_prefix_search(self):
+        self.assertEqual(self.search('0100abc-1'), ['bob@example.com'])
+        self.assertEqual(self.search('<msg-2@example.com>'), ['carol@example.com'])
+        self.assertEqual(self.search('alice@example.com'), [])  # Exact match, stored as received
+        self.assertEqual(self.search('Alice@example.com'), ['Alice@example.com'])
+        self.assertEqual(self.search('abc-1'), [])  # No substring matches
+        self.assertEqual(len(self.search('0100abc')), 5)
+
+    def test_large_table_mode_is_read_per_request(self):
+        self.assertIn('timestamp', self.model_admin.get_list_filter(self.request))
+        self.assertEqual(self.model_admin.date_hierarchy, 'timestamp')
+        self.assertEqual(self.search('abc-1'), ['bob@example.com'])
+
+        with override_settings(SES_TRACKING_ADMIN_LARGE_TABLE_MODE=True):
+            self.assertEqual(self.model_admin.get_list_filter(self.request), ['event_type', 'bounce_type'])
+            self.assertIsNone(self.model_admin.date_hierarchy)
+            self.assertFalse(self.model_admin.show_full_result_count)
+            self.assertIsInstance(
+                self.model_admin.get_paginator(self.request, SESEvent.objects.all(), 100),
+                EstimatedCountPaginator,
+            )
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class SESEventDashboardTests(TestCase):
+
+    def setUp(self):
+        # Just after local midnight, so the events are today whenever the test runs
+        midnight = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        events = [
+            ('send', 'a@example.com'), ('send', 'b@example.org'), ('send', 'c@example.com'),
+            ('send', 'd@example.com'), ('delivery', 'a@example.com'), ('delivery', 'c@example.com'),
+            ('bounce', 'b@example.org'), ('complaint', 'd@example.com'),
+        ]
+        for i, (event_type, email) in enumerate(events):
+            self.event(event_type, email, midnight + timedelta(seconds=i))
+        # Earlier days count towards the tabs but not towards today
+        for i, email in enumerate(['e@example.com', 'f@example.org', 'g@example.com']):
+            self.event('bounce', email, midnight - timedelta(days=3, seconds=i), bounce_type='Permanent')
+
+    def event(self, event_type, email, timestamp, **fields):
+        SESEvent.objects.create(
+            event_type=event_type, email=email, timestamp=timestamp, raw_message={},
+            message_id=f'{event_type}-{email}-{timestamp.timestamp()}', **fields
+        )
+
+    def test_tabs_match_the_list_endpoint(self):
+        for filters in ({}, {'search[value]': 'example.org'}, {'order[0][column]': '1', 'order[0][dir]': 'asc'}):
+            dashboard = self.client.get(reverse('ses_tracking:ses-events-dashboard'), {'length': 2, **filters}).json()
+
+            for tab in ('all', 'bounce', 'complaint'):
+                params = {'start': 0, 'length': 2, **filters}
+                if tab != 'all':
+                    params['event_type'] = tab
+                listed = self.client.get(reverse('ses_tracking:ses-events-list'), params).json()
+                listed.pop('draw')
+                self.assertEqual(dashboard['tabs'][tab], listed)
+                self.assertEqual(dashboard['counts'][tab], listed['recordsTotal'])
+
+    def test_today_matches_the_daily_stats(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        dashboard = self.client.get(reverse('ses_tracking:ses-events-dashboard')).json()
+        call_command('aggregate_daily_stats', date=timezone.localdate().isoformat(), stdout=StringIO())
+        stats = self.client.get(reverse('ses_tracking:daily-stats-latest')).json()
+
+        today = dashboard['today']
+        self.assertEqual(today['date'], stats['date'])
+        self.assertEqual(
+            today['counts'],
+            {'send': stats['total_sends'], 'delivery': stats['total_deliveries'],
+             'bounce': stats['total_bounces'], 'complaint': stats['total_complaints']},
+        )
+        for rate in ('bounce_rate', 'complaint_rate', 'delivery_rate'):
+            self.assertEqual(today[rate], float(stats[rate]))
+
+    def test_page_bootstraps_from_the_dashboard_endpoint(self):
+        from django.http import HttpResponse
+
+        with mock.patch(f'{__package__}.views.draw_menu', return_value=''), \
+                mock.patch(f'{__package__}.views.render', return_value=HttpResponse()) as render:
+            self.client.get(reverse('ses_tracking:bounces-complaints'))
+
+        dashboard_url = render.call_args[0][2]['dashboard_url']
+        self.assertEqual(dashboard_url, reverse('ses_tracking:ses-events-dashboard'))
+        self.assertEqual(self.client.get(dashboard_url).json()['counts'], {'all': 5, 'bounce': 4, 'complaint': 1})
+
+
+class HeaderExtractionTests(TestCase):
+
+    def setUp(self):
+        from .lookups import clear_lookup_caches
+
+        clear_lookup_caches()
+        self.addCleanup(clear_lookup_caches)
+        messages = [synthetic_notification('bounce', 2) for _ in range(3)]
+        variants = [
+            lambda mail: mail['commonHeaders'].pop('subject'),
+            lambda mail: mail['commonHeaders'].update(to=[]),
+            lambda mail: mail.update(headers=[], commonHeaders={}),
+            lambda mail: mail['commonHeaders'].update(subject='x' * 700),
+            lambda mail: mail['commonHeaders'].update(subject='O\'Reilly "quoted" ünïcode'),
+        ]
+        for variant in variants:
+            message = synthetic_notification('bounce')
+            variant(message['mail'])
+            messages.append(message)
+        SESEvent.objects.bulk_create([
+            SESEvent(event_type='bounce', message_id=f'm{i}', email='a@example.com', timestamp=timezone.now(), raw_message=message)
+            for i, message in enumerate(messages)
+        ])
+
+    def derived(self):
+        return list(SESEvent.objects.order_by('pk').values_list('email_message_id', 'email_subject__value', 'email_to'))
+
+    def expected(self):
+        # What SESEvent.save() would store; subjects are interned truncated
+        length = EmailSubject._meta.get_field('value').max_length
+        rows = []
+        for event in SESEvent.objects.order_by('pk'):
+            subject = event.extract_email_subject
+            rows.append((event.extract_email_message_id, subject[:length] if subject else None, event.extract_email_to))
+        return rows
+
+    def test_sql_and_python_paths_derive_the_same_fields(self):
+        if not supports_sql_extraction(connection):
+            self.skipTest(f'No SQL extraction on {connection.vendor}')
+
+        list(derive_header_fields(use_sql=True, batch_size=3))
+        from_sql = self.derived()
+        SESEvent.objects.update(email_message_id=None, email_subject=None, email_to=None)
+        list(derive_header_fields(use_sql=False, batch_size=3))
+        from_python = self.derived()
+
+        self.assertEqual(from_sql, from_python)
+        self.assertEqual(from_sql, self.expected())
+        self.assertEqual(from_sql[-1][1], 'O\'Reilly "quoted" ünïcode')
+
+    def test_overwrite_matches_between_paths(self):
+        if not supports_sql_extraction(connection):
+            self.skipTest(f'No SQL extraction on {connection.vendor}')
+
+        SESEvent.objects.update(email_message_id='stale', email_to='stale')
+        list(derive_header_fields(use_sql=True, overwrite=True, batch_size=0))
+        from_sql = self.derived()
+        SESEvent.objects.update(email_message_id='stale', email_to='stale')
+        list(derive_header_fields(use_sql=False, overwrite=True, batch_size=0))
+
+        self.assertEqual(from_sql, self.derived())
+        self.assertEqual(from_sql, self.expected())
+
+
+class SESEventSerializationTests(TestCase):
+
+    def setUp(self):
+        from .lookups import clear_lookup_caches
+        from .webhooks import process_ses_message
+
+        clear_lookup_caches()
+        self.addCleanup(clear_lookup_caches)
+        process_ses_message(synthetic_notification('bounce'))
+        process_ses_message(synthetic_notification('complaint'))
+        process_ses_message({
+            'eventType': 'Reject',
+            'mail': {
+                'timestamp': '2026-10-01T10:00:00.000Z',
+                'messageId': 'reject-message-id',
+                'destination': ['rejected@example.com'],
+            },
+            'reject': {'reason': 'Bad content'},
+        })
+
+    def test_detail_serializer_matches_lean_rows(self):
+        events = SESEvent.objects.select_related(
+            'email_subject', 'bounce_sub_type', 'complaint_feedback_type', 'reject_reason'
+        ).order_by('pk')
+        lean = list(serialize_event_rows(events.values(*SES_EVENT_VALUES_FIELDS)))
+        detail = [dict(SESEventSerializer(event).data) for event in events]
+
+        self.assertEqual([row['event_type'] for row in detail], ['bounce', 'complaint', 'reject'])
+        self.assertEqual(detail, lean)
+        for row in detail:
+            # Null lookups are present as None, not dropped
+            self.assertEqual(set(row), set(SESEventSerializer.Meta.fields))
+        self.assertIsNone(detail[0]['complaint_feedback_type'])
+        self.assertIsNone(detail[1]['bounce_sub_type'])
+        self.assertEqual(detail[2]['reject_reason'], 'Bad content')
+
+
+class DailyStatsSerializationTests(TestCase):
+
+    def setUp(self):
+        DailyEmailStats.objects.create(
+            date=date(2026, 10, 1), total_sends=3, total_deliveries=2, total_bounces=1,
+            bounce_rate='33.33', complaint_rate=0, delivery_rate='66.67', unique_recipients=3,
+        )
+        DailyEmailStats.objects.create(
+            date=date(2026, 10, 2), total_deliveries=40, total_complaints=1,
+            bounce_rate=0, complaint_rate='2.50', delivery_rate=100,
+        )
+        self.stats = DailyEmailStats.objects.order_by('date')
+
+    def assert_lean_rows_match(self):
+        rows = list(self.stats.values(*DAILY_STATS_VALUES_FIELDS))
+
+        self.assertEqual(
+            list(serialize_daily_stats_rows(rows)),
+            [dict(row) for row in DailyEmailStatsSerializer(self.stats, many=True).data],
+        )
+        self.assertEqual(
+            list(serialize_daily_stats_rows(rows, summary=True)),
+            [dict(row) for row in DailyEmailStatsSummarySerializer(self.stats, many=True).data],
+        )
+        return list(serialize_daily_stats_rows(rows))
+
+    def test_lean_rows_match_serializer(self):
+        rows = self.assert_lean_rows_match()
+
+        self.assertEqual(rows[0]['bounce_rate'], '33.33')
+        self.assertEqual(rows[1]['complaint_rate_display'], '2.50%')
+
+    @override_settings(REST_FRAMEWORK={'COERCE_DECIMAL_TO_STRING': False})
+    def test_lean_rows_match_serializer_without_decimal_coercion(self):
+        rows = self.assert_lean_rows_match()
+
+        self.assertEqual(rows[0]['bounce_rate'], Decimal('33.33'))
+        self.assertEqual(rows[1]['delivery_rate'], Decimal('100.00'))
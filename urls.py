@@ -1,7 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views as api_views
-from . import views as webhook_views
+from . import api as api_views
+from . import views
+from . import webhooks as webhook_views
+from .metrics import metrics_view
 
 
 app_name = 'ses_tracking'
@@ -15,10 +17,16 @@ urlpatterns = [
     # Webhook endpoint (existing)
     path('sns/ses-events/', webhook_views.sns_endpoint, name='sns_endpoint'),
     
+    # Async variant for ASGI deployments
+    path('sns/ses-events/async/', webhook_views.async_sns_endpoint, name='sns_endpoint_async'),
+    
     # API endpoints
     path('api/', include(router.urls)),
 
-    path('sns/bounces-complaints/', webhook_views.BouncesComplaintsListView.as_view(), name='bounces-complaints'),
+    path('sns/bounces-complaints/', views.BouncesComplaintsListView.as_view(), name='bounces-complaints'),
+    
+    path('sns/daily_email_stats/', views.DailyEmailStatsListView.as_view(), name='daily-email-stats'),
     
-    path('sns/daily_email_stats/', webhook_views.DailyEmailStatsListView.as_view(), name='daily-email-stats')
+    # Prometheus metrics (404 unless SES_TRACKING_METRICS_EXPORTER is set)
+    path('metrics/', metrics_view, name='metrics'),
 ]
\ No newline at end of file
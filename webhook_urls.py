@@ -0,0 +1,23 @@
+# ses_tracking/webhook_urls.py
+"""
+Webhook-only URLconf for ingest workers.
+
+Serves the SNS endpoints and metrics without importing the REST API, DRF or
+the dashboard views. Include it instead of ses_tracking.urls in a
+deployment that runs dedicated webhook workers:
+
+    path('ses/webhooks/', include('ses_tracking.webhook_urls')),
+"""
+from django.urls import path
+
+from . import webhooks
+from .metrics import metrics_view
+
+
+app_name = 'ses_tracking'
+
+urlpatterns = [
+    path('sns/ses-events/', webhooks.sns_endpoint, name='sns_endpoint'),
+    path('sns/ses-events/async/', webhooks.async_sns_endpoint, name='sns_endpoint_async'),
+    path('metrics/', metrics_view, name='metrics'),
+]
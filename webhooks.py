@@ -0,0 +1,491 @@
+# ses_tracking/webhooks.py
+"""
+SNS ingest: the webhook endpoints and the SES event handlers.
+
+Kept free of DRF, the serializers and the dashboard views so a worker that
+only serves webhook_urls imports nothing it does not need.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from django.utils import timezone
+from django.db import close_old_connections
+from django.db.models import Q
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from django.conf import settings
+
+from . import metrics
+from .alerts import alert_evaluator
+from .latency import record_delivery_latency
+from .lookups import bounce_sub_types, complaint_feedback_types, reject_reasons
+from .models import DirtyDay, OutboundMessage, SESEvent
+from .recipients import update_recipient_states
+from .subscriptions import schedule_confirmation
+from .suppression import record_bounces, record_complaints
+
+logger = logging.getLogger(__name__)
+
+
+@csrf_exempt
+@require_POST
+def sns_endpoint(request):
+    """
+    Endpoint to receive SNS notifications from AWS SES
+    """
+    started = time.perf_counter()
+    try:
+        # Parse the JSON body
+        message_data = json.loads(request.body.decode('utf-8'))
+        
+        # Handle SNS subscription confirmation
+        if message_data.get('Type') == 'SubscriptionConfirmation':
+            subscribe_url = message_data.get('SubscribeURL')
+            logger.info(f"SNS Subscription confirmation received. URL: {subscribe_url}")
+            
+            # Confirm in the background so a slow AWS response cannot hold this worker
+            schedule_confirmation(message_data)
+            
+            return HttpResponse('Subscription confirmation scheduled', status=200)
+        
+        # Handle SNS notifications
+        if message_data.get('Type') == 'Notification':
+            # Parse the actual SES message from SNS
+            ses_message = json.loads(message_data.get('Message', '{}'))
+            
+            process_ses_message(ses_message)
+            metrics.observe(
+                'webhook_duration_seconds',
+                time.perf_counter() - started,
+                event_type=event_type_label(ses_message),
+            )
+            
+            return HttpResponse('OK', status=200)
+        
+        return HttpResponseBadRequest('Invalid message type')
+        
+    except Exception as e:
+        logger.error(f"Error processing SNS notification: {str(e)}", exc_info=True)
+        return HttpResponse('Error processing notification', status=500)
+sns_endpoint.login_required = False
+
+
+KNOWN_EVENT_TYPES = frozenset([
+    'bounce', 'complaint', 'delivery', 'send', 'reject',
+    'renderingfailure', 'deliverydelay', 'subscription',
+])
+
+
+def event_type_label(ses_message):
+    """Metrics label for a notification; unknown types share one label"""
+    event_type = ses_message.get('eventType', '').lower()
+    return event_type if event_type in KNOWN_EVENT_TYPES else 'unknown'
+
+
+def process_ses_message(ses_message):
+    """
+    Store one SES event notification and update the derived tables.
+    
+    Returns the SESEvent rows created.
+    """
+    label = event_type_label(ses_message)
+    metrics.observe(
+        'notification_recipients',
+        len(ses_message.get('mail', {}).get('destination') or []),
+        event_type=label,
+    )
+    try:
+        with metrics.timer('db_write_duration_seconds', event_type=label):
+            return _process_ses_message(ses_message)
+    except Exception:
+        metrics.inc('handler_errors_total', event_type=label)
+        raise
+
+
+def _process_ses_message(ses_message):
+    # Determine event type - SES uses 'eventType' field
+    event_type = ses_message.get('eventType', '').lower()
+    
+    # Map AWS event types to handlers
+    if event_type == 'bounce':
+        events = handle_bounce(ses_message)
+    elif event_type == 'complaint':
+        events = handle_complaint(ses_message)
+    elif event_type == 'delivery':
+        events = handle_delivery(ses_message)
+    elif event_type == 'send':
+        events = handle_send(ses_message)
+    elif event_type == 'reject':
+        events = handle_reject(ses_message)
+    elif event_type == 'renderingfailure':
+        events = handle_rendering_failure(ses_message)
+    elif event_type == 'deliverydelay':
+        events = handle_delivery_delay(ses_message)
+    elif event_type == 'subscription':
+        events = handle_subscription(ses_message)
+    else:
+        logger.warning(f"Unknown event type: {event_type}")
+        events = []
+    
+    update_recipient_states(events)
+    DirtyDay.mark(event.timestamp for event in events)
+    alert_evaluator.record_events(ses_message, events)
+    return events
+
+
+class WebhookExecutor:
+    """
+    Bounded thread pool for the async webhook's database work.
+    
+    At most SES_TRACKING_WEBHOOK_WORKERS notifications are written at once
+    and at most SES_TRACKING_WEBHOOK_MAX_PENDING are accepted (running or
+    queued); past that, submit() returns None and the view answers 503 so
+    SNS retries later instead of the queue growing without bound.
+    """
+    
+    def __init__(self, workers, max_pending):
+        from concurrent.futures import ThreadPoolExecutor
+        
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ses-webhook')
+        self._lock = threading.Lock()
+    
+    def _run(self, func, *args):
+        # Worker threads outlive requests, so manage their connections the
+        # way the request cycle would
+        close_old_connections()
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+    
+    def _release(self, future=None):
+        with self._lock:
+            self.pending -= 1
+    
+    def submit(self, func, *args):
+        """Return an awaitable for func(*args), or None when saturated"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                return None
+            self.pending += 1
+        try:
+            future = self._executor.submit(self._run, func, *args)
+        except Exception:
+            self._release()
+            raise
+        # Released when the future finishes or is cancelled: a client that
+        # disconnects while queued cancels it through wrap_future, and _run
+        # then never runs
+        future.add_done_callback(self._release)
+        return asyncio.wrap_future(future)
+
+
+_webhook_executor = None
+_webhook_executor_lock = threading.Lock()
+
+
+def get_webhook_executor():
+    global _webhook_executor
+    with _webhook_executor_lock:
+        if _webhook_executor is None:
+            _webhook_executor = WebhookExecutor(
+                workers=getattr(settings, 'SES_TRACKING_WEBHOOK_WORKERS', 8),
+                max_pending=getattr(settings, 'SES_TRACKING_WEBHOOK_MAX_PENDING', 100),
+            )
+        return _webhook_executor
+
+
+async def async_sns_endpoint(request):
+    """
+    ASGI variant of sns_endpoint.
+    
+    Parsing happens on the event loop and the database work runs on the
+    bounded webhook executor, so a burst of SNS connections does not hold
+    one worker thread each. Returns 503 with Retry-After once the executor
+    is saturated.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    
+    started = time.perf_counter()
+    try:
+        message_data = json.loads(request.body.decode('utf-8'))
+        message_type = message_data.get('Type')
+        
+        if message_type == 'SubscriptionConfirmation':
+            subscribe_url = message_data.get('SubscribeURL')
+            logger.info(f"SNS Subscription confirmation received. URL: {subscribe_url}")
+            work = get_webhook_executor().submit(schedule_confirmation, message_data)
+            body = 'Subscription confirmation scheduled'
+        elif message_type == 'Notification':
+            ses_message = json.loads(message_data.get('Message', '{}'))
+            work = get_webhook_executor().submit(process_ses_message, ses_message)
+            body = 'OK'
+        else:
+            return HttpResponseBadRequest('Invalid message type')
+        
+        if work is None:
+            logger.warning("SNS webhook saturated, asking SNS to retry")
+            metrics.inc('webhook_rejected_total')
+            response = HttpResponse('Too many pending notifications', status=503)
+            response['Retry-After'] = '1'
+            return response
+        
+        await work
+        if message_type == 'Notification':
+            metrics.observe(
+                'webhook_duration_seconds',
+                time.perf_counter() - started,
+                event_type=event_type_label(ses_message),
+            )
+        return HttpResponse(body, status=200)
+        
+    except Exception as e:
+        logger.error(f"Error processing SNS notification: {str(e)}", exc_info=True)
+        return HttpResponse('Error processing notification', status=500)
+async_sns_endpoint.csrf_exempt = True
+async_sns_endpoint.login_required = False
+
+
+def handle_bounce(message):
+    """Process bounce notifications"""
+    from dateutil import parser as date_parser
+    
+    bounce = message.get('bounce', {})
+    mail = message.get('mail', {})
+    
+    # Parse timestamp - it's in ISO format string
+    timestamp_str = bounce.get('timestamp') or mail.get('timestamp')
+    timestamp = date_parser.parse(timestamp_str) if timestamp_str else timezone.now()
+    
+    bounce_sub_type_id = bounce_sub_types.get_id(bounce.get('bounceSubType', ''))
+    events = []
+    for recipient in bounce.get('bouncedRecipients', []):
+        events.append(SESEvent.objects.create(
+            event_type='bounce',
+            message_id=mail.get('messageId', ''),
+            email=recipient.get('emailAddress', ''),
+            bounce_type=bounce.get('bounceType', ''),
+            bounce_sub_type_id=bounce_sub_type_id,
+            timestamp=timestamp,
+            raw_message=message
+        ))
+        logger.info(f"Bounce recorded: {recipient.get('emailAddress')}")
+    
+    record_bounces(
+        [recipient.get('emailAddress', '') for recipient in bounce.get('bouncedRecipients', [])],
+        bounce.get('bounceType', ''),
+        timestamp
+    )
+    
+    return events
+
+
+def handle_complaint(message):
+    """Process complaint notifications"""
+    from dateutil import parser as date_parser
+    
+    complaint = message.get('complaint', {})
+    mail = message.get('mail', {})
+    
+    # Parse timestamp - it's in ISO format string
+    timestamp_str = complaint.get('timestamp') or mail.get('timestamp')
+    timestamp = date_parser.parse(timestamp_str) if timestamp_str else timezone.now()
+    
+    complaint_feedback_type_id = complaint_feedback_types.get_id(complaint.get('complaintFeedbackType', ''))
+    events = []
+    for recipient in complaint.get('complainedRecipients', []):
+        events.append(SESEvent.objects.create(
+            event_type='complaint',
+            message_id=mail.get('messageId', ''),
+            email=recipient.get('emailAddress', ''),
+            complaint_feedback_type_id=complaint_feedback_type_id,
+            timestamp=timestamp,
+            raw_message=message
+        ))
+        logger.info(f"Complaint recorded: {recipient.get('emailAddress')}")
+    
+    record_complaints(
+        [recipient.get('emailAddress', '') for recipient in complaint.get('complainedRecipients', [])],
+        timestamp
+    )
+    
+    return events
+
+
+def handle_delivery(message):
+    """Process delivery notifications"""
+    from dateutil import parser as date_parser
+    
+    delivery = message.get('delivery', {})
+    mail = message.get('mail', {})
+    
+    # Parse timestamp - it's in ISO format string
+    timestamp_str = delivery.get('timestamp') or mail.get('timestamp')
+    timestamp = date_parser.parse(timestamp_str) if timestamp_str else timezone.now()
+    
+    events = []
+    for recipient in delivery.get('recipients', []):
+        events.append(SESEvent.objects.create(
+            event_type='delivery',
+            message_id=mail.get('messageId', ''),
+            email=recipient,
+            timestamp=timestamp,
+            raw_message=message
+        ))
+        logger.info(f"Delivery recorded: {recipient}")
+    
+    record_delivery_latency(message)
+    
+    mark_delivered(message, timestamp)
+    
+    return events
+
+
+def mark_delivered(message, timestamp):
+    """
+    Stamp the first delivery on the outbound log row of the delivered message
+    (send -> delivery latency).
+    
+    The row is found from this notification's own ids, never from the events
+    it created: rows logged by SESApiBackend by their unique SES MessageId,
+    SMTP-sent rows by the message's Message-ID header.
+    """
+    mail = message.get('mail', {})
+    match = Q()
+    if mail.get('messageId'):
+        match |= Q(ses_message_id=mail['messageId'])
+    header_message_id = SESEvent(raw_message=message).extract_email_message_id
+    if header_message_id:
+        match |= Q(ses_message_id__isnull=True, message_id=header_message_id)
+    if not match:
+        return 0
+    return OutboundMessage.objects.filter(match, delivered_at__isnull=True).update(delivered_at=timestamp)
+
+
+def handle_send(message):
+    """Process send notifications"""
+    from dateutil import parser as date_parser
+    
+    mail = message.get('mail', {})
+    
+    timestamp_str = mail.get('timestamp')
+    timestamp = date_parser.parse(timestamp_str) if timestamp_str else timezone.now()
+    
+    events = []
+    for recipient in mail.get('destination', []):
+        events.append(SESEvent.objects.create(
+            event_type='send',
+            message_id=mail.get('messageId', ''),
+            email=recipient,
+            timestamp=timestamp,
+            raw_message=message
+        ))
+        logger.info(f"Send recorded: {recipient}")
+    
+    return events
+
+
+def handle_reject(message):
+    """Process reject notifications"""
+    from dateutil import parser as date_parser
+    
+    reject = message.get('reject', {})
+    mail = message.get('mail', {})
+    
+    timestamp_str = mail.get('timestamp')
+    timestamp = date_parser.parse(timestamp_str) if timestamp_str else timezone.now()
+    
+    reject_reason_id = reject_reasons.get_id(reject.get('reason', ''))
+    events = []
+    for recipient in mail.get('destination', []):
+        events.append(SESEvent.objects.create(
+            event_type='reject',
+            message_id=mail.get('messageId', ''),
+            email=recipient,
+            reject_reason_id=reject_reason_id,
+            timestamp=timestamp,
+            raw_message=message
+        ))
+        logger.info(f"Reject recorded: {recipient} - {reject.get('reason')}")
+    
+    return events
+
+
+def handle_rendering_failure(message):
+    """Process rendering failure notifications"""
+    from dateutil import parser as date_parser
+    
+    failure = message.get('failure', {})
+    mail = message.get('mail', {})
+    
+    timestamp_str = mail.get('timestamp')
+    timestamp = date_parser.parse(timestamp_str) if timestamp_str else timezone.now()
+    
+    reject_reason_id = reject_reasons.get_id(failure.get('errorMessage', ''))
+    events = []
+    for recipient in mail.get('destination', []):
+        events.append(SESEvent.objects.create(
+            event_type='rendering_failure',
+            message_id=mail.get('messageId', ''),
+            email=recipient,
+            reject_reason_id=reject_reason_id,
+            timestamp=timestamp,
+            raw_message=message
+        ))
+        logger.info(f"Rendering failure recorded: {recipient}")
+    
+    return events
+
+
+def handle_delivery_delay(message):
+    """Process delivery delay notifications"""
+    from dateutil import parser as date_parser
+    
+    delay = message.get('deliveryDelay', {})
+    mail = message.get('mail', {})
+    
+    timestamp_str = delay.get('timestamp') or mail.get('timestamp')
+    timestamp = date_parser.parse(timestamp_str) if timestamp_str else timezone.now()
+    
+    events = []
+    for recipient in delay.get('delayedRecipients', []):
+        events.append(SESEvent.objects.create(
+            event_type='delivery_delay',
+            message_id=mail.get('messageId', ''),
+            email=recipient.get('emailAddress', ''),
+            timestamp=timestamp,
+            raw_message=message
+        ))
+        logger.info(f"Delivery delay recorded: {recipient.get('emailAddress')}")
+    
+    return events
+
+
+def handle_subscription(message):
+    """Process subscription notifications"""
+    from dateutil import parser as date_parser
+    
+    subscription = message.get('subscription', {})
+    mail = message.get('mail', {})
+    
+    timestamp_str = subscription.get('timestamp') or mail.get('timestamp')
+    timestamp = date_parser.parse(timestamp_str) if timestamp_str else timezone.now()
+    
+    events = []
+    for contact in subscription.get('contactList', {}).get('contacts', []):
+        events.append(SESEvent.objects.create(
+            event_type='subscription',
+            message_id=mail.get('messageId', ''),
+            email=contact.get('emailAddress', ''),
+            timestamp=timestamp,
+            raw_message=message
+        ))
+        logger.info(f"Subscription recorded: {contact.get('emailAddress')}")
+    
+    return events